@@ -4,14 +4,17 @@ import os
 from datetime import datetime, timezone
 from typing import Optional
 
-from fastapi import BackgroundTasks, HTTPException, Request, Response, status
-from passlib.context import CryptContext
+from fastapi import HTTPException, Request, Response, status
 import logging
 
 from ..models import Session, User
 from ..models.User import Address
-from ..services.mailer import sendOtpEmail, sendPasswordResetEmail
+from ..services.clientAddress import clientIp
+from ..services.googleTokenService import GoogleTokenError, verifyGoogleIdToken
+from ..services.emailOutbox import queueOtpEmail, queuePasswordResetEmail
 from ..services.otpService import OTP_EXPIRY_MINUTES, assignOtp, verifyOtp, OtpServiceError
+from ..services.passwordService import PasswordServiceError, hashPassword, verifyPassword
+from ..services.principalCache import invalidateUser
 from ..services.sessionService import (
     SessionError,
     createSession,
@@ -21,7 +24,6 @@ from ..services.sessionService import (
     rotateSession,
 )
 
-password_context = CryptContext(schemes=["bcrypt_sha256", "bcrypt"], deprecated="auto")
 logger = logging.getLogger(__name__)
 
 REFRESH_COOKIE_NAME = "refreshToken"
@@ -119,6 +121,37 @@ def _build_auth_response(*, user: User, access_token: str, access_expires: datet
     }
 
 
+async def _hash_password(password: str) -> str:
+    try:
+        return await hashPassword(password)
+    except PasswordServiceError as exc:
+        raise HTTPException(status_code=exc.status, detail=str(exc), headers={"Retry-After": "1"}) from exc
+
+
+async def _verify_password(password: str, password_hash: str) -> bool:
+    try:
+        return await verifyPassword(password, password_hash)
+    except PasswordServiceError as exc:
+        raise HTTPException(status_code=exc.status, detail=str(exc), headers={"Retry-After": "1"}) from exc
+
+
+async def _load_user_for_update(request: Request) -> User:
+    """
+    Re-read the caller before a write. ``request.state.user`` may come from the
+    principal cache (up to AUTH_PRINCIPAL_CACHE_TTL seconds old) and ``save()``
+    replaces the whole document, so saving it could undo another worker's write.
+    """
+    auth_state = getattr(request.state, "auth", None)
+    if not auth_state:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required")
+    user = await User.get(auth_state["userId"])
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    if not user.isActive:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User is disabled")
+    return user
+
+
 def _find_address(user: User, address_id: str) -> Optional[Address]:
     for address in user.addresses:
         if getattr(address, "id", None) == address_id:
@@ -126,13 +159,13 @@ def _find_address(user: User, address_id: str) -> Optional[Address]:
     return None
 
 
-async def signup(*, fullName: str, email: str, password: str, phone: Optional[str], response: Response, background: BackgroundTasks):
+async def signup(*, fullName: str, email: str, password: str, phone: Optional[str], response: Response):
     normalized_email = email.lower()
     existing = await User.find_one(User.email == normalized_email)
     if existing:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="An account already exists with this email.")
 
-    password_hash = password_context.hash(password)
+    password_hash = await _hash_password(password)
     user = User(
         fullName=fullName,
         email=normalized_email,
@@ -148,8 +181,7 @@ async def signup(*, fullName: str, email: str, password: str, phone: Optional[st
         raise HTTPException(status_code=exc.status, detail=str(exc)) from exc
     
     await user.save()
-    background.add_task(
-        sendOtpEmail,
+    await queueOtpEmail(
         to=user.email,
         otp=otp_payload["otp"],
         expiresMinutes=OTP_EXPIRY_MINUTES,
@@ -162,7 +194,7 @@ async def signup(*, fullName: str, email: str, password: str, phone: Optional[st
     }
 
 
-async def resendOtp(*, email: str, response: Response, background: BackgroundTasks):
+async def resendOtp(*, email: str, response: Response):
     user = await User.find_one(User.email == email.lower())
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Account not found.")
@@ -175,8 +207,7 @@ async def resendOtp(*, email: str, response: Response, background: BackgroundTas
         raise HTTPException(status_code=exc.status, detail=str(exc)) from exc
     
     await user.save()
-    background.add_task(
-        sendOtpEmail,
+    await queueOtpEmail(
         to=user.email,
         otp=otp_payload["otp"],
         expiresMinutes=OTP_EXPIRY_MINUTES,
@@ -201,7 +232,7 @@ async def verifyEmail(*, email: str, otp: str, request: Request, response: Respo
     session_payload = await createSession(
         user=user,
         userAgent=request.headers.get("user-agent"),
-        ipAddress=request.client.host if request.client else None,
+        ipAddress=clientIp(request),
         metadata={"source": "emailVerification"},
     )
     _set_refresh_cookie(response, session_payload["refreshToken"], session_payload["refreshTokenExpiresAt"])
@@ -229,7 +260,7 @@ async def login(*, email: str, password: str, request: Request, response: Respon
             detail="This account uses Google sign-in. Please continue with Google."
         )
     
-    if not password_context.verify(password, user.passwordHash):
+    if not await _verify_password(password, user.passwordHash):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password.")
     if not user.emailVerified:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Please verify your email before logging in.")
@@ -239,7 +270,7 @@ async def login(*, email: str, password: str, request: Request, response: Respon
     session_payload = await createSession(
         user=user,
         userAgent=request.headers.get("user-agent"),
-        ipAddress=request.client.host if request.client else None,
+        ipAddress=clientIp(request),
         metadata=None,
     )
     _set_refresh_cookie(response, session_payload["refreshToken"], session_payload["refreshTokenExpiresAt"])
@@ -260,7 +291,7 @@ async def refreshSessionHandler(*, request: Request, response: Response, refresh
         payload = await rotateSession(
             refreshToken=token,
             userAgent=request.headers.get("user-agent"),
-            ipAddress=request.client.host if request.client else None,
+            ipAddress=clientIp(request),
         )
     except SessionError as exc:
         raise HTTPException(status_code=exc.status, detail=str(exc)) from exc
@@ -298,7 +329,7 @@ async def logoutAll(*, request: Request, response: Response):
     return {"success": True, "message": "All sessions revoked successfully."}
 
 
-async def requestPasswordReset(*, email: str, response: Response, background: BackgroundTasks):
+async def requestPasswordReset(*, email: str, response: Response):
     user = await User.find_one(User.email == email.lower())
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="This email is not registered with us. Please sign up first.")
@@ -314,8 +345,7 @@ async def requestPasswordReset(*, email: str, response: Response, background: Ba
         raise HTTPException(status_code=exc.status, detail=str(exc)) from exc
     
     await user.save()
-    background.add_task(
-        sendPasswordResetEmail,
+    await queuePasswordResetEmail(
         to=user.email,
         otp=payload["otp"],
         expiresMinutes=OTP_EXPIRY_MINUTES,
@@ -335,13 +365,13 @@ async def resetPassword(*, email: str, otp: str, newPassword: str, request: Requ
         raise HTTPException(status_code=exc.status, detail=str(exc)) from exc
 
     await revokeAllUserSessions(user.id)
-    user.passwordHash = password_context.hash(newPassword)
+    user.passwordHash = await _hash_password(newPassword)
     await user.save()
 
     session_payload = await createSession(
         user=user,
         userAgent=request.headers.get("user-agent"),
-        ipAddress=request.client.host if request.client else None,
+        ipAddress=clientIp(request),
         metadata={"source": "passwordReset"},
     )
     _set_refresh_cookie(response, session_payload["refreshToken"], session_payload["refreshTokenExpiresAt"])
@@ -372,9 +402,7 @@ async def listAddresses(*, request: Request):
 
 
 async def addAddress(*, request: Request, payload: dict):
-    user = getattr(request.state, "user", None)
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required")
+    user = await _load_user_for_update(request)
 
     if len(user.addresses) >= 5:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Maximum of 5 addresses allowed.")
@@ -393,13 +421,12 @@ async def addAddress(*, request: Request, payload: dict):
     address = Address(**normalized)
     user.addresses.append(address)
     await user.save()
+    await invalidateUser(user.id)
     return {"success": True, "data": {"addresses": _serialize_user(user)["addresses"]}}
 
 
 async def updateAddress(*, request: Request, address_id: str, payload: dict):
-    user = getattr(request.state, "user", None)
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required")
+    user = await _load_user_for_update(request)
 
     address = _find_address(user, address_id)
     if not address:
@@ -423,27 +450,25 @@ async def updateAddress(*, request: Request, address_id: str, payload: dict):
     if not getattr(address, "phone", None):
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Phone is required.")
     await user.save()
+    await invalidateUser(user.id)
     return {"success": True, "data": {"addresses": _serialize_user(user)["addresses"]}}
 
 
 async def deleteAddress(*, request: Request, address_id: str):
-    user = getattr(request.state, "user", None)
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required")
+    user = await _load_user_for_update(request)
 
     before = len(user.addresses)
     user.addresses = [addr for addr in user.addresses if getattr(addr, "id", None) != address_id]
     if len(user.addresses) == before:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Address not found.")
     await user.save()
+    await invalidateUser(user.id)
     return {"success": True, "data": {"addresses": _serialize_user(user)["addresses"]}}
 
 
 async def updatePhone(*, request: Request, phone: str):
     """Update user's phone number."""
-    user = getattr(request.state, "user", None)
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required")
+    user = await _load_user_for_update(request)
     
     # Basic phone validation
     phone = phone.strip()
@@ -452,14 +477,13 @@ async def updatePhone(*, request: Request, phone: str):
     
     user.phone = phone
     await user.save()
+    await invalidateUser(user.id)
     return {"success": True, "message": "Phone number updated successfully.", "data": {"user": _serialize_user(user)}}
 
 
-async def requestEmailChangeOtp(*, request: Request, newEmail: str, background: BackgroundTasks):
+async def requestEmailChangeOtp(*, request: Request, newEmail: str):
     """Request OTP to change email address."""
-    user = getattr(request.state, "user", None)
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required")
+    user = await _load_user_for_update(request)
     
     newEmail = newEmail.lower().strip()
     
@@ -482,8 +506,7 @@ async def requestEmailChangeOtp(*, request: Request, newEmail: str, background:
     user.pendingEmail = newEmail
     await user.save()
     
-    background.add_task(
-        sendOtpEmail,
+    await queueOtpEmail(
         to=newEmail,  # Send OTP to new email to verify ownership
         otp=otp_payload["otp"],
         expiresMinutes=OTP_EXPIRY_MINUTES,
@@ -494,9 +517,7 @@ async def requestEmailChangeOtp(*, request: Request, newEmail: str, background:
 
 async def verifyEmailChange(*, request: Request, newEmail: str, otp: str):
     """Verify OTP and change email address."""
-    user = getattr(request.state, "user", None)
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required")
+    user = await _load_user_for_update(request)
     
     newEmail = newEmail.lower().strip()
     
@@ -516,6 +537,7 @@ async def verifyEmailChange(*, request: Request, newEmail: str, otp: str):
     user.emailVerified = True  # Since they verified via OTP
     user.emailVerifiedAt = datetime.now(tz=timezone.utc)
     await user.save()
+    await invalidateUser(user.id)
     
     return {"success": True, "message": "Email address updated successfully.", "data": {"user": _serialize_user(user)}}
 
@@ -523,12 +545,9 @@ async def verifyEmailChange(*, request: Request, newEmail: str, otp: str):
 async def googleAuth(*, idToken: str, request: Request, response: Response):
     """
     Authenticate user via Google ID token.
-    Verifies the token server-side using Google's public keys.
+    Verifies the token locally against Google's cached public keys.
     Creates a new user if not exists, or logs in existing user.
     """
-    from google.oauth2 import id_token as google_id_token
-    from google.auth.transport import requests as google_requests
-
     google_client_id = os.getenv("GOOGLE_CLIENT_ID")
     if not google_client_id:
         logger.error("GOOGLE_CLIENT_ID environment variable not configured")
@@ -538,42 +557,27 @@ async def googleAuth(*, idToken: str, request: Request, response: Response):
         )
 
     try:
-        # Verify the ID token with Google's servers
-        # This validates: signature, expiration, audience (client_id), issuer
-        idinfo = google_id_token.verify_oauth2_token(
-            idToken,
-            google_requests.Request(),
-            google_client_id
-        )
-
-        # Verify issuer
-        if idinfo.get("iss") not in ["accounts.google.com", "https://accounts.google.com"]:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token issuer."
-            )
-
-        # Extract user info from verified token
-        email = idinfo.get("email", "").lower()
-        email_verified = idinfo.get("email_verified", False)
-        full_name = idinfo.get("name", "")
-        google_sub = idinfo.get("sub")  # Unique Google user ID
-
-        if not email:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email not provided by Google."
-            )
+        # Validates signature (against cached Google JWKS), expiration, audience (client_id) and issuer
+        idinfo = await verifyGoogleIdToken(idToken, google_client_id)
+    except GoogleTokenError as e:
+        logger.warning(f"Google token verification failed: {e}")
+        detail = "Invalid or expired Google token." if e.status == 401 else str(e)
+        raise HTTPException(status_code=e.status, detail=detail)
 
-        logger.info(f"Google auth: verified token for email={email}, sub={google_sub}")
+    # Extract user info from verified token
+    email = idinfo.get("email", "").lower()
+    email_verified = idinfo.get("email_verified", False)
+    full_name = idinfo.get("name", "")
+    google_sub = idinfo.get("sub")  # Unique Google user ID
 
-    except ValueError as e:
-        logger.warning(f"Google token verification failed: {e}")
+    if not email:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired Google token."
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email not provided by Google."
         )
 
+    logger.info(f"Google auth: verified token for email={email}, sub={google_sub}")
+
     # Check if user exists
     user = await User.find_one(User.email == email)
 
@@ -600,7 +604,7 @@ async def googleAuth(*, idToken: str, request: Request, response: Response):
     session_payload = await createSession(
         user=user,
         userAgent=request.headers.get("user-agent"),
-        ipAddress=request.client.host if request.client else None,
+        ipAddress=clientIp(request),
         metadata=None,
     )
     _set_refresh_cookie(response, session_payload["refreshToken"], session_payload["refreshTokenExpiresAt"])
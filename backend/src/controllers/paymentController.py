@@ -13,6 +13,7 @@ from ..services.paymentService import (
     verifyRazorpaySignature,
     verifyRazorpayWebhookSignature,
 )
+from ..services.purchaseService import PURCHASED_ORDER_STATUSES, recordOrderPurchases, releaseOrderPurchases
 
 logger = logging.getLogger("payments")
 
@@ -64,7 +65,6 @@ async def verifyRazorpayPayment(
             "razorpayOrderId": razorpayOrderId,
         },
     )
-    print(f"[payments] verify called orderId={orderId} user={user.id} paymentId={paymentId} rp_order={razorpayOrderId}")
     try:
         order_object_id = PydanticObjectId(orderId)
     except Exception:
@@ -97,7 +97,6 @@ async def verifyRazorpayPayment(
                 "paymentId": payment.transactionId,
             },
         )
-        print(f"[payments] already captured order={order.id} paymentId={payment.transactionId}")
         return {
             "success": True,
             "message": "Payment already verified.",
@@ -123,7 +122,6 @@ async def verifyRazorpayPayment(
                 "razorpayOrderId": gateway_order_id,
             },
         )
-        print(f"[payments] invalid signature order={order.id} paymentId={paymentId} rp_order={gateway_order_id}")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid payment signature")
 
     payment.status = "captured"
@@ -137,6 +135,7 @@ async def verifyRazorpayPayment(
     await order.save()
 
     items = await OrderItem.find(OrderItem.order == order.id).to_list()
+    await recordOrderPurchases(order, items)
 
     # Deduct stock from products after successful payment
     for item in items:
@@ -156,7 +155,6 @@ async def verifyRazorpayPayment(
                     "orderId": str(order.id),
                 },
             )
-            print(f"[payments] stock deducted product={product.id} qty={item.quantity} newStock={new_stock}")
 
     # Clear the user's cart after successful payment verification
     cart = await Cart.find_one(Cart.user == user.id)
@@ -176,7 +174,6 @@ async def verifyRazorpayPayment(
             "razorpayOrderId": gateway_order_id,
         },
     )
-    print(f"[payments] payment verified order={order.id} paymentId={paymentId} rp_order={gateway_order_id}")
 
     return {
         "success": True,
@@ -223,7 +220,6 @@ async def handleRazorpayWebhook(request: Request):
             "signaturePresent": bool(signature),
         },
     )
-    print(f"[payments] webhook received event={event_name} signature_present={bool(signature)}")
 
     # Handle payment.* events
     if event_name.startswith("payment."):
@@ -266,6 +262,7 @@ async def handleRazorpayWebhook(request: Request):
         if status_value == "captured":
             order.status = "paid"
             await order.save()
+            await recordOrderPurchases(order)
             
             # Clear the user's cart after successful payment via webhook
             user = await User.get(order.user)
@@ -278,8 +275,11 @@ async def handleRazorpayWebhook(request: Request):
                         extra={"userId": str(user.id), "cartId": str(cart.id), "orderId": str(order.id)},
                     )
         elif status_value == "failed":
+            previously_purchased = order.status in PURCHASED_ORDER_STATUSES
             order.status = "pending_payment"
             await order.save()
+            if previously_purchased:
+                await releaseOrderPurchases(order)
 
         logger.info(
             "Razorpay payment event processed",
@@ -290,7 +290,6 @@ async def handleRazorpayWebhook(request: Request):
                 "status": payment.status,
             },
         )
-        print(f"[payments] payment event processed event={event_name} order={order.id} paymentId={payment.transactionId} status={payment.status}")
 
         return {"success": True, "message": f"Processed {event_name}", "data": {"orderId": str(order.id)}}
 
@@ -328,6 +327,7 @@ async def handleRazorpayWebhook(request: Request):
 
             order.status = "paid"
             await order.save()
+            await recordOrderPurchases(order)
             
             # Clear the user's cart after successful payment via webhook
             user = await User.get(order.user)
@@ -348,7 +348,6 @@ async def handleRazorpayWebhook(request: Request):
                     "paymentId": payment.transactionId,
                 },
             )
-            print(f"[payments] order paid event processed order={order.id} paymentId={payment.transactionId}")
             return {"success": True, "message": "Order marked as paid", "data": {"orderId": str(order.id)}}
 
         _append_webhook_event(payment, event_name, order_entity)
@@ -360,7 +359,6 @@ async def handleRazorpayWebhook(request: Request):
                 "orderId": str(order.id),
             },
         )
-        print(f"[payments] order event acknowledged event={event_name} order={order.id}")
         return {"success": True, "message": f"Acknowledged {event_name}", "data": {"orderId": str(order.id)}}
 
     return {"success": True, "message": f"Ignored event {event_name}"}
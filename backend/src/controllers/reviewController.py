@@ -1,12 +1,50 @@
 from __future__ import annotations
 
-from typing import Optional
+import asyncio
+import hashlib
+from typing import Dict, Iterable, List, Optional
 
-from fastapi import HTTPException, status
-from beanie.operators import In
+from fastapi import HTTPException, Request, Response, status
+from fastapi.responses import JSONResponse
+from beanie import UpdateResponse
 from beanie.odm.fields import PydanticObjectId
+from beanie.operators import In
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from pymongo.errors import DuplicateKeyError
+
+from ..models import Product, Review, ReviewVote, User
+from ..services.purchaseService import hasVerifiedPurchase
+
+
+# Each sort is backed by a (product, ...) index on reviews.
+REVIEW_SORTS = {
+    "recent": ("-createdAt",),
+    "helpful": ("-helpfulCount", "-createdAt"),
+}
+
+
+class _ReviewerView(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
 
-from ..models import Order, OrderItem, Product, Review, User
+    id: PydanticObjectId = Field(alias="_id")
+    fullName: str
+
+
+class _ReviewedProductView(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: PydanticObjectId = Field(alias="_id")
+    name: str
+    slug: str
+    images: List[str] = Field(default_factory=list)
+    imageUrl: Optional[str] = None
+
+    @model_validator(mode="after")
+    def fill_images(self) -> "_ReviewedProductView":
+        # Older products only carry imageUrl; Product syncs it the same way.
+        if not self.images and self.imageUrl:
+            self.images = [self.imageUrl]
+        return self
 
 
 def _invalid_object_id(object_id: str) -> bool:
@@ -17,24 +55,37 @@ def _invalid_object_id(object_id: str) -> bool:
         return True
 
 
-async def _check_verified_purchase(user_id: PydanticObjectId, product_id: PydanticObjectId) -> bool:
-    """Check if user has purchased this product"""
-    orders = await Order.find(
-        Order.user == user_id,
-        In(Order.status, ["paid", "shipped", "delivered"]),
-    ).to_list()
-    
-    for order in orders:
-        order_items = await OrderItem.find(OrderItem.order == order.id, OrderItem.product == product_id).to_list()
-        if order_items:
-            return True
-    return False
+def _parse_pagination(page: Optional[int], limit: Optional[int]):
+    page = max(page or 1, 1)
+    limit = min(max(limit or 10, 1), 100)
+    return page, limit, (page - 1) * limit
+
 
+async def _reviewers_by_id(user_ids: Iterable[PydanticObjectId]) -> Dict[PydanticObjectId, _ReviewerView]:
+    ids = list(set(user_ids))
+    if not ids:
+        return {}
+    users = await User.find(In(User.id, ids)).project(_ReviewerView).to_list()
+    return {user.id: user for user in users}
 
-async def listReviews(*, productId: str, page: int = 1, limit: int = 10):
+
+async def _products_by_id(product_ids: Iterable[PydanticObjectId]) -> Dict[PydanticObjectId, _ReviewedProductView]:
+    ids = list(set(product_ids))
+    if not ids:
+        return {}
+    products = await Product.find(In(Product.id, ids)).project(_ReviewedProductView).to_list()
+    return {product.id: product for product in products}
+
+
+async def listReviews(*, productId: str, page: int = 1, limit: int = 10, sortBy: str = "recent"):
     """Get all reviews for a product"""
     if _invalid_object_id(productId):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid product ID")
+    if sortBy not in REVIEW_SORTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"sortBy must be one of: {', '.join(REVIEW_SORTS)}",
+        )
     
     product = await Product.get(productId)
     if not product:
@@ -44,14 +95,19 @@ async def listReviews(*, productId: str, page: int = 1, limit: int = 10):
     reviews = await Review.find(
         Review.product == product.id,
         Review.isApproved == True
-    ).sort(-Review.createdAt).skip(skip).limit(limit).to_list()
+    ).sort(*REVIEW_SORTS[sortBy]).skip(skip).limit(limit).to_list()
     
     total = await Review.find(Review.product == product.id, Review.isApproved == True).count()
     
-    # Fetch user details for each review
+    # Reviewer names are stored on the review; only reviews written before that
+    # (not yet backfilled) need a lookup.
+    reviewers = await _reviewers_by_id(review.user for review in reviews if review.reviewerName is None)
     review_list = []
     for review in reviews:
-        user = await User.get(review.user)
+        if review.reviewerName is not None:
+            user = _ReviewerView(id=review.user, fullName=review.reviewerName)
+        else:
+            user = reviewers.get(review.user)
         review_list.append({
             "id": str(review.id),
             "rating": review.rating,
@@ -66,9 +122,7 @@ async def listReviews(*, productId: str, page: int = 1, limit: int = 10):
             } if user else None,
         })
     
-    # Calculate average rating
-    all_reviews = await Review.find(Review.product == product.id, Review.isApproved == True).to_list()
-    avg_rating = sum(r.rating for r in all_reviews) / len(all_reviews) if all_reviews else 0
+    summary = await _rating_summary(product.id)
     
     return {
         "success": True,
@@ -81,13 +135,65 @@ async def listReviews(*, productId: str, page: int = 1, limit: int = 10):
                 "pages": (total + limit - 1) // limit,
             },
             "stats": {
-                "averageRating": round(avg_rating, 2),
+                "averageRating": summary["averageRating"],
                 "totalReviews": total,
             },
         },
     }
 
 
+async def _rating_summary(product_id: PydanticObjectId) -> dict:
+    """Count, average and 1-5 star histogram of approved reviews in one $group."""
+    buckets = await Review.get_motor_collection().aggregate(
+        [
+            {"$match": {"product": product_id, "isApproved": True}},
+            {"$group": {"_id": "$rating", "count": {"$sum": 1}}},
+        ]
+    ).to_list(length=None)
+    histogram = {str(star): 0 for star in range(1, 6)}
+    for bucket in buckets:
+        if str(bucket["_id"]) in histogram:
+            histogram[str(bucket["_id"])] = bucket["count"]
+    total = sum(histogram.values())
+    average = sum(int(star) * count for star, count in histogram.items()) / total if total else 0
+    return {"totalReviews": total, "averageRating": round(average, 2), "histogram": histogram}
+
+
+async def _stats_version(product_id: PydanticObjectId) -> str:
+    """
+    Cheap change marker for the rating summary: every review write that can move
+    it (insert, delete, rating edit, approval change) changes the product's review
+    count or its newest ``updatedAt``. Both reads are served by (product, ...) indexes.
+    """
+    collection = Review.get_motor_collection()
+    count, latest = await asyncio.gather(
+        collection.count_documents({"product": product_id}),
+        collection.find_one({"product": product_id}, {"updatedAt": 1, "_id": 0}, sort=[("updatedAt", -1)]),
+    )
+    updated_at = latest.get("updatedAt") if latest else None
+    return f"{product_id}:{count}:{updated_at.isoformat() if updated_at else '-'}"
+
+
+async def getReviewStats(*, request: Request, productId: str):
+    """Rating count, average and star histogram, revalidated with an ETag"""
+    if _invalid_object_id(productId):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid product ID")
+
+    product_id = PydanticObjectId(productId)
+    digest = hashlib.sha1((await _stats_version(product_id)).encode("utf-8")).hexdigest()[:20]
+    etag = f'W/"{digest}"'
+    # Clients keep the body but revalidate each time; unchanged stats cost a bodiless
+    # 304 without running the $group.
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in {tag.strip() for tag in if_none_match.split(",")} or if_none_match.strip() == "*":
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    summary = await _rating_summary(product_id)
+    return JSONResponse(content={"success": True, "data": {"productId": productId, **summary}}, headers=headers)
+
+
 async def createReview(*, user: User, productId: str, rating: int, title: Optional[str], comment: Optional[str]):
     """Create a new review"""
     if _invalid_object_id(productId):
@@ -103,7 +209,7 @@ async def createReview(*, user: User, productId: str, rating: int, title: Option
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="You have already reviewed this product")
     
     # Check if verified purchase
-    is_verified = await _check_verified_purchase(user.id, product.id)
+    is_verified = await hasVerifiedPurchase(user.id, product.id)
     
     review = Review(
         user=user.id,
@@ -111,6 +217,7 @@ async def createReview(*, user: User, productId: str, rating: int, title: Option
         rating=rating,
         title=title,
         comment=comment,
+        reviewerName=user.fullName,
         isVerifiedPurchase=is_verified,
         isApproved=True,  # Auto-approve, can add moderation later
     )
@@ -171,6 +278,7 @@ async def deleteReview(*, user: User, reviewId: str):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You can only delete your own reviews")
     
     await review.delete()
+    await ReviewVote.find(ReviewVote.review == review.id).delete()
     
     return {
         "success": True,
@@ -178,13 +286,55 @@ async def deleteReview(*, user: User, reviewId: str):
     }
 
 
-async def getUserReviews(*, user: User):
-    """Get all reviews by a user"""
-    reviews = await Review.find(Review.user == user.id).sort(-Review.createdAt).to_list()
-    
+async def markHelpful(*, user: User, reviewId: str):
+    """Record the user's helpful vote; repeat votes are no-ops"""
+    if _invalid_object_id(reviewId):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid review ID")
+
+    review = await Review.get(reviewId)
+    if not review or not review.isApproved or review.isDeleted:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Review not found")
+    if review.user == user.id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="You cannot vote on your own review")
+
+    try:
+        await ReviewVote(review=review.id, user=user.id).insert()
+    except DuplicateKeyError:
+        current = await Review.get(review.id)
+        return {
+            "success": True,
+            "message": "You have already marked this review as helpful",
+            "data": {
+                "id": str(review.id),
+                "helpfulCount": current.helpfulCount if current else review.helpfulCount,
+                "voted": True,
+            },
+        }
+
+    # The unique vote insert is the dedupe; the counter itself is a single atomic $inc.
+    updated = await Review.find_one(Review.id == review.id).update(
+        {"$inc": {"helpfulCount": 1}},
+        response_type=UpdateResponse.NEW_DOCUMENT,
+    )
+    helpful_count = updated.helpfulCount if updated else review.helpfulCount + 1
+
+    return {
+        "success": True,
+        "message": "Marked as helpful",
+        "data": {"id": str(review.id), "helpfulCount": helpful_count, "voted": True},
+    }
+
+
+async def getUserReviews(*, user: User, page: Optional[int] = 1, limit: Optional[int] = 10):
+    """Get a page of reviews by a user"""
+    page, limit, skip = _parse_pagination(page, limit)
+    reviews = await Review.find(Review.user == user.id).sort(-Review.createdAt).skip(skip).limit(limit).to_list()
+    total = await Review.find(Review.user == user.id).count()
+
+    products = await _products_by_id(review.product for review in reviews)
     review_list = []
     for review in reviews:
-        product = await Product.get(review.product)
+        product = products.get(review.product)
         review_list.append({
             "id": str(review.id),
             "rating": review.rating,
@@ -206,5 +356,11 @@ async def getUserReviews(*, user: User):
         "data": {
             "reviews": review_list,
             "count": len(review_list),
+            "pagination": {
+                "page": page,
+                "limit": limit,
+                "total": total,
+                "pages": (total + limit - 1) // limit,
+            },
         },
     }
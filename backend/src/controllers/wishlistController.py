@@ -1,9 +1,40 @@
 from __future__ import annotations
 
+from datetime import datetime
+from typing import List, Optional, Tuple
+
 from fastapi import HTTPException, status
 from beanie.odm.fields import PydanticObjectId
+from beanie.operators import In
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 
 from ..models import Product, User, Wishlist
+from ..services.wishlistCache import invalidateWishlist, wishlistMembership
+
+MAX_CONTAINS_PRODUCTS = 200
+
+
+class _WishlistProductView(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: PydanticObjectId = Field(alias="_id")
+    name: str
+    price: float
+    category: Optional[str] = None
+    slug: str
+    images: List[str] = Field(default_factory=list)
+    imageUrl: Optional[str] = None
+    stock: int = 0
+    isActive: bool = True
+
+    @model_validator(mode="after")
+    def fill_images(self) -> "_WishlistProductView":
+        # Older products only carry imageUrl; Product syncs it the same way.
+        if not self.images and self.imageUrl:
+            self.images = [self.imageUrl]
+        return self
 
 
 def _invalid_object_id(object_id: str) -> bool:
@@ -14,14 +45,51 @@ def _invalid_object_id(object_id: str) -> bool:
         return True
 
 
+async def _ensure_product_available(productId: str) -> PydanticObjectId:
+    if _invalid_object_id(productId):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid product ID")
+    product_id = PydanticObjectId(productId)
+    available = await Product.get_motor_collection().find_one({"_id": product_id, "isActive": True}, {"_id": 1})
+    if not available:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not available")
+    return product_id
+
+
+async def _upsert_item(user_id: PydanticObjectId, product_id: PydanticObjectId) -> Tuple[PydanticObjectId, bool]:
+    """Insert the (user, product) row if missing in one round trip; returns (id, created)."""
+    new_id = PydanticObjectId()
+    now = datetime.utcnow()
+    update = {"$setOnInsert": {"_id": new_id, "createdAt": now, "updatedAt": now}}
+    query = {"user": user_id, "product": product_id}
+    try:
+        previous = await Wishlist.get_motor_collection().find_one_and_update(
+            query, update, upsert=True, projection={"_id": 1}, return_document=ReturnDocument.BEFORE
+        )
+    except DuplicateKeyError:
+        # A concurrent request (double tap) inserted the row first.
+        previous = await Wishlist.get_motor_collection().find_one(query, {"_id": 1})
+        if previous is None:
+            raise
+    if previous is None:
+        return new_id, True
+    return previous["_id"], False
+
+
 async def getWishlist(*, user: User):
     """Get all wishlist items for a user"""
     wishlist_items = await Wishlist.find(Wishlist.user == user.id).to_list()
     
-    # Fetch product details for each wishlist item
+    # Fetch the listed products in one query, only the fields shown
+    products = {}
+    if wishlist_items:
+        found = await Product.find(
+            In(Product.id, [item.product for item in wishlist_items])
+        ).project(_WishlistProductView).to_list()
+        products = {product.id: product for product in found}
+
     items = []
     for item in wishlist_items:
-        product = await Product.get(item.product)
+        product = products.get(item.product)
         if product and product.isActive:
             items.append({
                 "id": str(item.id),
@@ -47,38 +115,16 @@ async def getWishlist(*, user: User):
 
 async def addToWishlist(*, user: User, productId: str):
     """Add a product to user's wishlist"""
-    if _invalid_object_id(productId):
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid product ID")
-    
-    product = await Product.get(productId)
-    if not product or not product.isActive:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not available")
-    
-    # Check if already in wishlist
-    existing = await Wishlist.find_one(Wishlist.user == user.id, Wishlist.product == product.id)
-    if existing:
-        return {
-            "success": True,
-            "message": "Product already in wishlist",
-            "data": {
-                "id": str(existing.id),
-                "productId": str(product.id),
-            },
-        }
-    
-    # Add to wishlist
-    wishlist_item = Wishlist(
-        user=user.id,
-        product=product.id,
-    )
-    await wishlist_item.insert()
+    product_id = await _ensure_product_available(productId)
+    item_id, created = await _upsert_item(user.id, product_id)
+    await invalidateWishlist(user.id)
     
     return {
         "success": True,
-        "message": "Added to wishlist",
+        "message": "Added to wishlist" if created else "Product already in wishlist",
         "data": {
-            "id": str(wishlist_item.id),
-            "productId": str(product.id),
+            "id": str(item_id),
+            "productId": str(product_id),
         },
     }
 
@@ -88,11 +134,12 @@ async def removeFromWishlist(*, user: User, productId: str):
     if _invalid_object_id(productId):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid product ID")
     
-    wishlist_item = await Wishlist.find_one(Wishlist.user == user.id, Wishlist.product == PydanticObjectId(productId))
-    if not wishlist_item:
+    result = await Wishlist.get_motor_collection().delete_one(
+        {"user": user.id, "product": PydanticObjectId(productId)}
+    )
+    if not result.deleted_count:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not in wishlist")
-    
-    await wishlist_item.delete()
+    await invalidateWishlist(user.id)
     
     return {
         "success": True,
@@ -105,45 +152,59 @@ async def toggleWishlist(*, user: User, productId: str):
     if _invalid_object_id(productId):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid product ID")
     
-    product = await Product.get(productId)
-    if not product or not product.isActive:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not available")
-    
-    # Check if already in wishlist
-    existing = await Wishlist.find_one(Wishlist.user == user.id, Wishlist.product == product.id)
-    
-    if existing:
-        # Remove from wishlist
-        await existing.delete()
+    # Try the removal first: if the row existed, that single delete is the whole toggle
+    result = await Wishlist.get_motor_collection().delete_one(
+        {"user": user.id, "product": PydanticObjectId(productId)}
+    )
+    if result.deleted_count:
+        await invalidateWishlist(user.id)
         return {
             "success": True,
             "message": "Removed from wishlist",
             "data": {
                 "inWishlist": False,
-                "productId": str(product.id),
+                "productId": productId,
             },
         }
-    else:
-        # Add to wishlist
-        wishlist_item = Wishlist(
-            user=user.id,
-            product=product.id,
+
+    product_id = await _ensure_product_available(productId)
+    item_id, _ = await _upsert_item(user.id, product_id)
+    await invalidateWishlist(user.id)
+    return {
+        "success": True,
+        "message": "Added to wishlist",
+        "data": {
+            "inWishlist": True,
+            "productId": str(product_id),
+            "id": str(item_id),
+        },
+    }
+
+
+async def wishlistContains(*, user: User, productIds: List[str]):
+    """Membership flags for a batch of products (e.g. hearts on a product grid)"""
+    if len(productIds) > MAX_CONTAINS_PRODUCTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_CONTAINS_PRODUCTS} product IDs per request",
         )
-        await wishlist_item.insert()
-        return {
-            "success": True,
-            "message": "Added to wishlist",
-            "data": {
-                "inWishlist": True,
-                "productId": str(product.id),
-                "id": str(wishlist_item.id),
-            },
-        }
+    invalid = [product_id for product_id in productIds if _invalid_object_id(product_id)]
+    if invalid:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid product ID: {invalid[0]}")
+
+    flags = await wishlistMembership(user.id, [PydanticObjectId(product_id) for product_id in productIds])
+    return {
+        "success": True,
+        "data": {
+            "items": flags,
+        },
+    }
 
 
 async def clearWishlist(*, user: User):
     """Clear all items from user's wishlist"""
     await Wishlist.find(Wishlist.user == user.id).delete()
+    await invalidateWishlist(user.id)
     
     return {
         "success": True,
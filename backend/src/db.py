@@ -1,18 +1,43 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
-from typing import Optional
+import time
+from typing import Dict, Optional
 
 from beanie import init_beanie
+from beanie.odm.utils.init import Initializer
 from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo.errors import ConfigurationError
 
 from .models import DOCUMENT_MODELS
+from .services.queryStats import QUERY_STATS_ENABLED, query_stats_listener
+from .services.runtimeMetrics import mongo_pool_metrics
 
 logger = logging.getLogger(__name__)
 
+# startup: build indexes before serving; background: serve first and reconcile
+# indexes in a task; manual: never at boot (run python -m src.scripts.syncIndexes).
+# In both build modes a collection whose index cannot be built (e.g. a unique index
+# over existing duplicates) is logged and skipped rather than failing the boot.
+INDEX_MODES = ("startup", "background", "manual")
+DB_INDEX_MODE = os.getenv("DB_INDEX_MODE", "startup").strip().lower()
+
 _client: Optional[AsyncIOMotorClient] = None
+_index_task: Optional[asyncio.Task] = None
+
+
+def _resolve_index_mode(index_mode: str) -> str:
+    mode = index_mode.strip().lower()
+    if mode in INDEX_MODES:
+        return mode
+    # Skipping index builds by accident would leave the unique indexes the code relies on missing.
+    logger.warning(
+        "Unknown DB_INDEX_MODE; building indexes at startup",
+        extra={"indexMode": index_mode, "allowed": list(INDEX_MODES)},
+    )
+    return "startup"
 
 
 def _resolve_database(client: AsyncIOMotorClient):
@@ -26,10 +51,11 @@ def _resolve_database(client: AsyncIOMotorClient):
     return client["online_annavaram"]
 
 
-async def connect_to_database() -> AsyncIOMotorClient:
-    global _client
+async def connect_to_database(index_mode: Optional[str] = None) -> AsyncIOMotorClient:
+    global _client, _index_task
     if _client is not None:
         return _client
+    index_mode = _resolve_index_mode(index_mode or DB_INDEX_MODE)
 
     uri = os.getenv("MONGODB_URI")
     if not uri:
@@ -39,10 +65,28 @@ async def connect_to_database() -> AsyncIOMotorClient:
         )
 
     try:
-        _client = AsyncIOMotorClient(uri)
+        # Pool stats feed /metrics; the query listener attributes each command to the
+        # current request (see middlewares.queryStats).
+        listeners = [mongo_pool_metrics]
+        if QUERY_STATS_ENABLED:
+            listeners.append(query_stats_listener)
+        started = time.perf_counter()
+        _client = AsyncIOMotorClient(uri, event_listeners=listeners)
         database = _resolve_database(_client)
-        await init_beanie(database=database, document_models=DOCUMENT_MODELS)
-        logger.info("MongoDB connection established")
+        await init_beanie(database=database, document_models=DOCUMENT_MODELS, skip_indexes=True)
+        failed_indexes = 0
+        if index_mode == "startup":
+            failed_indexes = len(DOCUMENT_MODELS) - len(await sync_indexes())
+        logger.info(
+            "MongoDB connection established",
+            extra={
+                "indexMode": index_mode,
+                "failedIndexCollections": failed_indexes,
+                "durationMs": round((time.perf_counter() - started) * 1000, 1),
+            },
+        )
+        if index_mode == "background":
+            _index_task = asyncio.create_task(_sync_indexes_in_background())
     except Exception:
         _client = None
         logger.exception("Failed to connect to MongoDB")
@@ -51,8 +95,60 @@ async def connect_to_database() -> AsyncIOMotorClient:
     return _client
 
 
+async def sync_indexes(drop_stale: bool = False) -> Dict[str, float]:
+    """Create any missing indexes declared on DOCUMENT_MODELS; returns seconds per collection.
+
+    Collections are reconciled concurrently and independently: a failure (typically
+    a unique index that existing duplicates prevent) is logged and that collection
+    is left out of the result. ``drop_stale`` also drops indexes no longer declared
+    on the model. Requires ``connect_to_database`` first.
+    """
+    initializer = Initializer(
+        database=_resolve_database(_client),
+        document_models=DOCUMENT_MODELS,
+        allow_index_dropping=drop_stale,
+    )
+
+    async def sync(model) -> Optional[float]:
+        started = time.perf_counter()
+        try:
+            await initializer.init_indexes(model, drop_stale)
+        except Exception:
+            logger.exception("Index sync failed", extra={"collection": model.get_collection_name()})
+            return None
+        return time.perf_counter() - started
+
+    durations = await asyncio.gather(*[sync(model) for model in DOCUMENT_MODELS])
+    return {
+        model.get_collection_name(): duration
+        for model, duration in zip(DOCUMENT_MODELS, durations)
+        if duration is not None
+    }
+
+
+async def _sync_indexes_in_background() -> None:
+    started = time.perf_counter()
+    synced = await sync_indexes()
+    logger.info(
+        "MongoDB index sync finished",
+        extra={
+            "collections": len(synced),
+            "failed": len(DOCUMENT_MODELS) - len(synced),
+            "durationMs": round((time.perf_counter() - started) * 1000, 1),
+        },
+    )
+
+
 async def disconnect_from_database() -> None:
-    global _client
+    global _client, _index_task
+    if _index_task is not None:
+        _index_task.cancel()
+        try:
+            await _index_task
+        except asyncio.CancelledError:
+            pass
+        _index_task = None
+
     if _client is None:
         return
 
@@ -1,15 +1,31 @@
 from __future__ import annotations
 
+from typing import Optional
+
 from fastapi import Depends, HTTPException, Request, status
 
 from ..models import User
+from ..services.accessDenylist import STATELESS_ACCESS_TOKENS, access_denylist
+from ..services.principalCache import principal_cache
 from ..services.sessionService import (
     SessionError,
+    ensureSessionActive,
     validateSession,
     verifyAccessToken,
 )
 
 
+async def _load_stateless_principal(payload: dict) -> Optional[User]:
+    if access_denylist.isRevoked(payload["sid"], payload["sub"], payload.get("iat", 0)):
+        raise SessionError("Session revoked", status=401)
+    user = principal_cache.getUser(payload["sub"])
+    if user is None:
+        user = await User.get(payload["sub"])
+        if user and user.isActive:
+            principal_cache.putUser(user)
+    return user
+
+
 async def authenticate(request: Request):
     authorization = request.headers.get("Authorization", "")
     token = authorization.removeprefix("Bearer ").strip() if authorization.startswith("Bearer ") else None
@@ -18,8 +34,16 @@ async def authenticate(request: Request):
 
     try:
         payload = verifyAccessToken(token)
-        session = await validateSession(payload["sid"], payload["sub"])
-        user = await User.get(payload["sub"])
+        if STATELESS_ACCESS_TOKENS:
+            session, user = None, await _load_stateless_principal(payload)
+        elif cached := principal_cache.get(payload["sid"], payload["sub"]):
+            session, user = cached
+            ensureSessionActive(session)
+        else:
+            session = await validateSession(payload["sid"], payload["sub"])
+            user = await User.get(payload["sub"])
+            if user and user.isActive:
+                principal_cache.put(session, user)
     except SessionError as exc:
         raise HTTPException(status_code=exc.status, detail=str(exc)) from exc
 
@@ -30,10 +54,11 @@ async def authenticate(request: Request):
 
     request.state.auth = {
         "userId": str(user.id),
-        "sessionId": str(session.id),
+        "sessionId": payload["sid"],
         "role": user.role,
     }
     request.state.user = user
+    # None in stateless mode: the session document is never loaded.
     request.state.session = session
     return user
 
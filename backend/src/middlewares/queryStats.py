@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import logging
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..services.queryStats import QUERY_WARN_COUNT, QUERY_WARN_REPEAT, beginRequest, endRequest
+
+logger = logging.getLogger("queries")
+
+
+class QueryStatsMiddleware:
+    """
+    Counts the Mongo commands each request issues, reports them in a
+    ``Server-Timing`` header and warns about heavy or N+1-shaped requests.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats, token = beginRequest()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.serverTiming().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        method = scope.get("method", "")
+        path = scope.get("path", "")
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            endRequest(token, method, path, stats)
+            repeated = stats.repeated(QUERY_WARN_REPEAT)
+            if stats.count > QUERY_WARN_COUNT or repeated:
+                logger.warning(
+                    "Request issued %s Mongo commands (%.1f ms)%s",
+                    stats.count,
+                    stats.duration_ms,
+                    "; possible N+1" if repeated else "",
+                    extra={
+                        "method": method,
+                        "path": path,
+                        "queryCount": stats.count,
+                        "queryMs": round(stats.duration_ms, 1),
+                        "repeatedQueries": [f"{count}x {pattern}" for pattern, count in repeated[:5]],
+                    },
+                )
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import json
+from typing import Iterable, Optional, Tuple, Union
+
+from fastapi import HTTPException, Request, status
+
+from ..services.clientAddress import clientIp
+from ..services.rateLimiter import RATE_LIMIT_ENABLED, hitRateLimit
+
+
+async def _body_email(request: Request) -> Optional[str]:
+    try:
+        payload = json.loads(await request.body() or b"{}")
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if not isinstance(payload, dict):
+        return None
+    email = payload.get("email")
+    return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+
+async def _key_value(request: Request, dimension: str) -> Optional[str]:
+    if dimension == "ip":
+        return clientIp(request) or "unknown"
+    if dimension == "email":
+        return await _body_email(request)
+    return None
+
+
+def rateLimit(rule: str, *, limit: int, windowSeconds: int, keys: Iterable[Union[str, Tuple[str, ...]]] = ("ip",)):
+    """
+    Build a dependency enforcing ``limit`` requests per ``windowSeconds`` for each
+    of ``keys`` ("ip" and/or "email" from the JSON body). A tuple such as
+    ``("email", "ip")`` counts the combination, so one client cannot use up the
+    allowance of an email for everyone else. Runs before the handler, so rejected
+    requests never reach bcrypt or the database.
+    """
+    dimensions = [key if isinstance(key, tuple) else (key,) for key in keys]
+
+    async def dependency(request: Request) -> None:
+        if not RATE_LIMIT_ENABLED:
+            return
+        values = []
+        for parts in dimensions:
+            resolved = [await _key_value(request, part) for part in parts]
+            if all(resolved):
+                values.append(("+".join(parts), "|".join(resolved)))
+        for dimension, value in values:
+            result = await hitRateLimit(f"{rule}:{dimension}", value, limit=limit, windowSeconds=windowSeconds)
+            if not result.allowed:
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many requests. Please try again later.",
+                    headers={"Retry-After": str(result.retryAfter)},
+                )
+
+    return dependency
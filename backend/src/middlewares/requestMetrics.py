@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..services.metrics import registerCounter, registerHistogram
+
+_requests = registerCounter("http_requests_total", "HTTP requests by method, route template and status.")
+_latency = registerHistogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by method, route template and status, until the response is fully sent.",
+)
+
+# Requests that matched no route share one label so scanners cannot explode the series count.
+_UNMATCHED_ROUTE = "unmatched"
+
+
+def _route_template(scope: Scope) -> str:
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    regex = getattr(route, "path_regex", None)
+    # An empty template is a real route: @router.get("") mounted at its prefix (e.g. /metrics).
+    if template is None or regex is None:
+        return _UNMATCHED_ROUTE
+    # Newer FastAPI keeps included routers nested, so the matched route's path is
+    # relative to its router prefix; recover the prefix from the request path.
+    path = scope.get("path", "")
+    starts = [index for index, char in enumerate(path) if char == "/"] + [len(path)]
+    for start in starts:
+        if regex.match(path[start:]):
+            return path[:start] + template
+    return template
+
+
+class RequestMetricsMiddleware:
+    """Records request counts and latency histograms keyed by route template (``/api/products/{product_id}``)."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            labels = {"method": scope.get("method", ""), "route": _route_template(scope), "status": str(status_code)}
+            _requests.inc(**labels)
+            _latency.observe(time.perf_counter() - started, **labels)
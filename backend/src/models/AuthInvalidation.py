@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from typing import Literal
+
+from pymongo import IndexModel
+
+from .base import TimeStampedDocument
+
+
+class AuthInvalidation(TimeStampedDocument):
+    """Cross-worker cache invalidation event; ``wishlist`` events reuse the same bus."""
+
+    scope: Literal["session", "user", "wishlist"]
+    key: str
+
+    class Settings:
+        name = "auth_invalidations"
+        use_revision = False
+        indexes = [
+            IndexModel([("createdAt", 1)], expireAfterSeconds=3600),
+        ]
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+from pymongo import IndexModel
+
+from .base import TimeStampedDocument
+
+
+class DeliveryAttempt(BaseModel):
+    at: datetime
+    worker: str
+    error: Optional[str] = None
+
+
+class EmailOutbox(TimeStampedDocument):
+    kind: str = "generic"
+    to: str
+    subject: str
+    text: Optional[str] = None
+    html: Optional[str] = None
+    status: Literal["pending", "sending", "sent", "failed"] = "pending"
+    attempts: int = 0
+    attemptLog: List[DeliveryAttempt] = Field(default_factory=list)
+    nextAttemptAt: datetime = Field(default_factory=datetime.utcnow)
+    leaseOwner: Optional[str] = None
+    leaseExpiresAt: Optional[datetime] = None
+    lastError: Optional[str] = None
+    sentAt: Optional[datetime] = None
+    # Set once the message is sent or abandoned; the body is cleared at the same time.
+    expiresAt: Optional[datetime] = None
+
+    class Settings:
+        name = "email_outbox"
+        use_revision = False
+        indexes = [
+            IndexModel([("status", 1), ("nextAttemptAt", 1)]),
+            # Sent and failed rows are kept (without their body) for support lookups, then dropped.
+            IndexModel([("expiresAt", 1)], expireAfterSeconds=0),
+        ]
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from pymongo import IndexModel
+
+from .base import TimeStampedDocument
+
+
+class JobLease(TimeStampedDocument):
+    """Which worker may run a periodic job until ``expiresAt``; one row per job."""
+
+    name: str
+    owner: str
+    expiresAt: datetime
+
+    class Settings:
+        name = "job_leases"
+        use_revision = False
+        indexes = [IndexModel([("name", 1)], unique=True)]
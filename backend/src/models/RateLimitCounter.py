@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from pymongo import IndexModel
+
+from .base import TimeStampedDocument
+
+
+class RateLimitCounter(TimeStampedDocument):
+    key: str
+    window: int  # window start, in seconds since the epoch
+    hits: int = 0
+    expiresAt: datetime
+
+    class Settings:
+        name = "rate_limits"
+        use_revision = False
+        indexes = [
+            IndexModel([("key", 1), ("window", 1)], unique=True),
+            IndexModel([("expiresAt", 1)], expireAfterSeconds=0),
+        ]
@@ -16,6 +16,9 @@ class Review(TimeStampedDocument):
     
     product: Indexed(PydanticObjectId)  # type: ignore[assignment]
     productId: Optional[PydanticObjectId] = None
+
+    # Reviewer display name, copied from User.fullName so listings need no user lookup
+    reviewerName: Optional[str] = None
     
     rating: int = Field(ge=1, le=5)  # 1-5 stars
     title: Optional[str] = Field(default=None, max_length=100)
@@ -55,5 +58,8 @@ class Review(TimeStampedDocument):
             [("productId", 1), ("userId", 1)],  # Alternative naming
             [("product", 1), ("createdAt", -1)],  # Sort by recent for product
             [("user", 1), ("createdAt", -1)],  # Sort by recent for user
+            [("product", 1), ("helpfulCount", -1), ("createdAt", -1)],  # Sort by most helpful for product
             [("isApproved", 1)],  # Filter by approval status
+            [("product", 1), ("isApproved", 1), ("rating", 1)],  # Covers the rating summary $group
+            [("product", 1), ("updatedAt", -1)],  # Newest change per product, for the stats ETag
         ]
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from beanie.odm.fields import PydanticObjectId
+from pymongo import IndexModel
+
+from .base import TimeStampedDocument
+
+
+class ReviewVote(TimeStampedDocument):
+    """A user's "helpful" vote on a review; the unique index makes voting idempotent."""
+
+    review: PydanticObjectId
+    user: PydanticObjectId
+
+    class Settings:
+        name = "review_votes"
+        use_revision = False
+        indexes = [
+            IndexModel([("review", 1), ("user", 1)], unique=True),
+        ]
@@ -27,6 +27,11 @@ class Session(TimeStampedDocument):
                 [("expiresAt", 1)],
                 expireAfterSeconds=0,
                 partialFilterExpression={"revokedAt": None},
-            )
+            ),
+            # Serves session compaction; the TTL index above skips revoked sessions.
+            IndexModel(
+                [("revokedAt", 1)],
+                partialFilterExpression={"revokedAt": {"$type": "date"}},
+            ),
         ]
 
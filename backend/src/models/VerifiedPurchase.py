@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from beanie.odm.fields import PydanticObjectId
+from pymongo import IndexModel
+
+from .base import TimeStampedDocument
+
+
+class VerifiedPurchase(TimeStampedDocument):
+    """One row per (user, product) bought in an order in ``PURCHASED_ORDER_STATUSES``."""
+
+    user: PydanticObjectId
+    product: PydanticObjectId
+    order: Optional[PydanticObjectId] = None  # oldest purchasing order containing the product
+    purchasedAt: Optional[datetime] = None
+
+    class Settings:
+        name = "verified_purchases"
+        use_revision = False
+        indexes = [
+            IndexModel([("user", 1), ("product", 1)], unique=True),
+            # Finds the rows to re-point when their order is cancelled or rolled back.
+            IndexModel([("order", 1)]),
+        ]
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from beanie.odm.fields import PydanticObjectId
+from pymongo import IndexModel
 
 from .base import TimeStampedDocument
 
@@ -13,5 +14,8 @@ class Wishlist(TimeStampedDocument):
         name = "wishlists"
         use_revision = False
         indexes = [
-            [("user", 1), ("product", 1)],  # Compound index to ensure uniqueness per user-product
+            # One row per user-product; adds and toggles rely on it to stay idempotent.
+            # Named apart from the old non-unique user_1_product_1 index so both can
+            # coexist until python -m src.scripts.migrateWishlistIndex dedupes and drops it.
+            IndexModel([("user", 1), ("product", 1)], unique=True, name="user_product_unique"),
         ]
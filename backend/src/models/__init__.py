@@ -8,6 +8,12 @@ from .Payment import Payment
 from .Session import Session
 from .Wishlist import Wishlist
 from .Review import Review
+from .ReviewVote import ReviewVote
+from .AuthInvalidation import AuthInvalidation
+from .EmailOutbox import EmailOutbox
+from .RateLimitCounter import RateLimitCounter
+from .VerifiedPurchase import VerifiedPurchase
+from .JobLease import JobLease
 
 DOCUMENT_MODELS = [
     User,
@@ -20,6 +26,12 @@ DOCUMENT_MODELS = [
     Session,
     Wishlist,
     Review,
+    ReviewVote,
+    AuthInvalidation,
+    EmailOutbox,
+    RateLimitCounter,
+    VerifiedPurchase,
+    JobLease,
 ]
 
 __all__ = [
@@ -31,5 +43,11 @@ __all__ = [
     "OrderItem",
     "Payment",
     "Session",
+    "ReviewVote",
+    "AuthInvalidation",
+    "EmailOutbox",
+    "RateLimitCounter",
+    "VerifiedPurchase",
+    "JobLease",
     "DOCUMENT_MODELS",
 ]
@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Optional
 
-from beanie import Document, Insert, Replace, SaveChanges, before_event
+from beanie import Document, Insert, Replace, Save, SaveChanges, before_event
 
 
 class TimeStampedDocument(Document):
@@ -17,7 +17,7 @@ class TimeStampedDocument(Document):
             self.createdAt = now
         self.updatedAt = now
 
-    @before_event(Replace)
-    @before_event(SaveChanges)
+    # One decorator: stacked before_event calls overwrite each other's event list.
+    @before_event(Replace, Save, SaveChanges)
     async def set_updated_timestamp(self):
         self.updatedAt = datetime.utcnow()
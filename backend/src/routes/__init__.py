@@ -1,6 +1,7 @@
 from .admin import router as admin_router
 from .auth import router as auth_router
 from .cart import router as cart_router
+from .metrics import router as metrics_router
 from .orders import router as orders_router
 from .payments import router as payments_router
 from .products import router as products_router
@@ -12,6 +13,7 @@ __all__ = [
     "admin_router",
     "auth_router",
     "cart_router",
+    "metrics_router",
     "orders_router",
     "payments_router",
     "products_router",
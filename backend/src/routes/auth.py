@@ -2,15 +2,43 @@ from __future__ import annotations
 
 from typing import Optional
 
-from fastapi import APIRouter, BackgroundTasks, Depends, Request, Response
+from fastapi import APIRouter, Depends, Request, Response
 from pydantic import BaseModel, EmailStr, Field
 
 from ..controllers import authController
 from ..middlewares.auth import authenticate
+from ..middlewares.rateLimit import rateLimit
 from ..models import User
+from ..services.otpService import OTP_MAX_PER_WINDOW, OTP_RATE_LIMIT_MINUTES
+from ..services.rateLimiter import RateLimitRule, ruleFromEnv
 
 router = APIRouter()
 
+_otp_window_seconds = OTP_RATE_LIMIT_MINUTES * 60
+_LOGIN_IP = ruleFromEnv("RATE_LIMIT_LOGIN_IP", "30/60")
+# Keyed on (email, IP): a per-email counter would let anyone lock a user out by
+# failing their login, and the per-IP rule already bounds password spraying.
+_LOGIN_EMAIL_IP = ruleFromEnv("RATE_LIMIT_LOGIN_EMAIL_IP", "10/900")
+_SIGNUP_IP = ruleFromEnv("RATE_LIMIT_SIGNUP_IP", "20/3600")
+_OTP_SEND_IP = ruleFromEnv("RATE_LIMIT_OTP_SEND_IP", f"20/{_otp_window_seconds}")
+# Per-email OTP sends follow OTP_MAX_PER_WINDOW / OTP_RATE_LIMIT_MINUTES.
+_OTP_SEND_EMAIL = RateLimitRule(OTP_MAX_PER_WINDOW, _otp_window_seconds)
+_OTP_VERIFY = ruleFromEnv("RATE_LIMIT_OTP_VERIFY", "30/900")
+_REFRESH_IP = ruleFromEnv("RATE_LIMIT_REFRESH_IP", "60/60")
+_GOOGLE_IP = ruleFromEnv("RATE_LIMIT_GOOGLE_IP", "20/60")
+
+
+def _limit(rule: str, config: RateLimitRule, keys: tuple):
+    return Depends(rateLimit(rule, limit=config.limit, windowSeconds=config.windowSeconds, keys=keys))
+
+
+login_limits = [_limit("login", _LOGIN_IP, ("ip",)), _limit("login", _LOGIN_EMAIL_IP, (("email", "ip"),))]
+signup_limits = [_limit("signup", _SIGNUP_IP, ("ip",))]
+otp_send_limits = [_limit("otp-send", _OTP_SEND_IP, ("ip",)), _limit("otp-send", _OTP_SEND_EMAIL, ("email",))]
+otp_verify_limits = [_limit("otp-verify", _OTP_VERIFY, ("ip", "email"))]
+refresh_limits = [_limit("refresh", _REFRESH_IP, ("ip",))]
+google_limits = [_limit("google", _GOOGLE_IP, ("ip",))]
+
 
 class SignupPayload(BaseModel):
     fullName: str = Field(..., min_length=1)
@@ -68,19 +96,18 @@ class VerifyEmailChangePayload(BaseModel):
     otp: str = Field(..., min_length=4, max_length=8)
 
 
-@router.post("/signup")
-async def signup(payload: SignupPayload, response: Response, background: BackgroundTasks):
+@router.post("/signup", dependencies=signup_limits)
+async def signup(payload: SignupPayload, response: Response):
     return await authController.signup(
         fullName=payload.fullName,
         email=payload.email,
         password=payload.password,
         phone=payload.phone,
         response=response,
-        background=background,
     )
 
 
-@router.post("/login")
+@router.post("/login", dependencies=login_limits)
 async def login(payload: LoginPayload, request: Request, response: Response):
     return await authController.login(
         email=payload.email,
@@ -90,7 +117,7 @@ async def login(payload: LoginPayload, request: Request, response: Response):
     )
 
 
-@router.post("/refresh")
+@router.post("/refresh", dependencies=refresh_limits)
 async def refresh(request: Request, response: Response, payload: Optional[RefreshPayload] = None):
     refresh_token = payload.refreshToken if payload else None
     return await authController.refreshSessionHandler(
@@ -100,7 +127,7 @@ async def refresh(request: Request, response: Response, payload: Optional[Refres
     )
 
 
-@router.post("/verify-email")
+@router.post("/verify-email", dependencies=otp_verify_limits)
 async def verify_email(payload: OtpPayload, request: Request, response: Response):
     return await authController.verifyEmail(
         email=payload.email,
@@ -110,25 +137,23 @@ async def verify_email(payload: OtpPayload, request: Request, response: Response
     )
 
 
-@router.post("/resend-otp")
-async def resend_otp(payload: ResendPayload, response: Response, background: BackgroundTasks):
+@router.post("/resend-otp", dependencies=otp_send_limits)
+async def resend_otp(payload: ResendPayload, response: Response):
     return await authController.resendOtp(
         email=payload.email,
         response=response,
-        background=background,
     )
 
 
-@router.post("/forgot-password")
-async def request_password_reset(payload: ResendPayload, response: Response, background: BackgroundTasks):
+@router.post("/forgot-password", dependencies=otp_send_limits)
+async def request_password_reset(payload: ResendPayload, response: Response):
     return await authController.requestPasswordReset(
         email=payload.email,
         response=response,
-        background=background,
     )
 
 
-@router.post("/reset-password")
+@router.post("/reset-password", dependencies=otp_verify_limits)
 async def reset_password(payload: ResetPayload, request: Request, response: Response):
     return await authController.resetPassword(
         email=payload.email,
@@ -181,9 +206,9 @@ async def update_phone(payload: UpdatePhonePayload, request: Request, user: User
 
 
 @router.post("/email/request-change")
-async def request_email_change(payload: RequestEmailChangePayload, request: Request, background: BackgroundTasks, user: User = Depends(authenticate)):
+async def request_email_change(payload: RequestEmailChangePayload, request: Request, user: User = Depends(authenticate)):
     """Request OTP to change email address."""
-    return await authController.requestEmailChangeOtp(request=request, newEmail=payload.newEmail, background=background)
+    return await authController.requestEmailChangeOtp(request=request, newEmail=payload.newEmail)
 
 
 @router.post("/email/verify-change")
@@ -196,7 +221,7 @@ class GoogleAuthPayload(BaseModel):
     idToken: str = Field(..., min_length=1, description="Google ID token from frontend")
 
 
-@router.post("/google")
+@router.post("/google", dependencies=google_limits)
 async def google_auth(payload: GoogleAuthPayload, request: Request, response: Response):
     """
     Authenticate with Google ID token.
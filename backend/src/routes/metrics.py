@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from ..middlewares.auth import requireAdmin
+from ..models import User
+from ..services.metrics import renderMetrics
+
+router = APIRouter()
+
+
+@router.get("", response_class=PlainTextResponse)
+async def metrics(admin: User = Depends(requireAdmin)):
+    """Prometheus text exposition of in-process counters."""
+    return PlainTextResponse(renderMetrics(), media_type="text/plain; version=0.0.4")
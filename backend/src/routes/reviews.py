@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from pydantic import BaseModel, Field
 
 from ..controllers import reviewController
@@ -26,9 +26,15 @@ class ReviewUpdatePayload(BaseModel):
 
 
 @router.get("/products/{product_id}")
-async def get_product_reviews(product_id: str, page: int = 1, limit: int = 10):
-    """Get all reviews for a product"""
-    return await reviewController.listReviews(productId=product_id, page=page, limit=limit)
+async def get_product_reviews(product_id: str, page: int = 1, limit: int = 10, sortBy: str = "recent"):
+    """Get all reviews for a product (sortBy: recent | helpful)"""
+    return await reviewController.listReviews(productId=product_id, page=page, limit=limit, sortBy=sortBy)
+
+
+@router.get("/products/{product_id}/stats")
+async def get_product_review_stats(product_id: str, request: Request):
+    """Get rating count, average and 1-5 star histogram for a product"""
+    return await reviewController.getReviewStats(request=request, productId=product_id)
 
 
 @router.post("/")
@@ -55,6 +61,12 @@ async def update_review(review_id: str, payload: ReviewUpdatePayload, user: User
     )
 
 
+@router.post("/{review_id}/helpful")
+async def mark_review_helpful(review_id: str, user: User = Depends(authenticate)):
+    """Mark a review as helpful (once per user)"""
+    return await reviewController.markHelpful(user=user, reviewId=review_id)
+
+
 @router.delete("/{review_id}")
 async def delete_review(review_id: str, user: User = Depends(authenticate)):
     """Delete a review"""
@@ -63,6 +75,6 @@ async def delete_review(review_id: str, user: User = Depends(authenticate)):
 
 @router.get("/my-reviews", include_in_schema=True)
 @router.get("/my-reviews/", include_in_schema=False)
-async def get_my_reviews(user: User = Depends(authenticate)):
-    """Get all reviews by the current user"""
-    return await reviewController.getUserReviews(user=user)
+async def get_my_reviews(page: int = 1, limit: int = 10, user: User = Depends(authenticate)):
+    """Get a page of reviews by the current user"""
+    return await reviewController.getUserReviews(user=user, page=page, limit=limit)
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import List
+
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
 
@@ -14,6 +16,10 @@ class WishlistItemPayload(BaseModel):
     productId: str
 
 
+class WishlistContainsPayload(BaseModel):
+    productIds: List[str]
+
+
 @router.get("/")
 async def get_wishlist(user: User = Depends(authenticate)):
     """Get all items in user's wishlist"""
@@ -32,6 +38,12 @@ async def remove_from_wishlist(product_id: str, user: User = Depends(authenticat
     return await wishlistController.removeFromWishlist(user=user, productId=product_id)
 
 
+@router.post("/contains")
+async def wishlist_contains(payload: WishlistContainsPayload, user: User = Depends(authenticate)):
+    """Check which of the given products are in the wishlist"""
+    return await wishlistController.wishlistContains(user=user, productIds=payload.productIds)
+
+
 @router.post("/toggle")
 async def toggle_wishlist(payload: WishlistItemPayload, user: User = Depends(authenticate)):
     """Toggle product in wishlist (add if not present, remove if present)"""
@@ -0,0 +1,110 @@
+"""
+Build the verified_purchases index from existing orders.
+
+New paid orders are indexed as they are paid, but orders the admin backend
+moves to payment_confirmed, dispatched, ... (or back out of those statuses) are
+not seen by this service. This first removes rows whose order is no longer in
+PURCHASED_ORDER_STATUSES, then indexes every order that is, whichever backend
+set its status. Run it after deploying, or periodically; it is idempotent.
+Review creation also confirms rows against the orders, so a stale index only
+costs extra reads until this runs.
+
+    python -m src.scripts.backfillVerifiedPurchases --batch-size 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from beanie.odm.fields import PydanticObjectId
+from beanie.operators import In
+from dotenv import load_dotenv
+
+from ..db import connect_to_database, disconnect_from_database
+from ..models import Order, OrderItem, VerifiedPurchase
+from ..services.purchaseService import PURCHASED_ORDER_STATUSES, orderProductIds, upsertPurchases
+
+ENV_PATH = Path(__file__).resolve().parents[2] / ".env"
+if ENV_PATH.exists():
+    load_dotenv(ENV_PATH)
+
+
+async def _flush(orders: List[Order]) -> int:
+    by_order: Dict[PydanticObjectId, List[OrderItem]] = {}
+    async for item in OrderItem.find(In(OrderItem.order, [order.id for order in orders])):
+        by_order.setdefault(item.order, []).append(item)
+    pairs = []
+    for order in orders:
+        purchased_at = order.createdAt
+        for product_id in orderProductIds(order, by_order.get(order.id, [])):
+            pairs.append((order.user, product_id, order.id, purchased_at))
+    return await upsertPurchases(pairs)
+
+
+async def _prune_batch(rows: List[dict]) -> int:
+    order_ids = list({row.get("order") for row in rows if row.get("order") is not None})
+    live = set(
+        await Order.get_motor_collection().distinct(
+            "_id", {"_id": {"$in": order_ids}, "status": {"$in": PURCHASED_ORDER_STATUSES}}
+        )
+    )
+    stale = [row["_id"] for row in rows if row.get("order") not in live]
+    if stale:
+        await VerifiedPurchase.get_motor_collection().delete_many({"_id": {"$in": stale}})
+    return len(stale)
+
+
+async def _prune(batch_size: int) -> int:
+    """Drop rows whose order was cancelled, rolled back or deleted; the rebuild pass re-adds any pair bought again."""
+    removed = 0
+    batch: List[dict] = []
+    async for row in VerifiedPurchase.get_motor_collection().find({}, {"order": 1}):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            removed += await _prune_batch(batch)
+            batch = []
+    if batch:
+        removed += await _prune_batch(batch)
+    return removed
+
+
+async def run(args) -> None:
+    await connect_to_database()
+    started = time.perf_counter()
+    scanned = 0
+    inserted = 0
+    try:
+        removed = await _prune(args.batch_size)
+        batch: List[Order] = []
+        # Oldest first, so each pair keeps the first order it was bought in.
+        async for order in Order.find(In(Order.status, PURCHASED_ORDER_STATUSES)).sort(+Order.createdAt):
+            batch.append(order)
+            if len(batch) >= args.batch_size:
+                inserted += await _flush(batch)
+                scanned += len(batch)
+                batch = []
+        if batch:
+            inserted += await _flush(batch)
+            scanned += len(batch)
+        total = await VerifiedPurchase.find_all().count()
+    finally:
+        await disconnect_from_database()
+
+    print(
+        f"Scanned {scanned} orders in {time.perf_counter() - started:.2f}s; removed {removed} stale rows, "
+        f"{inserted} new (user, product) pairs, {total} in the index"
+    )
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Rebuild the verified-purchase index from the orders' current statuses.")
+    parser.add_argument("--batch-size", type=int, default=500, help="Orders (or index rows when pruning) per batch.")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
@@ -0,0 +1,74 @@
+"""
+Time-to-first-request benchmark.
+
+Starts the API in a fresh uvicorn process for each DB_INDEX_MODE and measures
+the time from process spawn until ``GET /api/products?limit=1`` first answers
+200 (uvicorn only accepts connections once the lifespan startup has finished).
+
+    python -m src.scripts.coldStartBench --runs 5
+    python -m src.scripts.coldStartBench --modes startup background --port 4100
+
+Uses the database from MONGODB_URI; nothing is written apart from the indexes
+the app itself creates.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+INDEX_MODES = ("startup", "background", "manual")
+
+
+def _time_to_first_request(mode: str, port: int, timeout: float) -> float:
+    env = dict(os.environ, DB_INDEX_MODE=mode, LOG_LEVEL="WARNING")
+    url = f"http://127.0.0.1:{port}/api/products?limit=1"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.server:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"server exited with code {process.returncode} (DB_INDEX_MODE={mode})")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.01)
+        raise RuntimeError(f"no response within {timeout:.0f}s (DB_INDEX_MODE={mode})")
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def run(args) -> None:
+    print(f"{'mode':<12} {'median ms':>10} {'min ms':>10} {'max ms':>10}")
+    for mode in args.modes:
+        samples = [_time_to_first_request(mode, args.port, args.timeout) * 1000 for _ in range(args.runs)]
+        print(f"{mode:<12} {statistics.median(samples):>10.0f} {min(samples):>10.0f} {max(samples):>10.0f}")
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Measure API time-to-first-request per DB_INDEX_MODE.")
+    parser.add_argument("--modes", nargs="+", choices=INDEX_MODES, default=list(INDEX_MODES))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=4100)
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for the first response.")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    run(parse_args())
@@ -0,0 +1,91 @@
+"""
+Remove long-revoked sessions.
+
+The sessions TTL index only applies to non-revoked sessions, so logouts and
+password resets leave their rows (and unique refresh-hash index entries)
+behind. This deletes them in batches and prints the collection size before
+and after.
+
+    python -m src.scripts.compactSessions --retention-days 7 --batch-size 1000
+    python -m src.scripts.compactSessions --dry-run
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from pathlib import Path
+from typing import List, Optional
+
+from dotenv import load_dotenv
+
+ENV_PATH = Path(__file__).resolve().parents[2] / ".env"
+if ENV_PATH.exists():
+    load_dotenv(ENV_PATH)
+
+
+def _format_bytes(value: Optional[int]) -> str:
+    if value is None:
+        return "n/a"
+    if value < 1024:
+        return f"{value} B"
+    size = float(value)
+    for unit in ("KiB", "MiB", "GiB"):
+        size /= 1024
+        if size < 1024:
+            break
+    return f"{size:.1f} {unit}"
+
+
+def _describe(stats: dict) -> str:
+    return (
+        f"{stats['count']} documents, data {_format_bytes(stats['size'])}, "
+        f"indexes {_format_bytes(stats['totalIndexSize'])}"
+    )
+
+
+async def run(args) -> None:
+    from ..db import connect_to_database, disconnect_from_database
+    from ..services.sessionCompaction import compactSessions
+
+    await connect_to_database()
+    try:
+        report = await compactSessions(
+            retentionDays=args.retention_days,
+            batchSize=args.batch_size,
+            pauseSeconds=args.pause,
+            dryRun=args.dry_run,
+        )
+    finally:
+        await disconnect_from_database()
+
+    print(f"Cutoff: revoked before {report['cutoff'].isoformat()}")
+    print(f"Before: {_describe(report['before'])}")
+    if args.dry_run:
+        print(f"Dry run: {report['matched']} sessions would be deleted")
+        return
+    print(f"Deleted {report['deleted']} sessions in {report['batches']} batches")
+    print(f"After:  {_describe(report['after'])}")
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Delete long-revoked sessions in batches.")
+    parser.add_argument("--retention-days", type=float, default=None, help="Defaults to SESSION_RETENTION_DAYS.")
+    parser.add_argument("--batch-size", type=int, default=None, help="Defaults to SESSION_COMPACTION_BATCH_SIZE.")
+    parser.add_argument("--pause", type=float, default=None, help="Seconds to sleep between batches.")
+    parser.add_argument("--dry-run", action="store_true", help="Only count matching sessions.")
+    args = parser.parse_args(argv)
+
+    from ..services import sessionCompaction
+
+    if args.retention_days is None:
+        args.retention_days = sessionCompaction.SESSION_RETENTION_DAYS
+    if args.batch_size is None:
+        args.batch_size = sessionCompaction.SESSION_COMPACTION_BATCH_SIZE
+    if args.pause is None:
+        args.pause = sessionCompaction.SESSION_COMPACTION_PAUSE_SECONDS
+    return args
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
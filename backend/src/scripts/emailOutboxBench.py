@@ -0,0 +1,104 @@
+"""
+Email outbox throughput benchmark.
+
+Starts a local aiosmtpd server as the SMTP stand-in, fills the outbox with
+messages and drains it with several competing delivery workers, reporting
+sustained emails per second and checking nothing was sent twice.
+
+    pip install aiosmtpd
+    python -m src.scripts.emailOutboxBench --messages 2000 --workers 4
+
+Uses the database from MONGODB_URI; only documents created by this run are
+touched.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import time
+from collections import Counter
+from pathlib import Path
+from typing import List, Optional
+
+from dotenv import load_dotenv
+
+ENV_PATH = Path(__file__).resolve().parents[2] / ".env"
+if ENV_PATH.exists():
+    load_dotenv(ENV_PATH)
+
+
+class _RecordingHandler:
+    def __init__(self):
+        self.recipients: Counter = Counter()
+
+    async def handle_DATA(self, server, session, envelope):
+        for rcpt in envelope.rcpt_tos:
+            self.recipients[rcpt] += 1
+        return "250 Message accepted"
+
+
+async def run(args) -> None:
+    from aiosmtpd.controller import Controller
+
+    handler = _RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=args.smtp_port)
+    controller.start()
+    os.environ.update(
+        SMTP_HOST="127.0.0.1",
+        SMTP_PORT=str(args.smtp_port),
+        SMTP_STARTTLS="false",
+        SMTP_FROM="bench@kanavindu.local",
+        SMTP_POOL_SIZE=str(args.pool_size),
+    )
+
+    from ..db import connect_to_database, disconnect_from_database
+    from ..models import EmailOutbox
+    from ..services import emailOutbox, mailer
+
+    await connect_to_database()
+    run_tag = f"bench-{int(time.time())}"
+    try:
+        entries = [
+            EmailOutbox(kind=run_tag, to=f"user{i}@bench.local", subject="Benchmark", text="Namaste!")
+            for i in range(args.messages)
+        ]
+        started = time.perf_counter()
+        await EmailOutbox.insert_many(entries)
+        print(f"Enqueued {args.messages} messages in {time.perf_counter() - started:.2f}s")
+
+        async def worker(worker_id: str) -> None:
+            while await emailOutbox.deliverBatch(worker_id, args.batch_size):
+                pass
+
+        started = time.perf_counter()
+        await asyncio.gather(*[worker(f"bench-worker-{n}") for n in range(args.workers)])
+        elapsed = time.perf_counter() - started
+
+        sent = await EmailOutbox.find(EmailOutbox.kind == run_tag, EmailOutbox.status == "sent").count()
+        duplicates = sum(1 for count in handler.recipients.values() if count > 1)
+        print(
+            f"Delivered {sent}/{args.messages} in {elapsed:.2f}s -> {sent / elapsed:.1f} emails/s "
+            f"({args.workers} workers, batch {args.batch_size}, SMTP pool {args.pool_size})"
+        )
+        print(f"SMTP sessions opened: {mailer._connections_opened.value():g}, duplicate deliveries: {duplicates}")
+    finally:
+        await EmailOutbox.find(EmailOutbox.kind == run_tag).delete()
+        await mailer.stopMailer()
+        await disconnect_from_database()
+        controller.stop()
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Measure sustained email outbox throughput.")
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=4, help="Competing delivery loops (simulated app workers).")
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--pool-size", type=int, default=4, help="SMTP connections per process.")
+    parser.add_argument("--smtp-port", type=int, default=8025)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
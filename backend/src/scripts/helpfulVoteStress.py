@@ -0,0 +1,93 @@
+"""
+Concurrency check for helpful votes.
+
+Creates throwaway voters, then fires every vote at once through the API, with
+each voter voting ``--repeat`` times. Passes only if the review's helpfulCount
+equals the number of distinct voters and matches the review_votes rows.
+
+    python -m src.scripts.helpfulVoteStress --voters 300 --repeat 2
+
+Uses the database from MONGODB_URI; everything created by the run is removed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import List, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+ENV_PATH = Path(__file__).resolve().parents[2] / ".env"
+if ENV_PATH.exists():
+    load_dotenv(ENV_PATH)
+
+
+async def run(args) -> bool:
+    from ..models import Product, Review, ReviewVote, Session, User
+    from ..server import app
+    from ..services.sessionService import createSession
+
+    tag = f"vote-stress-{int(time.time())}"
+    async with app.router.lifespan_context(app):
+        product = Product(name=f"Vote Stress {tag}", slug=tag, price=1, stock=0, isActive=False)
+        try:
+            author = User(fullName="Vote Stress Author", email=f"{tag}-author@example.com")
+            await author.insert()
+            await product.insert()
+            review = Review(user=author.id, product=product.id, rating=5, reviewerName=author.fullName)
+            await review.insert()
+
+            await User.insert_many(
+                [User(fullName=f"Voter {n}", email=f"{tag}-{n}@example.com") for n in range(args.voters)]
+            )
+            voters = await User.find({"email": {"$regex": f"^{tag}-\\d+@"}}).to_list()
+            tokens = [
+                (await createSession(user=voter, userAgent="vote-stress", ipAddress=None))["accessToken"]
+                for voter in voters
+            ]
+
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://testserver", timeout=120) as client:
+                requests = [
+                    client.post(f"/api/reviews/{review.id}/helpful", headers={"Authorization": f"Bearer {token}"})
+                    for token in tokens
+                    for _ in range(args.repeat)
+                ]
+                started = time.perf_counter()
+                responses = await asyncio.gather(*requests)
+                elapsed = time.perf_counter() - started
+
+            statuses = Counter(response.status_code for response in responses)
+            stored = await Review.get(review.id)
+            votes = await ReviewVote.find(ReviewVote.review == review.id).count()
+            helpful_count = stored.helpfulCount if stored else -1
+            print(f"{len(responses)} votes from {len(voters)} voters in {elapsed:.2f}s; statuses {dict(statuses)}")
+            print(f"helpfulCount={helpful_count} review_votes={votes} expected={len(voters)}")
+            ok = helpful_count == votes == len(voters) and set(statuses) == {200}
+            print("PASS" if ok else "FAIL")
+            return ok
+        finally:
+            run_users = await User.find({"email": {"$regex": f"^{tag}-"}}).to_list()
+            user_ids = [user.id for user in run_users]
+            await ReviewVote.find({"user": {"$in": user_ids}}).delete()
+            await Session.find({"user": {"$in": user_ids}}).delete()
+            await Review.find({"user": {"$in": user_ids}}).delete()
+            await User.find({"_id": {"$in": user_ids}}).delete()
+            await Product.find(Product.slug == tag).delete()
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Hammer the helpful-vote endpoint and check the counter stays exact.")
+    parser.add_argument("--voters", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=2, help="Votes sent per voter; extras must be deduplicated.")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(run(parse_args())) else 1)
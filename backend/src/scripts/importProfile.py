@@ -0,0 +1,107 @@
+"""
+Startup import profile.
+
+Imports ``src.server`` (what each uvicorn worker does at boot) in fresh
+interpreters under ``-X importtime`` and reports the median total import time,
+the slowest modules and the resident memory afterwards. Also checks that the
+optional SDKs the app loads on first use (Razorpay, httpx, passlib) stay out of
+the boot path.
+
+    python -m src.scripts.importProfile
+    python -m src.scripts.importProfile --runs 10 --top 25
+    python -m src.scripts.importProfile --backend-dir /tmp/before/backend   # e.g. a git worktree
+
+Exits 1 when a deferred module is imported at boot.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+DEFERRED_MODULES = ("razorpay", "requests", "httpx", "passlib")
+
+_PROBE = """
+import json, sys
+import src.server
+rss_kb = None
+try:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                rss_kb = int(line.split()[1])
+except OSError:
+    import resource
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"rssKb": rss_kb, "modules": len(sys.modules), "loaded": [m for m in %r if m in sys.modules]}))
+""" % (DEFERRED_MODULES,)
+
+
+def _parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """Return (module, self us, cumulative us) rows from ``-X importtime`` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        head, cumulative_us, name = line.split("|")
+        rows.append((name.strip(), int(head.split(":")[1]), int(cumulative_us)))
+    return rows
+
+
+def _profile_once(backend_dir: Path) -> Tuple[List[Tuple[str, int, int]], Dict]:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE],
+        cwd=backend_dir,
+        env=dict(os.environ, LOG_LEVEL="WARNING"),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return _parse_importtime(completed.stderr), json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run(args) -> bool:
+    backend_dir = Path(args.backend_dir).resolve()
+    totals: List[float] = []
+    rss: List[float] = []
+    cumulative: Dict[str, List[int]] = {}
+    probe: Dict = {}
+    for _ in range(args.runs):
+        rows, probe = _profile_once(backend_dir)
+        for name, _self_us, cumulative_us in rows:
+            cumulative.setdefault(name, []).append(cumulative_us)
+        totals.append(cumulative["src.server"][-1] / 1000)
+        rss.append(probe["rssKb"] / 1024)
+
+    print(f"Profiled {backend_dir} ({args.runs} runs)")
+    print(f"import src.server: median {statistics.median(totals):.0f} ms (min {min(totals):.0f} ms)")
+    print(f"RSS after import:  median {statistics.median(rss):.1f} MiB, {probe['modules']} modules loaded")
+    print(f"\n{'module':<48} {'cumulative ms':>14}")
+    slowest = sorted(cumulative.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+    for name, samples in [item for item in slowest if item[0] != "src.server"][: args.top]:
+        print(f"{name:<48} {statistics.median(samples) / 1000:>14.1f}")
+
+    if probe["loaded"]:
+        print(f"\nDeferred modules imported at boot: {', '.join(probe['loaded'])}")
+        return False
+    print(f"\nDeferred modules not loaded at boot: {', '.join(DEFERRED_MODULES)}")
+    return True
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Profile the API's import time and memory at worker boot.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest modules to list.")
+    parser.add_argument("--backend-dir", default=str(BACKEND_DIR), help="Backend checkout to profile.")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if run(parse_args()) else 1)
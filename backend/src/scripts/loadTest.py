@@ -0,0 +1,448 @@
+"""
+Load generator for the shop API.
+
+Virtual users loop over a weighted mix of journeys (browse, search, add to
+cart, checkout, Razorpay webhook) for a fixed duration and the run reports
+throughput plus p50/p95/p99 latency per endpoint. Results can be saved as JSON
+and compared against an earlier run.
+
+    # in-process (ASGI transport, shares this event loop with the app)
+    python -m src.scripts.loadTest --users 50 --duration 60 --output load.json
+
+    # against a running server started with
+    #   RAZORPAY_API_BASE_URL=http://127.0.0.1:9010 and the same .env
+    python -m src.scripts.loadTest --base-url http://127.0.0.1:4000 --compare load.json
+
+Requires seeded products and the database from MONGODB_URI (a local mongod is
+fine): load users, their sessions and orders are created directly and removed
+afterwards, and the stock their orders reserved is given back. Payments go to a local Razorpay
+stand-in that answers order creation after --razorpay-latency-ms.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import math
+import os
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import AsyncExitStack
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from dotenv import load_dotenv
+
+ENV_PATH = Path(__file__).resolve().parents[2] / ".env"
+if ENV_PATH.exists():
+    load_dotenv(ENV_PATH)
+
+DEFAULT_MIX = "browse=45,search=20,cart=20,checkout=10,webhook=5"
+SEARCH_TERMS = ["laddu", "murukku", "chekkalu", "pootharekulu", "kaja", "ariselu", "boondi", "pickle"]
+SHIPPING_ADDRESS = {
+    "name": "Load Test",
+    "line1": "1 Temple Road",
+    "city": "Annavaram",
+    "state": "Andhra Pradesh",
+    "postalCode": "533406",
+    "country": "IN",
+}
+
+
+class _RazorpayStandIn(BaseHTTPRequestHandler):
+    """Answers ``POST /v1/orders`` like Razorpay, after a fixed delay."""
+
+    latency_seconds = 0.1
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        time.sleep(self.latency_seconds)
+        if self.path.rstrip("/") != "/v1/orders":
+            self._reply(404, {"error": {"code": "BAD_REQUEST_ERROR", "description": "Unknown endpoint"}})
+            return
+        self._reply(
+            200,
+            {
+                "id": f"order_{uuid.uuid4().hex[:14]}",
+                "entity": "order",
+                "amount": payload.get("amount"),
+                "currency": payload.get("currency", "INR"),
+                "receipt": payload.get("receipt"),
+                "status": "created",
+                "notes": payload.get("notes") or {},
+                "created_at": int(time.time()),
+            },
+        )
+
+    def _reply(self, status: int, body: Dict[str, Any]) -> None:
+        encoded = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def _start_razorpay_stand_in(port: int, latency_ms: float) -> ThreadingHTTPServer:
+    _RazorpayStandIn.latency_seconds = latency_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", port), _RazorpayStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    async def request(self, client: httpx.AsyncClient, name: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.latencies[name].append(time.perf_counter() - started)
+            self.errors[name] += 1
+            self.statuses[name][0] += 1
+            return None
+        self.latencies[name].append(time.perf_counter() - started)
+        self.statuses[name][response.status_code] += 1
+        if response.status_code >= 400:
+            self.errors[name] += 1
+        return response
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank percentile.
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _summarise(recorder: Recorder, elapsed: float) -> Dict[str, Dict[str, Any]]:
+    summary: Dict[str, Dict[str, Any]] = {}
+    everything: List[float] = []
+    for name, values in sorted(recorder.latencies.items()):
+        ordered = sorted(values)
+        everything.extend(values)
+        summary[name] = {
+            "count": len(values),
+            "errors": recorder.errors.get(name, 0),
+            "statuses": {str(code): count for code, count in sorted(recorder.statuses[name].items())},
+            "rps": round(len(values) / elapsed, 2),
+            "p50Ms": round(_percentile(ordered, 0.50) * 1000, 2),
+            "p95Ms": round(_percentile(ordered, 0.95) * 1000, 2),
+            "p99Ms": round(_percentile(ordered, 0.99) * 1000, 2),
+            "maxMs": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+        }
+    ordered = sorted(everything)
+    summary["TOTAL"] = {
+        "count": len(ordered),
+        "errors": sum(recorder.errors.values()),
+        "rps": round(len(ordered) / elapsed, 2),
+        "p50Ms": round(_percentile(ordered, 0.50) * 1000, 2),
+        "p95Ms": round(_percentile(ordered, 0.95) * 1000, 2),
+        "p99Ms": round(_percentile(ordered, 0.99) * 1000, 2),
+        "maxMs": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+    }
+    return summary
+
+
+def _print_table(endpoints: Dict[str, Dict[str, Any]]) -> None:
+    print(f"{'endpoint':<32} {'count':>7} {'err':>5} {'rps':>8} {'p50ms':>8} {'p95ms':>8} {'p99ms':>8}")
+    for name, row in endpoints.items():
+        print(
+            f"{name:<32} {row['count']:>7} {row['errors']:>5} {row['rps']:>8.1f} "
+            f"{row['p50Ms']:>8.1f} {row['p95Ms']:>8.1f} {row['p99Ms']:>8.1f}"
+        )
+
+
+def _print_comparison(endpoints: Dict[str, Dict[str, Any]], baseline: Dict[str, Any], baseline_path: str) -> None:
+    print(f"\nCompared with {baseline_path} (negative latency change is better):")
+    print(f"{'endpoint':<32} {'rps':>16} {'p95ms':>18} {'p99ms':>18}")
+    for name, row in endpoints.items():
+        before = baseline.get(name)
+        if not before:
+            print(f"{name:<32} (not in baseline)")
+            continue
+
+        def change(key: str) -> str:
+            old, new = before.get(key, 0), row[key]
+            pct = f"{(new - old) / old * 100:+.0f}%" if old else "n/a"
+            return f"{new:.1f} ({pct})"
+
+        print(f"{name:<32} {change('rps'):>16} {change('p95Ms'):>18} {change('p99Ms'):>18}")
+
+
+def _parse_mix(value: str) -> List[Tuple[str, float]]:
+    mix = []
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in JOURNEYS:
+            raise SystemExit(f"Unknown journey '{name}'; choose from {', '.join(JOURNEYS)}")
+        mix.append((name, float(weight or 1)))
+    return mix
+
+
+class LoadContext:
+    def __init__(self, args, recorder: Recorder, product_ids: List[str]):
+        self.args = args
+        self.recorder = recorder
+        self.product_ids = product_ids
+        self.key_secret = os.getenv("RAZORPAY_KEY_SECRET") or os.getenv("RAZORPAY_SECRET") or ""
+        self.webhook_secret = os.getenv("RAZORPAY_WEBHOOK_SECRET") or ""
+        # Payments verified by checkouts; Razorpay also reports them through the webhook.
+        self.captured: List[Tuple[str, str, int]] = []
+
+
+async def _browse(ctx: LoadContext, client: httpx.AsyncClient, headers: Dict[str, str]) -> None:
+    rec = ctx.recorder
+    await rec.request(client, "GET /products", "GET", "/api/products", params={"page": random.randint(1, 3), "limit": 12})
+    product_id = random.choice(ctx.product_ids)
+    await rec.request(client, "GET /products/{id}", "GET", f"/api/products/{product_id}")
+    await rec.request(client, "GET /reviews/products/{id}", "GET", f"/api/reviews/products/{product_id}")
+
+
+async def _search(ctx: LoadContext, client: httpx.AsyncClient, headers: Dict[str, str]) -> None:
+    await ctx.recorder.request(client, "GET /products?search", "GET", "/api/products", params={"search": random.choice(SEARCH_TERMS)})
+
+
+async def _add_to_cart(ctx: LoadContext, client: httpx.AsyncClient, headers: Dict[str, str]) -> None:
+    rec = ctx.recorder
+    payload = {"productId": random.choice(ctx.product_ids), "quantity": 1}
+    await rec.request(client, "POST /cart/items", "POST", "/api/cart/items", json=payload, headers=headers)
+    await rec.request(client, "GET /cart", "GET", "/api/cart", headers=headers)
+
+
+async def _checkout(ctx: LoadContext, client: httpx.AsyncClient, headers: Dict[str, str]) -> None:
+    rec = ctx.recorder
+    payload = {"productId": random.choice(ctx.product_ids), "quantity": 1}
+    await rec.request(client, "POST /cart/items", "POST", "/api/cart/items", json=payload, headers=headers)
+    response = await rec.request(
+        client, "POST /orders", "POST", "/api/orders/", json={"shippingAddress": SHIPPING_ADDRESS}, headers=headers
+    )
+    if response is None or response.status_code != 200:
+        return
+    data = response.json()["data"]
+    gateway = data.get("razorpay")
+    if not gateway or not ctx.key_secret:
+        return
+    payment_id = f"pay_{uuid.uuid4().hex[:14]}"
+    signature = hmac.new(
+        ctx.key_secret.encode(), f"{gateway['orderId']}|{payment_id}".encode(), hashlib.sha256
+    ).hexdigest()
+    verified = await rec.request(
+        client,
+        "POST /payments/razorpay/verify",
+        "POST",
+        "/api/payments/razorpay/verify",
+        json={
+            "orderId": data["order"]["id"],
+            "razorpayOrderId": gateway["orderId"],
+            "paymentId": payment_id,
+            "signature": signature,
+        },
+        headers=headers,
+    )
+    if verified is not None and verified.status_code == 200:
+        ctx.captured.append((gateway["orderId"], payment_id, gateway["amount"]))
+
+
+async def _webhook(ctx: LoadContext, client: httpx.AsyncClient, headers: Dict[str, str]) -> None:
+    if not ctx.captured or not ctx.webhook_secret:
+        await _browse(ctx, client, headers)
+        return
+    razorpay_order_id, payment_id, amount = ctx.captured.pop(random.randrange(len(ctx.captured)))
+    body = json.dumps(
+        {
+            "event": "payment.captured",
+            "payload": {
+                "payment": {
+                    "entity": {
+                        "id": payment_id,
+                        "order_id": razorpay_order_id,
+                        "amount": amount,
+                        "currency": "INR",
+                        "status": "captured",
+                    }
+                }
+            },
+        }
+    ).encode()
+    signature = hmac.new(ctx.webhook_secret.encode(), body, hashlib.sha256).hexdigest()
+    await ctx.recorder.request(
+        client,
+        "POST /payments/razorpay/webhook",
+        "POST",
+        "/api/payments/razorpay/webhook",
+        content=body,
+        headers={"Content-Type": "application/json", "X-Razorpay-Signature": signature},
+    )
+
+
+JOURNEYS = {
+    "browse": _browse,
+    "search": _search,
+    "cart": _add_to_cart,
+    "checkout": _checkout,
+    "webhook": _webhook,
+}
+
+
+async def _virtual_user(ctx: LoadContext, client: httpx.AsyncClient, token: str, deadline: float) -> None:
+    names = [name for name, _ in ctx.args.mix]
+    weights = [weight for _, weight in ctx.args.mix]
+    headers = {"Authorization": f"Bearer {token}"}
+    while time.perf_counter() < deadline:
+        journey = JOURNEYS[random.choices(names, weights)[0]]
+        await journey(ctx, client, headers)
+        if ctx.args.think_ms:
+            await asyncio.sleep(random.uniform(0, 2 * ctx.args.think_ms) / 1000)
+
+
+async def _stock_reserved(order_ids: List[Any]) -> Dict[Any, int]:
+    """
+    Units the test's orders took with createOrder's atomic ``$inc``. Payment
+    verification re-saves the whole product document instead of applying a
+    delta, so it leaves nothing that can be handed back by increment.
+    """
+    from ..models import OrderItem
+
+    reserved: Dict[Any, int] = {}
+    async for item in OrderItem.get_motor_collection().find({"order": {"$in": order_ids}}, {"product": 1, "quantity": 1}):
+        reserved[item["product"]] = reserved.get(item["product"], 0) + item["quantity"]
+    return reserved
+
+
+async def run(args) -> Dict[str, Any]:
+    # Read the baseline first so --output may overwrite the same file.
+    baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))["endpoints"] if args.compare else None
+    stand_in = None
+    if args.razorpay_stand_in:
+        stand_in = _start_razorpay_stand_in(args.razorpay_port, args.razorpay_latency_ms)
+        if not args.base_url:
+            # In-process runs configure the app to use the stand-in; a live server must be started with these.
+            for name, value in (
+                ("RAZORPAY_KEY_ID", "rzp_test_loadtest"),
+                ("RAZORPAY_KEY_SECRET", "loadtest-key-secret"),
+                ("RAZORPAY_WEBHOOK_SECRET", "loadtest-webhook-secret"),
+            ):
+                os.environ[name] = os.getenv(name) or value
+            os.environ["RAZORPAY_API_BASE_URL"] = f"http://127.0.0.1:{args.razorpay_port}"
+
+    from ..db import connect_to_database, disconnect_from_database
+    from ..models import Cart, CartItem, Order, OrderItem, Payment, Product, Session, User, VerifiedPurchase
+    from ..services.sessionService import createSession
+
+    tag = f"loadtest-{int(time.time())}"
+    recorder = Recorder()
+    async with AsyncExitStack() as stack:
+        if args.base_url:
+            await connect_to_database()
+            stack.push_async_callback(disconnect_from_database)
+            client = await stack.enter_async_context(httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout))
+        else:
+            from ..server import app
+
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            transport = httpx.ASGITransport(app=app)
+            client = await stack.enter_async_context(
+                httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=args.timeout)
+            )
+
+        products = await Product.find({"isActive": True, "stock": {"$gt": 0}}).limit(50).to_list()
+        if not products:
+            raise SystemExit("No active products in stock. Run the seed script first.")
+
+        await User.insert_many(
+            [User(fullName=f"Load User {n}", email=f"{tag}-{n}@example.com", emailVerified=True) for n in range(args.users)]
+        )
+        users = await User.find({"email": {"$regex": f"^{tag}-\\d+@"}}).to_list()
+        try:
+            # Sessions are minted directly: logging in hundreds of users would trip the login rate limit.
+            tokens = [
+                (await createSession(user=user, userAgent="load-test", ipAddress=None))["accessToken"] for user in users
+            ]
+            ctx = LoadContext(args, recorder, [str(product.id) for product in products])
+            print(f"{len(users)} virtual users, {args.duration}s, mix {dict(args.mix)}, target {args.base_url or 'in-process'}")
+            started_at = datetime.now(tz=timezone.utc)
+            started = time.perf_counter()
+            deadline = started + args.duration
+            await asyncio.gather(*[_virtual_user(ctx, client, token, deadline) for token in tokens])
+            elapsed = time.perf_counter() - started
+        finally:
+            if not args.keep_data:
+                user_ids = [user.id for user in users]
+                order_ids = [order.id for order in await Order.find({"user": {"$in": user_ids}}).to_list()]
+                cart_ids = [cart.id for cart in await Cart.find({"user": {"$in": user_ids}}).to_list()]
+                reserved = await _stock_reserved(order_ids)
+                await Payment.find({"order": {"$in": order_ids}}).delete()
+                await OrderItem.find({"order": {"$in": order_ids}}).delete()
+                await Order.find({"_id": {"$in": order_ids}}).delete()
+                await CartItem.find({"cart": {"$in": cart_ids}}).delete()
+                await Cart.find({"_id": {"$in": cart_ids}}).delete()
+                await VerifiedPurchase.find({"user": {"$in": user_ids}}).delete()
+                await Session.find({"user": {"$in": user_ids}}).delete()
+                await User.find({"_id": {"$in": user_ids}}).delete()
+                # Give back only what these orders took, so concurrent stock changes survive.
+                for product_id, quantity in reserved.items():
+                    await Product.find_one(Product.id == product_id).update({"$inc": {"stock": quantity}})
+            if stand_in is not None:
+                stand_in.shutdown()
+
+    endpoints = _summarise(recorder, elapsed)
+    _print_table(endpoints)
+    result = {
+        "meta": {
+            "startedAt": started_at.isoformat(),
+            "durationSeconds": round(elapsed, 2),
+            "users": args.users,
+            "mix": dict(args.mix),
+            "thinkMs": args.think_ms,
+            "target": args.base_url or "in-process",
+            "razorpayLatencyMs": args.razorpay_latency_ms if args.razorpay_stand_in else None,
+        },
+        "endpoints": endpoints,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2), encoding="utf-8")
+        print(f"Saved results to {args.output}")
+    if baseline is not None:
+        _print_comparison(endpoints, baseline, args.compare)
+    return result
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Drive a realistic request mix and report latency percentiles.")
+    parser.add_argument("--base-url", help="Live server URL; omit to run the app in-process.")
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users.")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to generate load.")
+    parser.add_argument("--mix", type=_parse_mix, default=_parse_mix(DEFAULT_MIX), help=f"Journey weights (default {DEFAULT_MIX}).")
+    parser.add_argument("--think-ms", type=float, default=0, help="Mean pause between journeys per user.")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--output", help="Write JSON results here.")
+    parser.add_argument("--compare", help="Earlier JSON results to compare against.")
+    parser.add_argument("--no-razorpay-stand-in", dest="razorpay_stand_in", action="store_false")
+    parser.add_argument("--razorpay-port", type=int, default=9010)
+    parser.add_argument("--razorpay-latency-ms", type=float, default=120)
+    parser.add_argument("--keep-data", action="store_true", help="Leave load users and orders in the database.")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
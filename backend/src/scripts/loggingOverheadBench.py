@@ -0,0 +1,113 @@
+"""
+Logging overhead per checkout.
+
+Replays the log lines one checkout emits (createOrder plus
+verifyRazorpayPayment, one stock line per cart item) and reports the time the
+request path spends on them for three setups:
+
+- ``print``: the previous pattern, logger.info with no handler plus a print per line
+- ``sync``: JSON lines written by a StreamHandler on the calling thread
+- ``queue``: the QueueHandler/QueueListener pipeline from services.structuredLogging
+
+    python -m src.scripts.loggingOverheadBench --checkouts 20000 --items 3
+
+Output goes to /dev/null unless --output is given, so the numbers measure
+formatting and handoff rather than terminal speed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import logging
+import os
+import time
+from typing import Callable, List, Optional
+
+from ..services import structuredLogging
+from ..services.structuredLogging import JsonFormatter, RequestContextFilter, bindRequestId, resetRequestId
+
+logger = logging.getLogger("payments")
+
+
+def _checkout_records(order_id: str, user_id: str, items: int):
+    yield "Create order called", {"userId": user_id, "shippingCity": "Annavaram", "shippingState": "Andhra Pradesh"}
+    yield "Creating Razorpay order", {"orderId": order_id, "userId": user_id, "amountRupees": 640.0}
+    yield "Razorpay order created", {"orderId": order_id, "userId": user_id, "razorpayOrderId": "order_bench", "amountRupees": 640.0}
+    yield "Order created", {"orderId": order_id, "userId": user_id, "hasRazorpay": True, "amountRupees": 640.0}
+    yield "Verify Razorpay payment called", {"orderId": order_id, "userId": user_id, "paymentId": "pay_bench"}
+    for n in range(items):
+        yield "Stock deducted after payment", {"productId": f"p{n}", "quantityDeducted": 1, "newStock": 40, "orderId": order_id}
+    yield "Cart cleared after payment verification", {"userId": user_id, "cartId": "cart_bench"}
+    yield "Payment verified", {"orderId": order_id, "userId": user_id, "paymentId": "pay_bench"}
+
+
+def _checkout_logged(order_id: str, user_id: str, items: int) -> None:
+    for message, extra in _checkout_records(order_id, user_id, items):
+        logger.info(message, extra=extra)
+
+
+def _checkout_printed(order_id: str, user_id: str, items: int) -> None:
+    for message, extra in _checkout_records(order_id, user_id, items):
+        logger.info(message, extra=extra)
+        print(f"[payments] {message} " + " ".join(f"{key}={value}" for key, value in extra.items()))
+
+
+def _measure(checkouts: int, items: int, checkout: Callable[[str, str, int], None]) -> float:
+    started = time.perf_counter()
+    for n in range(checkouts):
+        token = bindRequestId(f"bench-{n}")
+        try:
+            checkout(f"order-{n}", "user-bench", items)
+        finally:
+            resetRequestId(token)
+    return time.perf_counter() - started
+
+
+def _report(name: str, elapsed: float, checkouts: int, lines: int, note: str = "") -> None:
+    per_checkout_us = elapsed / checkouts * 1e6
+    print(f"{name:<6} {per_checkout_us:8.1f} us/checkout  {per_checkout_us / lines:6.2f} us/line {note}")
+
+
+def run(args) -> None:
+    lines = sum(1 for _ in _checkout_records("", "", args.items))
+    root = logging.getLogger()
+    saved_handlers, saved_level = root.handlers[:], root.level
+    print(f"{args.checkouts} checkouts, {lines} log lines each, sample rate {args.sample_rate:g}")
+    try:
+        with open(args.output, "a", encoding="utf-8") as sink:
+            root.handlers = []
+            root.setLevel(logging.INFO)
+            with contextlib.redirect_stdout(sink):
+                elapsed = _measure(args.checkouts, args.items, _checkout_printed)
+            _report("print", elapsed, args.checkouts, lines)
+
+            direct = logging.StreamHandler(sink)
+            direct.setFormatter(JsonFormatter())
+            direct.addFilter(RequestContextFilter())
+            root.handlers = [direct]
+            _report("sync", _measure(args.checkouts, args.items, _checkout_logged), args.checkouts, lines)
+
+            structuredLogging.LOG_INFO_SAMPLE_RATE = args.sample_rate
+            structuredLogging.configureLogging(stream=sink)
+            elapsed = _measure(args.checkouts, args.items, _checkout_logged)
+            drain_started = time.perf_counter()
+            structuredLogging.stopLogging()
+            drained = time.perf_counter() - drain_started
+            _report("queue", elapsed, args.checkouts, lines, f"(writer thread drained the backlog {drained:.2f}s later)")
+    finally:
+        structuredLogging.stopLogging()
+        root.handlers, root.level = saved_handlers, saved_level
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Measure per-checkout logging overhead.")
+    parser.add_argument("--checkouts", type=int, default=20000)
+    parser.add_argument("--items", type=int, default=3, help="Cart items per checkout (one stock log line each).")
+    parser.add_argument("--sample-rate", type=float, default=1.0, help="LOG_INFO_SAMPLE_RATE for the queue run.")
+    parser.add_argument("--output", default=os.devnull, help="Where log lines are written (default: discard).")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    run(parse_args())
@@ -0,0 +1,137 @@
+"""
+Login-storm benchmark.
+
+Fires a burst of concurrent password logins while continuously probing
+unrelated endpoints, then reports probe latency percentiles. With hashing
+on the event loop the probes stall behind every bcrypt call; with the
+off-loop hasher they should stay flat.
+
+    python -m src.scripts.loginStormBench --logins 50 --concurrency 25
+    python -m src.scripts.loginStormBench --base-url http://127.0.0.1:4000
+
+Requires the demo users from ``python -m src.scripts.seed``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+ENV_PATH = Path(__file__).resolve().parents[2] / ".env"
+if ENV_PATH.exists():
+    load_dotenv(ENV_PATH)
+
+PROBE_PATHS = ["/", "/api/products?limit=1"]
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(samples),
+        "p50": _percentile(samples, 50),
+        "p95": _percentile(samples, 95),
+        "p99": _percentile(samples, 99),
+        "max": max(samples) if samples else 0.0,
+        "mean": statistics.fmean(samples) if samples else 0.0,
+    }
+
+
+async def _probe(client: httpx.AsyncClient, path: str, stop: asyncio.Event, samples: List[float], interval: float = 0.02):
+    # Latency is measured from the scheduled send time, so time spent waiting for a
+    # blocked event loop counts against the probe instead of silently thinning samples.
+    scheduled = time.perf_counter()
+    while not stop.is_set():
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await client.get(path)
+        samples.append((time.perf_counter() - scheduled) * 1000)
+        scheduled += interval
+
+
+async def _login(client: httpx.AsyncClient, email: str, password: str, gate: asyncio.Semaphore, results: Dict[int, int], samples: List[float]):
+    async with gate:
+        started = time.perf_counter()
+        response = await client.post("/api/auth/login", json={"email": email, "password": password})
+        samples.append((time.perf_counter() - started) * 1000)
+        results[response.status_code] = results.get(response.status_code, 0) + 1
+
+
+async def _storm(client: httpx.AsyncClient, args) -> None:
+    # Baseline: probes alone.
+    baseline: Dict[str, List[float]] = {path: [] for path in PROBE_PATHS}
+    stop = asyncio.Event()
+    probes = [asyncio.create_task(_probe(client, path, stop, baseline[path])) for path in PROBE_PATHS]
+    await asyncio.sleep(args.baseline_seconds)
+    stop.set()
+    await asyncio.gather(*probes)
+
+    during: Dict[str, List[float]] = {path: [] for path in PROBE_PATHS}
+    stop = asyncio.Event()
+    probes = [asyncio.create_task(_probe(client, path, stop, during[path])) for path in PROBE_PATHS]
+    gate = asyncio.Semaphore(args.concurrency)
+    statuses: Dict[int, int] = {}
+    login_samples: List[float] = []
+    started = time.perf_counter()
+    await asyncio.gather(
+        *[_login(client, args.email, args.password, gate, statuses, login_samples) for _ in range(args.logins)]
+    )
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await asyncio.gather(*probes)
+
+    print(f"Logins: {args.logins} in {elapsed:.2f}s ({args.logins / elapsed:.1f}/s), statuses={statuses}")
+    login_stats = _summary(login_samples)
+    print(f"  login latency ms  p50={login_stats['p50']:.1f} p95={login_stats['p95']:.1f} p99={login_stats['p99']:.1f}")
+    print("Unrelated endpoint latency (ms):")
+    for path in PROBE_PATHS:
+        before = _summary(baseline[path])
+        after = _summary(during[path])
+        print(
+            f"  {path:<28} idle p99={before['p99']:.1f}  "
+            f"storm p50={after['p50']:.1f} p99={after['p99']:.1f} max={after['max']:.1f} (n={after['count']})"
+        )
+
+
+async def run(args) -> None:
+    if args.base_url:
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+            await _storm(client, args)
+        return
+
+    from ..server import app
+
+    # Drive the lifespan so the hashing executor and DB connection start as in production.
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver", timeout=60) as client:
+            await _storm(client, args)
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Measure unrelated-endpoint latency during a login burst.")
+    parser.add_argument("--base-url", default=None, help="Target a running server instead of the in-process app.")
+    parser.add_argument("--email", default="sita@example.com")
+    parser.add_argument("--password", default="demo-password")
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=25)
+    parser.add_argument("--baseline-seconds", type=float, default=2.0)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
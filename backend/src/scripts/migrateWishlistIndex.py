@@ -0,0 +1,77 @@
+"""
+Make the wishlists (user, product) index unique.
+
+Older deployments have a non-unique index on the same keys and may hold
+duplicate rows from double taps. This removes the duplicates (keeping the
+oldest row of each pair), drops the old index and builds the unique one. The
+backend declares the unique index under its own name, so it boots either way;
+until this runs, the unique build is logged as failed wherever duplicates exist.
+
+    python -m src.scripts.migrateWishlistIndex --dry-run
+    python -m src.scripts.migrateWishlistIndex
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+from pathlib import Path
+from typing import List, Optional
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from ..db import _resolve_database
+from ..models import Wishlist
+
+ENV_PATH = Path(__file__).resolve().parents[2] / ".env"
+if ENV_PATH.exists():
+    load_dotenv(ENV_PATH)
+
+INDEX_KEYS = [("user", 1), ("product", 1)]
+UNIQUE_INDEX = Wishlist.Settings.indexes[0]
+
+
+async def run(args) -> None:
+    client = AsyncIOMotorClient(os.getenv("MONGODB_URI") or "mongodb://127.0.0.1:27017/online_annavaram")
+    # Talk to the collection directly: init_beanie would try to build the unique index first.
+    collection = _resolve_database(client)["wishlists"]
+    try:
+        duplicates = collection.aggregate(
+            [
+                {"$sort": {"createdAt": 1, "_id": 1}},
+                {"$group": {"_id": {"user": "$user", "product": "$product"}, "ids": {"$push": "$_id"}, "n": {"$sum": 1}}},
+                {"$match": {"n": {"$gt": 1}}},
+            ],
+            allowDiskUse=True,
+        )
+        extra_ids = []
+        async for group in duplicates:
+            extra_ids.extend(group["ids"][1:])
+        print(f"Duplicate wishlist rows: {len(extra_ids)}")
+        if args.dry_run:
+            return
+
+        for start in range(0, len(extra_ids), args.batch_size):
+            await collection.delete_many({"_id": {"$in": extra_ids[start:start + args.batch_size]}})
+
+        for name, spec in (await collection.index_information()).items():
+            if spec.get("key") == INDEX_KEYS and not spec.get("unique"):
+                await collection.drop_index(name)
+                print(f"Dropped non-unique index {name}")
+        await collection.create_indexes([UNIQUE_INDEX])
+        print(f"Unique (user, product) index {UNIQUE_INDEX.document['name']} in place")
+    finally:
+        client.close()
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Deduplicate wishlists and make (user, product) unique.")
+    parser.add_argument("--dry-run", action="store_true", help="Only count duplicate rows.")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
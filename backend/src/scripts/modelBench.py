@@ -0,0 +1,320 @@
+"""
+Micro-benchmarks for per-request model work.
+
+Times hydration (``model_validate`` on raw MongoDB documents, which runs the
+``sync_fields`` validators), ``model_dump`` and the controllers'
+``_serialize_*`` helpers on realistically sized documents, and compares the
+results with a saved baseline.
+
+    python -m src.scripts.modelBench                      # run and compare with the baseline
+    python -m src.scripts.modelBench --save               # record a new baseline
+    python -m src.scripts.modelBench --filter order --repeat 11
+
+Beanie documents can only be built after ``init_beanie``, so the script
+connects to MONGODB_URI; it reads and writes nothing. Timings are
+machine-specific: refresh the baseline (``--save``) on the machine that runs
+the comparison before relying on it. Exits 1 when any benchmark is slower than
+the baseline by more than --threshold.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import timeit
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pydantic
+from bson import ObjectId
+from dotenv import load_dotenv
+
+ENV_PATH = Path(__file__).resolve().parents[2] / ".env"
+if ENV_PATH.exists():
+    load_dotenv(ENV_PATH)
+
+BASELINE_PATH = Path(__file__).resolve().parents[2] / "benchmarks" / "modelBench.json"
+
+_NOW = datetime(2025, 1, 15, 10, 30, tzinfo=timezone.utc)
+
+
+def _product_doc() -> Dict[str, Any]:
+    image = "https://raw.githubusercontent.com/hemanth8705/online_annavaram/main/client/public/telugu_snacks_images/snacks01.jpg"
+    return {
+        "_id": ObjectId(),
+        "name": "Dry Fruit Pootharekulu 500g",
+        "slug": "dry-fruit-pootharekulu-500g",
+        "description": "Paper-thin rice starch sheets layered with ghee, jaggery and dry fruits, made in Atreyapuram.",
+        "categoryId": ObjectId(),
+        "category": "sweets",
+        "price": 450.0,
+        "currency": "inr",
+        "stock": 120,
+        "totalStock": 120,
+        "maxUnitsPerUser": 5,
+        "isUnlimitedPurchase": False,
+        "imageUrl": None,
+        "images": [image, image.replace("01", "02"), image.replace("01", "03")],
+        "isActive": True,
+        "isDeleted": False,
+        "createdAt": _NOW,
+        "updatedAt": _NOW,
+    }
+
+
+def _line_item(n: int) -> Dict[str, Any]:
+    return {
+        "productId": ObjectId(),
+        "productName": f"Snack {n} 250g",
+        "quantity": n % 3 + 1,
+        "unitPrice": 180.0 + n * 5,
+        "subtotal": (180.0 + n * 5) * (n % 3 + 1),
+    }
+
+
+def _order_doc(embedded_items: int) -> Dict[str, Any]:
+    """Orders written by the admin backend embed line items in ``products``; sync_fields mirrors them."""
+    user_id = ObjectId()
+    products = [_line_item(n) for n in range(embedded_items)]
+    return {
+        "_id": ObjectId(),
+        "orderId": None,
+        "user": user_id,
+        "products": products,
+        "cart": ObjectId(),
+        "totalAmount": sum(item["subtotal"] for item in products),
+        "currency": "INR",
+        "status": "delivered",
+        "statusHistory": [
+            {"status": status, "timestamp": _NOW + timedelta(hours=n), "updatedBy": None, "notes": None}
+            for n, status in enumerate(["order_created", "payment_confirmed", "dispatched", "delivered"])
+        ],
+        "shippingAddress": {
+            "name": "Sita Lakshmi",
+            "phone": "9999999901",
+            "line1": "12-34 Main Road",
+            "line2": "Near Temple Street",
+            "city": "Annavaram",
+            "state": "Andhra Pradesh",
+            "postalCode": "533406",
+            "country": "IN",
+        },
+        "paymentIntentId": "order_Nx81kq2TfD3a",
+        "notes": None,
+        "createdAt": _NOW,
+        "updatedAt": _NOW,
+    }
+
+
+def _order_item_doc(n: int, order_id: ObjectId) -> Dict[str, Any]:
+    return {
+        "_id": ObjectId(),
+        "order": order_id,
+        "product": ObjectId(),
+        "productName": f"Snack {n} 250g",
+        "unitPrice": 180.0 + n * 5,
+        "quantity": n % 3 + 1,
+        "createdAt": _NOW,
+        "updatedAt": _NOW,
+    }
+
+
+def _payment_doc(order_id: ObjectId) -> Dict[str, Any]:
+    entity = {"id": "pay_Nx81mZ", "order_id": "order_Nx81kq2TfD3a", "amount": 189700, "status": "captured", "method": "upi"}
+    return {
+        "_id": ObjectId(),
+        "order": order_id,
+        "gateway": "razorpay",
+        "amount": 1897.0,
+        "currency": "INR",
+        "status": "captured",
+        "transactionId": "pay_Nx81mZ",
+        "rawResponse": {
+            "id": "order_Nx81kq2TfD3a",
+            "amount": 189700,
+            "verificationPayload": {"razorpay_payment_id": "pay_Nx81mZ"},
+            "webhookEvents": [{"event": "payment.authorized", "payload": entity}, {"event": "payment.captured", "payload": entity}],
+        },
+        "createdAt": _NOW,
+        "updatedAt": _NOW,
+    }
+
+
+def _review_doc() -> Dict[str, Any]:
+    return {
+        "_id": ObjectId(),
+        "user": ObjectId(),
+        "product": ObjectId(),
+        "reviewerName": "Ramya Reddy",
+        "rating": 5,
+        "title": "Just like my grandmother's",
+        "reviewText": "Fresh, not too sweet and well packed. Reached Hyderabad in two days. " * 3,
+        "isVerifiedPurchase": True,
+        "isApproved": True,
+        "isDeleted": False,
+        "helpfulCount": 12,
+        "createdAt": _NOW,
+        "updatedAt": _NOW,
+    }
+
+
+def _user_doc() -> Dict[str, Any]:
+    addresses = [
+        {
+            "id": f"addr{n}",
+            "label": label,
+            "contactName": "Sita Lakshmi",
+            "phone": "9999999901",
+            "line1": f"{n + 1}-34 Main Road",
+            "line2": None,
+            "city": city,
+            "state": "Andhra Pradesh",
+            "postalCode": "533406",
+            "country": "IN",
+        }
+        for n, (label, city) in enumerate([("Home", "Annavaram"), ("Office", "Kakinada")])
+    ]
+    return {
+        "_id": ObjectId(),
+        "fullName": "Sita Lakshmi",
+        "email": "sita@example.com",
+        "passwordHash": "$bcrypt-sha256$v=2,t=2b,r=12$" + "x" * 53,
+        "phone": "9999999901",
+        "role": "customer",
+        "addresses": addresses,
+        "isActive": True,
+        "emailVerified": True,
+        "emailVerifiedAt": _NOW,
+        "createdAt": _NOW,
+        "updatedAt": _NOW,
+    }
+
+
+def build_cases() -> List[Tuple[str, Callable[[], Any]]]:
+    from ..controllers import authController, orderController, paymentController
+    from ..models import Order, OrderItem, Payment, Product, Review, User
+
+    product_doc = _product_doc()
+    order_doc = _order_doc(3)
+    large_order_doc = _order_doc(20)
+    review_doc = _review_doc()
+    user_doc = _user_doc()
+    order = Order.model_validate(order_doc)
+    large_order = Order.model_validate(large_order_doc)
+    item_docs = [_order_item_doc(n, order_doc["_id"]) for n in range(5)]
+    items = [OrderItem.model_validate(doc) for doc in item_docs]
+    payment_doc = _payment_doc(order_doc["_id"])
+    payment = Payment.model_validate(payment_doc)
+    product = Product.model_validate(product_doc)
+    review = Review.model_validate(review_doc)
+    user = User.model_validate(user_doc)
+    products_page = [dict(product_doc, _id=ObjectId()) for _ in range(12)]
+
+    return [
+        ("hydrate.product", lambda: Product.model_validate(product_doc)),
+        ("hydrate.product_page_12", lambda: [Product.model_validate(doc) for doc in products_page]),
+        ("hydrate.order_3_items", lambda: Order.model_validate(order_doc)),
+        ("hydrate.order_20_items", lambda: Order.model_validate(large_order_doc)),
+        ("hydrate.order_item", lambda: OrderItem.model_validate(item_docs[0])),
+        ("hydrate.payment", lambda: Payment.model_validate(payment_doc)),
+        ("hydrate.review", lambda: Review.model_validate(review_doc)),
+        ("hydrate.user", lambda: User.model_validate(user_doc)),
+        ("dump.product", product.model_dump),
+        ("dump.order_3_items", order.model_dump),
+        ("dump.order_20_items", large_order.model_dump),
+        ("dump.review", review.model_dump),
+        ("serialize.auth_user", lambda: authController._serialize_user(user)),
+        ("serialize.orders_order", lambda: orderController._serialize_order(order, user)),
+        ("serialize.orders_order_20_items", lambda: orderController._serialize_order(large_order, user)),
+        ("serialize.orders_payment", lambda: orderController._serialize_payment(payment)),
+        ("serialize.payments_order", lambda: paymentController._serialize_order(order, user)),
+        ("serialize.payments_items_5", lambda: paymentController._serialize_items(items)),
+    ]
+
+
+def _time_case(fn: Callable[[], Any], repeat: int, min_time: float) -> Dict[str, float]:
+    timer = timeit.Timer(fn)
+    number, elapsed = timer.autorange()
+    # Scale the loop so each sample takes at least min_time seconds.
+    number = max(number, int(number * min_time / elapsed) if elapsed else number)
+    samples = [seconds / number * 1e6 for seconds in timer.repeat(repeat=repeat, number=number)]
+    return {"medianUs": round(statistics.median(samples), 3), "minUs": round(min(samples), 3), "loops": number}
+
+
+def _environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "pydantic": pydantic.VERSION,
+        "machine": f"{platform.system()} {platform.machine()}",
+        "recordedAt": datetime.now(tz=timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def _compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Any], threshold: float) -> bool:
+    print(f"\nBaseline recorded {baseline['environment'].get('recordedAt')} (python {baseline['environment'].get('python')}, "
+          f"pydantic {baseline['environment'].get('pydantic')})")
+    # Compare fastest samples: they are far less sensitive to scheduler noise than medians.
+    print(f"{'benchmark':<34} {'baseline min':>12} {'now min':>10} {'change':>8}")
+    regressed = False
+    for name, result in results.items():
+        before = baseline["benchmarks"].get(name)
+        if before is None:
+            print(f"{name:<34} {'-':>12} {result['minUs']:>10.2f}    (new)")
+            continue
+        ratio = result["minUs"] / before["minUs"] if before["minUs"] else 1.0
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressed = True
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+        print(f"{name:<34} {before['minUs']:>12.2f} {result['minUs']:>10.2f} {ratio - 1:>+8.0%}{flag}")
+    return not regressed
+
+
+async def run(args) -> bool:
+    from ..db import connect_to_database, disconnect_from_database
+
+    await connect_to_database(index_mode="manual")
+    try:
+        cases = [(name, fn) for name, fn in build_cases() if not args.filter or args.filter in name]
+        results: Dict[str, Dict[str, float]] = {}
+        print(f"{'benchmark':<34} {'median us':>10} {'min us':>10} {'loops':>8}")
+        for name, fn in cases:
+            results[name] = _time_case(fn, args.repeat, args.min_time)
+            print(f"{name:<34} {results[name]['medianUs']:>10.2f} {results[name]['minUs']:>10.2f} {results[name]['loops']:>8}")
+    finally:
+        await disconnect_from_database()
+
+    baseline_path = Path(args.baseline)
+    if args.save:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(
+            json.dumps({"environment": _environment(), "benchmarks": results}, indent=2) + "\n", encoding="utf-8"
+        )
+        print(f"\nSaved baseline to {baseline_path}")
+        return True
+    if not baseline_path.exists():
+        print(f"\nNo baseline at {baseline_path}; run with --save to create one.")
+        return True
+    return _compare(results, json.loads(baseline_path.read_text(encoding="utf-8")), args.threshold)
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark model hydration, dumping and controller serializers.")
+    parser.add_argument("--filter", help="Only run benchmarks whose name contains this text.")
+    parser.add_argument("--repeat", type=int, default=7, help="Samples per benchmark.")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per sample.")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--save", action="store_true", help="Write the results as the new baseline.")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Relative slowdown reported as a regression.")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(run(parse_args())) else 1)
@@ -0,0 +1,514 @@
+"""
+Synthetic catalogue and shopping history at performance-test volume.
+
+Used by ``python -m src.scripts.seed --scale N``. Scale 1 is roughly 2k
+products, 20k users, 8k active carts, 40k orders (~70k order items), 30k
+reviews and 30k wishlist rows; every count grows linearly with N. Paid and
+later orders also get their verified_purchases rows, and a review is marked as
+a verified purchase only when its author bought the product.
+
+Documents are built as raw dicts matching the models (Beanie validation per
+document would dominate the run) and written with unordered ``insert_many``
+batches, several in flight at once. Popularity is Zipf-skewed: a few products
+get most orders, reviews and wishlist adds, and a few users place most orders.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from uuid import uuid4
+
+from bson import ObjectId
+
+from ..models import Cart, CartItem, Order, OrderItem, Product, Review, User, VerifiedPurchase, Wishlist
+from ..services.purchaseService import PURCHASED_ORDER_STATUSES
+
+BASE_COUNTS = {
+    "products": 2_000,
+    "users": 20_000,
+    "carts": 8_000,
+    "orders": 40_000,
+    "reviews": 30_000,
+    "wishlists": 30_000,
+}
+
+IMAGE_BASE = "https://raw.githubusercontent.com/hemanth8705/online_annavaram/main/client/public/telugu_snacks_images"
+
+# category -> (base products, price range in rupees)
+CATALOGUE: Dict[str, Tuple[Sequence[str], Tuple[int, int]]] = {
+    "sweets": (
+        ["Pootharekulu", "Kaja", "Ariselu", "Sunnundalu", "Boondi Laddu", "Palakova", "Bellam Gavvalu", "Kajjikayalu"],
+        (180, 900),
+    ),
+    "savouries": (
+        ["Chekkalu", "Murukulu", "Janthikalu", "Chegodilu", "Karam Boondi", "Ribbon Pakodi", "Kara Gavvalu"],
+        (120, 600),
+    ),
+    "pickles": (["Avakaya", "Gongura", "Tomato", "Usirikaya", "Nimmakaya", "Allam", "Pandu Mirchi"], (200, 750)),
+    "podis": (["Kandi Podi", "Karivepaku Podi", "Nuvvula Podi", "Palli Podi", "Kobbari Podi"], (150, 450)),
+    "jaggery": (["Palm Jaggery", "Sugarcane Jaggery", "Jaggery Powder"], (90, 400)),
+    "ghee": (["Cow Ghee", "Buffalo Ghee", "Bilona Ghee"], (350, 1500)),
+}
+VARIANTS = ["", "Jaggery", "Dry Fruit", "Ghee", "Sugar-free", "Homemade", "Special", "Spicy"]
+PACK_SIZES = ["250g", "500g", "1kg"]
+
+FIRST_NAMES = [
+    "Sita", "Lakshmi", "Ramya", "Srinivas", "Venkatesh", "Padma", "Anjali", "Ravi", "Kiran", "Sai",
+    "Harika", "Teja", "Bhavani", "Naga", "Suresh", "Prasad", "Durga", "Manasa", "Sravani", "Chaitanya",
+]
+SURNAMES = ["Reddy", "Rao", "Naidu", "Chowdary", "Varma", "Sastry", "Goud", "Raju", "Murthy", "Kumar", "Yadav"]
+CITIES = [
+    ("Annavaram", "Andhra Pradesh", "533406"),
+    ("Kakinada", "Andhra Pradesh", "533001"),
+    ("Rajahmundry", "Andhra Pradesh", "533101"),
+    ("Visakhapatnam", "Andhra Pradesh", "530002"),
+    ("Vijayawada", "Andhra Pradesh", "520001"),
+    ("Guntur", "Andhra Pradesh", "522002"),
+    ("Tirupati", "Andhra Pradesh", "517501"),
+    ("Hyderabad", "Telangana", "500001"),
+    ("Warangal", "Telangana", "506002"),
+    ("Bengaluru", "Karnataka", "560001"),
+]
+ORDER_STATUSES = [
+    ("delivered", 55),
+    ("paid", 12),
+    ("shipped", 8),
+    ("out_for_delivery", 5),
+    ("pending_payment", 12),
+    ("cancelled", 8),
+]
+RATING_WEIGHTS = [5, 5, 12, 30, 48]
+REVIEW_SNIPPETS = [
+    "Tastes just like home.",
+    "Fresh and well packed.",
+    "A little too sweet for me.",
+    "Ordered again for the festival.",
+    "Crispy even after a week.",
+    "Perfect with hot rice and ghee.",
+]
+# Share of reviews written by someone who bought the product.
+VERIFIED_REVIEW_SHARE = 0.6
+
+
+def _zipf_cum_weights(n: int, exponent: float) -> List[float]:
+    return list(itertools.accumulate(1 / (rank ** exponent) for rank in range(1, n + 1)))
+
+
+def _weighted_status(rng: random.Random) -> str:
+    return rng.choices([status for status, _ in ORDER_STATUSES], [weight for _, weight in ORDER_STATUSES])[0]
+
+
+@dataclass
+class _Catalogue:
+    ids: List[ObjectId] = field(default_factory=list)
+    names: List[str] = field(default_factory=list)
+    prices: List[float] = field(default_factory=list)
+    cum_weights: List[float] = field(default_factory=list)
+
+
+# (user index, product index) -> (first purchasing order id, its creation time)
+_Purchases = Dict[Tuple[int, int], Tuple[ObjectId, datetime]]
+
+
+@dataclass
+class _People:
+    ids: List[ObjectId] = field(default_factory=list)
+    names: List[str] = field(default_factory=list)
+    addresses: List[Dict[str, Any]] = field(default_factory=list)
+    cum_weights: List[float] = field(default_factory=list)
+
+
+class _BatchWriter:
+    """Buffers raw documents per collection and keeps up to ``concurrency`` insert_many calls in flight."""
+
+    def __init__(self, batch_size: int, concurrency: int):
+        self.batch_size = batch_size
+        self._slots = asyncio.Semaphore(concurrency)
+        self._pending: set = set()
+        self._buffers: Dict[Any, List[dict]] = {}
+        self.inserted: Dict[str, int] = {}
+        self.batches: Dict[str, int] = {}
+        self.seconds: Dict[str, float] = {}
+        self._failures: List[Tuple[str, int, BaseException]] = []
+
+    async def add(self, model, document: dict) -> None:
+        # Stop generating as soon as a batch has failed rather than after the whole run.
+        self._raise_failures()
+        buffer = self._buffers.setdefault(model, [])
+        buffer.append(document)
+        if len(buffer) >= self.batch_size:
+            self._buffers[model] = []
+            await self._submit(model, buffer)
+
+    async def _submit(self, model, batch: List[dict]) -> None:
+        await self._slots.acquire()
+        task = asyncio.create_task(self._insert(model, batch))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _insert(self, model, batch: List[dict]) -> None:
+        name = model.get_settings().name
+        started = time.perf_counter()
+        try:
+            await model.get_motor_collection().insert_many(batch, ordered=False)
+        except Exception as exc:
+            # Nothing awaits these tasks until flush(), so keep the error for it to raise.
+            self._failures.append((name, len(batch), exc))
+            return
+        finally:
+            self._slots.release()
+        self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - started
+        self.inserted[name] = self.inserted.get(name, 0) + len(batch)
+        self.batches[name] = self.batches.get(name, 0) + 1
+
+    async def flush(self) -> None:
+        for model, buffer in list(self._buffers.items()):
+            if buffer:
+                self._buffers[model] = []
+                await self._submit(model, buffer)
+        if self._pending:
+            await asyncio.gather(*self._pending)
+        self._raise_failures()
+
+    def _raise_failures(self) -> None:
+        if not self._failures:
+            return
+        name, size, exc = self._failures[0]
+        documents = sum(size for _, size, _ in self._failures)
+        raise RuntimeError(
+            f"{len(self._failures)} insert batch(es) failed ({documents} documents); first on {name}: {exc}"
+        ) from exc
+
+
+def _random_past(rng: random.Random, now: datetime, max_days: int) -> datetime:
+    return now - timedelta(seconds=rng.randint(0, max_days * 86_400))
+
+
+async def _products(writer: _BatchWriter, rng: random.Random, count: int, now: datetime) -> _Catalogue:
+    catalogue = _Catalogue()
+    combos = [
+        (category, base, variant)
+        for category, (bases, _) in CATALOGUE.items()
+        for base in bases
+        for variant in VARIANTS
+    ]
+    for n in range(count):
+        category, base, variant = combos[n % len(combos)]
+        size = PACK_SIZES[rng.randrange(len(PACK_SIZES))]
+        low, high = CATALOGUE[category][1]
+        price = float(rng.randint(low, high) // 5 * 5)
+        if variant and variant.lower() in base.lower():
+            variant = ""
+        name = " ".join(part for part in (variant, base, size) if part)
+        stock = 0 if rng.random() < 0.05 else rng.randint(5, 500)
+        image = f"{IMAGE_BASE}/snacks{n % 12 + 1:02d}.jpg"
+        created = _random_past(rng, now, 540)
+        product_id = ObjectId()
+        await writer.add(
+            Product,
+            {
+                "_id": product_id,
+                "name": name,
+                "slug": f"{name.lower().replace(' ', '-')}-{n}",
+                "description": f"{base} from Annavaram, packed fresh ({size}).",
+                "categoryId": None,
+                "category": category,
+                "price": price,
+                "currency": "INR",
+                "stock": stock,
+                "totalStock": stock,
+                "maxUnitsPerUser": rng.choice([3, 5, 10]),
+                "isUnlimitedPurchase": False,
+                "imageUrl": image,
+                "images": [image],
+                "isActive": stock > 0,
+                "isDeleted": False,
+                "createdAt": created,
+                "updatedAt": created,
+            },
+        )
+        catalogue.ids.append(product_id)
+        catalogue.names.append(name)
+        catalogue.prices.append(price)
+    # Popularity follows list position, so shuffle to spread best sellers across categories.
+    order = list(range(count))
+    rng.shuffle(order)
+    catalogue.ids = [catalogue.ids[i] for i in order]
+    catalogue.names = [catalogue.names[i] for i in order]
+    catalogue.prices = [catalogue.prices[i] for i in order]
+    catalogue.cum_weights = _zipf_cum_weights(count, 1.1)
+    return catalogue
+
+
+async def _users(writer: _BatchWriter, rng: random.Random, count: int, now: datetime, password_hash: str) -> _People:
+    people = _People()
+    for n in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(SURNAMES)
+        city, state, postal_code = CITIES[min(int(rng.expovariate(0.45)), len(CITIES) - 1)]
+        phone = f"9{rng.randint(100_000_000, 999_999_999)}"
+        address = {
+            "id": uuid4().hex,
+            "label": "Home",
+            "contactName": f"{first} {last}",
+            "phone": phone,
+            "line1": f"{rng.randint(1, 99)}-{rng.randint(1, 400)} Main Road",
+            "line2": None,
+            "city": city,
+            "state": state,
+            "postalCode": postal_code,
+            "country": "IN",
+        }
+        created = _random_past(rng, now, 720)
+        user_id = ObjectId()
+        await writer.add(
+            User,
+            {
+                "_id": user_id,
+                "fullName": f"{first} {last}",
+                "email": f"{first.lower()}.{last.lower()}.{n}@scale.example.com",
+                "passwordHash": password_hash,
+                "phone": phone,
+                "role": "customer",
+                "addresses": [address],
+                "isActive": True,
+                "emailVerified": True,
+                "emailVerifiedAt": created,
+                "emailVerification": {"otpHash": None, "otpExpiresAt": None, "attempts": 0, "sentHistory": []},
+                "passwordReset": {"otpHash": None, "otpExpiresAt": None, "attempts": 0, "sentHistory": []},
+                "googleId": None,
+                "pendingEmail": None,
+                "createdAt": created,
+                "updatedAt": created,
+            },
+        )
+        people.ids.append(user_id)
+        people.names.append(f"{first} {last}")
+        people.addresses.append(address)
+    people.cum_weights = _zipf_cum_weights(count, 0.8)
+    return people
+
+
+def _pick_products(rng: random.Random, catalogue: _Catalogue, k: int) -> List[int]:
+    picked: List[int] = []
+    seen = set()
+    k = min(k, len(catalogue.ids))
+    while len(picked) < k:
+        index = rng.choices(range(len(catalogue.ids)), cum_weights=catalogue.cum_weights)[0]
+        if index not in seen:
+            seen.add(index)
+            picked.append(index)
+    return picked
+
+
+async def _carts(writer: _BatchWriter, rng: random.Random, count: int, now: datetime, catalogue: _Catalogue, people: _People) -> None:
+    for user_index in rng.sample(range(len(people.ids)), min(count, len(people.ids))):
+        cart_id = ObjectId()
+        created = _random_past(rng, now, 30)
+        await writer.add(
+            Cart,
+            {"_id": cart_id, "user": people.ids[user_index], "status": "active", "createdAt": created, "updatedAt": created},
+        )
+        for product_index in _pick_products(rng, catalogue, rng.choices([1, 2, 3, 4, 5], [35, 30, 18, 10, 7])[0]):
+            await writer.add(
+                CartItem,
+                {
+                    "_id": ObjectId(),
+                    "cart": cart_id,
+                    "product": catalogue.ids[product_index],
+                    "quantity": rng.choices([1, 2, 3], [70, 22, 8])[0],
+                    "priceAtAddition": catalogue.prices[product_index],
+                    "createdAt": created,
+                    "updatedAt": created,
+                },
+            )
+
+
+async def _orders(writer: _BatchWriter, rng: random.Random, count: int, now: datetime, catalogue: _Catalogue, people: _People) -> _Purchases:
+    purchases: _Purchases = {}
+    user_indexes = rng.choices(range(len(people.ids)), cum_weights=people.cum_weights, k=count)
+    for user_index in user_indexes:
+        order_id = ObjectId()
+        created = _random_past(rng, now, 365)
+        status = _weighted_status(rng)
+        total = 0.0
+        for product_index in _pick_products(rng, catalogue, rng.choices([1, 2, 3, 4], [50, 30, 15, 5])[0]):
+            quantity = rng.choices([1, 2, 3], [75, 20, 5])[0]
+            unit_price = catalogue.prices[product_index]
+            subtotal = round(unit_price * quantity)
+            total += subtotal
+            if status in PURCHASED_ORDER_STATUSES:
+                pair = (user_index, product_index)
+                if pair not in purchases or created < purchases[pair][1]:
+                    purchases[pair] = (order_id, created)
+            await writer.add(
+                OrderItem,
+                {
+                    "_id": ObjectId(),
+                    "order": order_id,
+                    "product": catalogue.ids[product_index],
+                    "productName": catalogue.names[product_index],
+                    "unitPrice": unit_price,
+                    "quantity": quantity,
+                    "subtotal": subtotal,
+                    "createdAt": created,
+                    "updatedAt": created,
+                },
+            )
+        address = people.addresses[user_index]
+        await writer.add(
+            Order,
+            {
+                "_id": order_id,
+                "orderId": None,
+                "user": people.ids[user_index],
+                "userId": people.ids[user_index],
+                "products": [],
+                "items": [],
+                "cart": None,
+                "totalAmount": total,
+                "currency": "INR",
+                "status": status,
+                "statusHistory": [{"status": status, "timestamp": created, "updatedBy": None, "notes": None}],
+                "shippingAddress": {
+                    "name": people.names[user_index],
+                    "phone": address["phone"],
+                    "line1": address["line1"],
+                    "line2": None,
+                    "city": address["city"],
+                    "state": address["state"],
+                    "postalCode": address["postalCode"],
+                    "country": "IN",
+                },
+                "paymentIntentId": None if status == "pending_payment" else f"order_scale{order_id}",
+                "notes": None,
+                "createdAt": created,
+                "updatedAt": created,
+            },
+        )
+    return purchases
+
+
+async def _verified_purchases(writer: _BatchWriter, now: datetime, catalogue: _Catalogue, people: _People, purchases: _Purchases) -> None:
+    for (user_index, product_index), (order_id, purchased_at) in purchases.items():
+        await writer.add(
+            VerifiedPurchase,
+            {
+                "_id": ObjectId(),
+                "user": people.ids[user_index],
+                "product": catalogue.ids[product_index],
+                "order": order_id,
+                "purchasedAt": purchased_at,
+                "createdAt": now,
+                "updatedAt": now,
+            },
+        )
+
+
+def _unique_pairs(rng: random.Random, count: int, catalogue: _Catalogue, people: _People) -> Iterator[Tuple[int, int]]:
+    """Yield distinct (user, product) index pairs, both drawn from the skewed distributions."""
+    seen = set()
+    attempts = 0
+    while len(seen) < count and attempts < count * 5:
+        attempts += 1
+        pair = (
+            rng.choices(range(len(people.ids)), cum_weights=people.cum_weights)[0],
+            rng.choices(range(len(catalogue.ids)), cum_weights=catalogue.cum_weights)[0],
+        )
+        if pair not in seen:
+            seen.add(pair)
+            yield pair
+
+
+def _review_pairs(rng: random.Random, count: int, catalogue: _Catalogue, people: _People, purchases: _Purchases) -> Iterator[Tuple[int, int]]:
+    """Mostly buyers reviewing what they bought, topped up with skewed pairs that may not be purchases."""
+    bought = list(purchases)
+    chosen = rng.sample(bought, min(len(bought), int(count * VERIFIED_REVIEW_SHARE)))
+    seen = set(chosen)
+    yield from chosen
+    for pair in _unique_pairs(rng, count, catalogue, people):
+        if len(seen) >= count:
+            return
+        if pair not in seen:
+            seen.add(pair)
+            yield pair
+
+
+async def _reviews(writer: _BatchWriter, rng: random.Random, count: int, now: datetime, catalogue: _Catalogue, people: _People, purchases: _Purchases) -> None:
+    for user_index, product_index in _review_pairs(rng, count, catalogue, people, purchases):
+        created = _random_past(rng, now, 365)
+        text = rng.choice(REVIEW_SNIPPETS)
+        await writer.add(
+            Review,
+            {
+                "_id": ObjectId(),
+                "user": people.ids[user_index],
+                "userId": people.ids[user_index],
+                "product": catalogue.ids[product_index],
+                "productId": catalogue.ids[product_index],
+                "reviewerName": people.names[user_index],
+                "rating": rng.choices([1, 2, 3, 4, 5], RATING_WEIGHTS)[0],
+                "title": None,
+                "comment": text,
+                "reviewText": text,
+                "isVerifiedPurchase": (user_index, product_index) in purchases,
+                "isApproved": rng.random() < 0.97,
+                "isDeleted": False,
+                "helpfulCount": int(rng.paretovariate(1.5)) - 1,
+                "createdAt": created,
+                "updatedAt": created,
+            },
+        )
+
+
+async def _wishlists(writer: _BatchWriter, rng: random.Random, count: int, now: datetime, catalogue: _Catalogue, people: _People) -> None:
+    for user_index, product_index in _unique_pairs(rng, count, catalogue, people):
+        created = _random_past(rng, now, 180)
+        await writer.add(
+            Wishlist,
+            {
+                "_id": ObjectId(),
+                "user": people.ids[user_index],
+                "product": catalogue.ids[product_index],
+                "createdAt": created,
+                "updatedAt": created,
+            },
+        )
+
+
+async def seedAtScale(
+    scale: float,
+    *,
+    passwordHash: str,
+    batchSize: int = 1000,
+    concurrency: int = 4,
+    randomSeed: Optional[int] = None,
+) -> Dict[str, int]:
+    counts = {name: max(1, int(base * scale)) for name, base in BASE_COUNTS.items()}
+    rng = random.Random(randomSeed)
+    now = datetime.utcnow()
+    writer = _BatchWriter(batchSize, concurrency)
+    print(f"Generating at scale {scale:g}: " + ", ".join(f"{count} {name}" for name, count in counts.items()))
+
+    started = time.perf_counter()
+    catalogue = await _products(writer, rng, counts["products"], now)
+    people = await _users(writer, rng, counts["users"], now, passwordHash)
+    await _carts(writer, rng, counts["carts"], now, catalogue, people)
+    purchases = await _orders(writer, rng, counts["orders"], now, catalogue, people)
+    await _verified_purchases(writer, now, catalogue, people, purchases)
+    await _reviews(writer, rng, counts["reviews"], now, catalogue, people, purchases)
+    await _wishlists(writer, rng, counts["wishlists"], now, catalogue, people)
+    await writer.flush()
+    elapsed = time.perf_counter() - started
+
+    total = sum(writer.inserted.values())
+    for name, inserted in sorted(writer.inserted.items()):
+        batch_ms = writer.seconds[name] / writer.batches[name] * 1000
+        print(f"  {name:<18} {inserted:>9} docs  {writer.batches[name]:>6} batches  {batch_ms:>8.1f} ms/batch")
+    print(f"Inserted {total} documents in {elapsed:.1f}s ({total / elapsed:.0f} inserts/sec overall)")
+    return writer.inserted
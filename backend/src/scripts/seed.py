@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import argparse
 import asyncio
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import List, Optional
 
 from dotenv import load_dotenv
 from passlib.context import CryptContext
@@ -15,8 +17,14 @@ from ..models import (
     OrderItem,
     Payment,
     Product,
+    Review,
+    ReviewVote,
     User,
+    VerifiedPurchase,
+    Wishlist,
 )
+from ..services.purchaseService import recordOrderPurchases
+from .scaleSeed import seedAtScale
 
 ENV_PATH = Path(__file__).resolve().parents[2] / ".env"
 if ENV_PATH.exists():
@@ -33,10 +41,13 @@ async def clear_collections():
     await Order.find_all().delete()
     await Product.find_all().delete()
     await User.find_all().delete()
+    await ReviewVote.find_all().delete()
+    await Review.find_all().delete()
+    await Wishlist.find_all().delete()
+    await VerifiedPurchase.find_all().delete()
 
 
-async def seed_data():
-    password_hash = password_context.hash("demo-password")
+async def seed_data(password_hash: str):
 
     admin_user = User(
         fullName="Kana Vindu Admin",
@@ -148,6 +159,7 @@ async def seed_data():
         for item in cart_items
     ]
     await OrderItem.insert_many(order_items)
+    await recordOrderPurchases(order, order_items)
 
     payment = Payment(
         order=order.id,
@@ -177,9 +189,10 @@ async def seed_data():
 
 
 async def run_checks(context):
-    products = await Product.find_all().to_list()
+    # Capped: a --scale run adds thousands of products.
+    products = await Product.find_all().limit(10).to_list()
     print(
-        f"Products available ({len(products)}):",
+        f"Products available ({await Product.find_all().count()}):",
         [
             {"name": product.name, "pricePaise": product.price, "stock": product.stock}
             for product in products
@@ -223,14 +236,23 @@ async def run_checks(context):
     )
 
 
-async def main():
+async def main(args):
     await connect_to_database()
     try:
         print("Connected to database. Clearing collections...")
         await clear_collections()
         print("Seeding sample data...")
-        seeded = await seed_data()
+        password_hash = password_context.hash("demo-password")
+        seeded = await seed_data(password_hash)
         print("Sample data created successfully.")
+        if args.scale:
+            await seedAtScale(
+                args.scale,
+                passwordHash=password_hash,
+                batchSize=args.batch_size,
+                concurrency=args.concurrency,
+                randomSeed=args.random_seed,
+            )
         print("Running verification queries...")
         await run_checks(seeded)
         print("Seed script completed.")
@@ -238,5 +260,19 @@ async def main():
         await disconnect_from_database()
 
 
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Reset the database with demo data.")
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=0,
+        help="Also generate synthetic data for performance work; 1 = ~2k products, 20k users, 40k orders.",
+    )
+    parser.add_argument("--batch-size", type=int, default=1000, help="Documents per insert_many call.")
+    parser.add_argument("--concurrency", type=int, default=4, help="insert_many batches in flight at once.")
+    parser.add_argument("--random-seed", type=int, default=None, help="Make the synthetic data reproducible.")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,56 @@
+"""
+Reconcile MongoDB indexes with the models.
+
+Run on deploy when the app starts with DB_INDEX_MODE=manual (or to surface
+failures that DB_INDEX_MODE=background only logs). Missing indexes are created;
+--drop-stale also drops indexes no longer declared on a model.
+
+    python -m src.scripts.syncIndexes
+    python -m src.scripts.syncIndexes --drop-stale
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from dotenv import load_dotenv
+
+ENV_PATH = Path(__file__).resolve().parents[2] / ".env"
+if ENV_PATH.exists():
+    load_dotenv(ENV_PATH)
+
+
+async def run(args) -> bool:
+    from ..db import connect_to_database, disconnect_from_database, sync_indexes
+    from ..models import DOCUMENT_MODELS
+
+    await connect_to_database(index_mode="manual")
+    try:
+        started = time.perf_counter()
+        synced = await sync_indexes(drop_stale=args.drop_stale)
+        elapsed = time.perf_counter() - started
+    finally:
+        await disconnect_from_database()
+
+    for collection, seconds in sorted(synced.items()):
+        print(f"{collection:<24} {seconds * 1000:8.1f} ms")
+    failed = sorted({model.get_collection_name() for model in DOCUMENT_MODELS} - set(synced))
+    print(f"Synced {len(synced)}/{len(DOCUMENT_MODELS)} collections in {elapsed * 1000:.1f} ms")
+    if failed:
+        print(f"Failed: {', '.join(failed)} (see log for details)")
+    return not failed
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Create missing MongoDB indexes declared on the models.")
+    parser.add_argument("--drop-stale", action="store_true", help="Also drop indexes the models no longer declare.")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(run(parse_args())) else 1)
@@ -0,0 +1,46 @@
+"""
+Copy each reviewer's current fullName onto their reviews.
+
+Run once after deploying reviewerName to backfill existing reviews, then after
+names are edited (or on a schedule). The API itself never renames users; names
+change only outside it, for example in the admin backend or the shared database.
+
+    python -m src.scripts.syncReviewerNames --batch-size 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from dotenv import load_dotenv
+
+from ..db import connect_to_database, disconnect_from_database
+from ..services.reviewerSync import reconcileReviewerNames
+
+ENV_PATH = Path(__file__).resolve().parents[2] / ".env"
+if ENV_PATH.exists():
+    load_dotenv(ENV_PATH)
+
+
+async def run(args) -> None:
+    await connect_to_database()
+    started = time.perf_counter()
+    try:
+        modified = await reconcileReviewerNames(batchSize=args.batch_size)
+    finally:
+        await disconnect_from_database()
+    print(f"Updated reviewer names on {modified} reviews in {time.perf_counter() - started:.2f}s")
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Sync denormalized reviewer names on reviews.")
+    parser.add_argument("--batch-size", type=int, default=500, help="Reviewers per users lookup and bulk write.")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
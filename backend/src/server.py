@@ -23,10 +23,24 @@ from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.responses import JSONResponse, RedirectResponse
 
 from .db import connect_to_database, disconnect_from_database
+from .middlewares.queryStats import QueryStatsMiddleware
+from .middlewares.requestContext import RequestContextMiddleware
+from .middlewares.requestMetrics import RequestMetricsMiddleware
+from .services.accessDenylist import startAccessDenylistSync, stopAccessDenylistSync
+from .services.emailOutbox import startOutboxWorker, stopOutboxWorker
+from .services.googleTokenService import startGoogleKeyWarmup, stopGoogleKeyRefresh
+from .services.mailer import stopMailer
+from .services.passwordService import startPasswordExecutor, stopPasswordExecutor
+from .services.principalCache import startInvalidationSync, stopInvalidationSync
+from .services.queryStats import QUERY_STATS_ENABLED
+from .services.runtimeMetrics import startRuntimeMetrics, stopRuntimeMetrics
+from .services.sessionCompaction import startSessionCompaction, stopSessionCompaction
+from .services.structuredLogging import configureLogging
 from .routes import (
     admin_router,
     auth_router,
     cart_router,
+    metrics_router,
     orders_router,
     payments_router,
     products_router,
@@ -35,6 +49,7 @@ from .routes import (
     wishlist_router,
 )
 
+configureLogging()
 logger = logging.getLogger("uvicorn.error")
 
 
@@ -54,11 +69,26 @@ def _build_allowed_origins(port: int) -> List[str]:
 
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
+    startRuntimeMetrics()
     await connect_to_database()
+    startInvalidationSync()
+    startAccessDenylistSync()
+    startPasswordExecutor()
+    startGoogleKeyWarmup()
+    startOutboxWorker()
+    startSessionCompaction()
     try:
         yield
     finally:
+        await stopSessionCompaction()
+        await stopOutboxWorker()
+        await stopMailer()
+        await stopGoogleKeyRefresh()
+        stopPasswordExecutor()
+        await stopAccessDenylistSync()
+        await stopInvalidationSync()
         await disconnect_from_database()
+        await stopRuntimeMetrics()
 
 
 def create_app() -> FastAPI:
@@ -72,6 +102,12 @@ def create_app() -> FastAPI:
         lifespan=lifespan,
     )
 
+    if QUERY_STATS_ENABLED:
+        app.add_middleware(QueryStatsMiddleware)
+    app.add_middleware(RequestMetricsMiddleware)
+    # Outermost of ours, so query warnings and handler logs carry the request ID.
+    app.add_middleware(RequestContextMiddleware)
+
     allowed_origins = _build_allowed_origins(port)
     if allowed_origins:
         app.add_middleware(
@@ -125,6 +161,7 @@ def register_routes(app: FastAPI) -> None:
     app.include_router(admin_router, prefix="/api/admin", tags=["admin"])
     app.include_router(wishlist_router, prefix="/api/wishlist", tags=["wishlist"])
     app.include_router(reviews_router, prefix="/api/reviews", tags=["reviews"])
+    app.include_router(metrics_router, prefix="/metrics", tags=["system"])
 
 
 def register_exception_handlers(app: FastAPI) -> None:
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from ..models import Session
+from .metrics import registerGauge
+
+logger = logging.getLogger(__name__)
+
+# Opt-in: access tokens are trusted on signature and expiry, and only checked
+# against this denylist instead of loading the session on every request.
+STATELESS_ACCESS_TOKENS = str(os.getenv("AUTH_STATELESS_ACCESS", "false")).lower() == "true"
+STATELESS_ACCESS_EXPIRY_SECONDS = int(os.getenv("AUTH_STATELESS_ACCESS_EXPIRY_SECONDS", "300"))
+DENYLIST_SYNC_INTERVAL = float(os.getenv("AUTH_DENYLIST_SYNC_INTERVAL", "2"))
+# revokedAt is stamped by whichever worker handled the logout, so overlap
+# polls and keep entries a little longer to tolerate clock skew.
+_CLOCK_SKEW_SECONDS = 5
+
+
+class AccessDenylist:
+    """
+    Sessions revoked within the last access-token lifetime. Older revocations
+    need no entry: every access token minted for them has already expired.
+    """
+
+    def __init__(self, retention_seconds: float):
+        self.retention_seconds = retention_seconds + _CLOCK_SKEW_SECONDS
+        self._sessions: Dict[str, float] = {}
+        # user ID -> epoch seconds; tokens issued before it are rejected.
+        self._users: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._sessions) + len(self._users)
+
+    def addSession(self, session_id: str, revoked_at: Optional[datetime] = None) -> None:
+        self._sessions[session_id] = _epoch(revoked_at) + self.retention_seconds
+
+    def addUser(self, user_id: str, revoked_at: Optional[datetime] = None) -> None:
+        self._users[user_id] = _epoch(revoked_at)
+
+    def isRevoked(self, session_id: str, user_id: str, issued_at: float) -> bool:
+        if session_id in self._sessions:
+            return True
+        revoked_before = self._users.get(user_id)
+        return revoked_before is not None and issued_at < int(revoked_before)
+
+    def prune(self) -> None:
+        now = time.time()
+        for session_id in [key for key, until in self._sessions.items() if until <= now]:
+            del self._sessions[session_id]
+        cutoff = now - self.retention_seconds
+        for user_id in [key for key, revoked in self._users.items() if revoked <= cutoff]:
+            del self._users[user_id]
+
+    def clear(self) -> None:
+        self._sessions.clear()
+        self._users.clear()
+
+
+def _epoch(value: Optional[datetime]) -> float:
+    if value is None:
+        return time.time()
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+access_denylist = AccessDenylist(STATELESS_ACCESS_EXPIRY_SECONDS)
+
+registerGauge("auth_access_denylist_entries", "Revoked sessions and users held in the access-token denylist.", lambda: len(access_denylist))
+
+_sync_task: Optional[asyncio.Task] = None
+
+
+async def _load_revocations(since: datetime) -> None:
+    # Served by the partial revokedAt index on sessions.
+    cursor = Session.get_motor_collection().find(
+        {"revokedAt": {"$gte": since}},
+        {"_id": 1, "revokedAt": 1},
+    )
+    async for doc in cursor:
+        access_denylist.addSession(str(doc["_id"]), doc["revokedAt"])
+
+
+async def _sync_revocations() -> None:
+    since = datetime.now(tz=timezone.utc) - timedelta(seconds=access_denylist.retention_seconds)
+    while True:
+        try:
+            polled_at = datetime.now(tz=timezone.utc)
+            await _load_revocations(since - timedelta(seconds=_CLOCK_SKEW_SECONDS))
+            access_denylist.prune()
+            since = polled_at
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Access denylist sync failed")
+        await asyncio.sleep(DENYLIST_SYNC_INTERVAL)
+
+
+def startAccessDenylistSync() -> None:
+    global _sync_task
+    if not STATELESS_ACCESS_TOKENS or _sync_task is not None:
+        return
+    _sync_task = asyncio.create_task(_sync_revocations())
+
+
+async def stopAccessDenylistSync() -> None:
+    global _sync_task
+    if _sync_task is None:
+        return
+    _sync_task.cancel()
+    try:
+        await _sync_task
+    except asyncio.CancelledError:
+        pass
+    _sync_task = None
+    access_denylist.clear()
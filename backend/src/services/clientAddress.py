@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import ipaddress
+import logging
+import os
+from typing import List, Optional, Union
+
+from starlette.requests import Request
+
+logger = logging.getLogger(__name__)
+
+_Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+def _parse_trusted(value: str) -> List[_Network]:
+    networks = []
+    for entry in value.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        try:
+            networks.append(ipaddress.ip_network(entry, strict=False))
+        except ValueError:
+            logger.warning("Ignoring invalid TRUSTED_PROXIES entry", extra={"entry": entry})
+    return networks
+
+
+# Reverse proxies / load balancers (IPs or CIDRs) whose X-Forwarded-For is believed.
+TRUSTED_PROXIES = _parse_trusted(os.getenv("TRUSTED_PROXIES", ""))
+_warned_untrusted_forwarding = False
+
+
+def _is_trusted(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in TRUSTED_PROXIES)
+
+
+def _warn_untrusted_forwarding(peer: str) -> None:
+    # Behind a proxy that is not listed, every client shares the proxy's address,
+    # so per-IP limits and session IPs are all keyed on the proxy. Say so once.
+    global _warned_untrusted_forwarding
+    if _warned_untrusted_forwarding:
+        return
+    _warned_untrusted_forwarding = True
+    logger.warning(
+        "X-Forwarded-For received from a peer not in TRUSTED_PROXIES; using the peer address as the client IP",
+        extra={"peer": peer},
+    )
+
+
+def clientIp(request: Request) -> Optional[str]:
+    """
+    The caller's address. When the peer is a trusted proxy, X-Forwarded-For is
+    walked from the right and the first hop not in TRUSTED_PROXIES is used, so a
+    client cannot pick its own address by prepending entries.
+    """
+    peer = request.client.host if request.client else None
+    if peer is None:
+        return None
+    if not TRUSTED_PROXIES or not _is_trusted(peer):
+        if "x-forwarded-for" in request.headers:
+            _warn_untrusted_forwarding(peer)
+        return peer
+    hops = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _is_trusted(hop):
+            return hop
+    return hops[0] if hops else peer
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from pymongo import ReturnDocument
+
+from ..models import EmailOutbox
+from .mailer import renderOtpEmail, renderPasswordResetEmail, sendMail
+from .metrics import registerCounter
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_BATCH_SIZE = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", "20"))
+OUTBOX_POLL_INTERVAL_SECONDS = float(os.getenv("EMAIL_OUTBOX_POLL_INTERVAL", "1"))
+OUTBOX_LEASE_SECONDS = int(os.getenv("EMAIL_OUTBOX_LEASE_SECONDS", "60"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "6"))
+OUTBOX_RETRY_BASE_SECONDS = float(os.getenv("EMAIL_OUTBOX_RETRY_BASE_SECONDS", "5"))
+OUTBOX_ENABLED = str(os.getenv("EMAIL_OUTBOX_WORKER", "true")).lower() == "true"
+OUTBOX_RETENTION_DAYS = float(os.getenv("EMAIL_OUTBOX_RETENTION_DAYS", "7"))
+# Only the most recent attempts are kept on the document.
+_ATTEMPT_LOG_LIMIT = 10
+# OTP and reset bodies must not outlive delivery: finished rows keep only the envelope.
+_CLEAR_BODY = {"text": "", "html": ""}
+
+_claimed = registerCounter("email_outbox_claimed_total", "Outbox messages leased by a delivery worker.")
+_delivered = registerCounter("email_outbox_delivered_total", "Outbox messages delivered.")
+_deferred = registerCounter("email_outbox_deferred_total", "Outbox deliveries that failed and were rescheduled.")
+_dead = registerCounter("email_outbox_failed_total", "Outbox messages abandoned after EMAIL_OUTBOX_MAX_ATTEMPTS.")
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+_wakeup: Optional[asyncio.Event] = None
+_loop_task: Optional[asyncio.Task] = None
+
+
+def _now() -> datetime:
+    return datetime.now(tz=timezone.utc)
+
+
+async def enqueueEmail(*, to: str, subject: str, text: Optional[str] = None, html: Optional[str] = None, kind: str = "generic") -> EmailOutbox:
+    entry = EmailOutbox(kind=kind, to=to, subject=subject, text=text, html=html, nextAttemptAt=_now())
+    await entry.insert()
+    if _wakeup is not None:
+        _wakeup.set()
+    return entry
+
+
+async def queueOtpEmail(*, to: str, otp: str, expiresMinutes: int = 10) -> EmailOutbox:
+    return await enqueueEmail(to=to, kind="otp", **renderOtpEmail(otp=otp, expiresMinutes=expiresMinutes))
+
+
+async def queuePasswordResetEmail(*, to: str, otp: str, expiresMinutes: int = 10) -> EmailOutbox:
+    return await enqueueEmail(to=to, kind="passwordReset", **renderPasswordResetEmail(otp=otp, expiresMinutes=expiresMinutes))
+
+
+async def _claim_one(worker_id: str) -> Optional[EmailOutbox]:
+    now = _now()
+    raw = await EmailOutbox.get_motor_collection().find_one_and_update(
+        {
+            "nextAttemptAt": {"$lte": now},
+            "$or": [
+                {"status": "pending"},
+                # A worker died mid-send; its lease ran out, so the message is up for grabs.
+                {"status": "sending", "leaseExpiresAt": {"$lte": now}},
+            ],
+        },
+        {
+            "$set": {
+                "status": "sending",
+                "leaseOwner": worker_id,
+                "leaseExpiresAt": now + timedelta(seconds=OUTBOX_LEASE_SECONDS),
+                "updatedAt": now,
+            },
+            "$inc": {"attempts": 1},
+        },
+        sort=[("nextAttemptAt", 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+    if raw is None:
+        return None
+    _claimed.inc()
+    return EmailOutbox.model_validate(raw)
+
+
+async def claimBatch(worker_id: str = WORKER_ID, limit: int = OUTBOX_BATCH_SIZE) -> List[EmailOutbox]:
+    batch: List[EmailOutbox] = []
+    while len(batch) < limit:
+        entry = await _claim_one(worker_id)
+        if entry is None:
+            break
+        batch.append(entry)
+    return batch
+
+
+async def _deliver(entry: EmailOutbox, worker_id: str) -> None:
+    now = _now()
+    lease = {"_id": entry.id, "leaseOwner": worker_id, "status": "sending"}
+    attempt = {"at": now, "worker": worker_id, "error": None}
+    try:
+        # Retries are scheduled through the outbox, so the mailer gets a single attempt.
+        await sendMail(to=entry.to, subject=entry.subject, text=entry.text, html=entry.html, maxAttempts=1)
+    except Exception as exc:
+        attempt["error"] = str(exc)[:500]
+        exhausted = entry.attempts >= OUTBOX_MAX_ATTEMPTS
+        delay = OUTBOX_RETRY_BASE_SECONDS * (2 ** (entry.attempts - 1))
+        update = {
+            "$set": {
+                "status": "failed" if exhausted else "pending",
+                "nextAttemptAt": now + timedelta(seconds=delay),
+                "leaseOwner": None,
+                "leaseExpiresAt": None,
+                "lastError": attempt["error"],
+                "updatedAt": now,
+            },
+            "$push": {"attemptLog": {"$each": [attempt], "$slice": -_ATTEMPT_LOG_LIMIT}},
+        }
+        if exhausted:
+            update["$set"]["expiresAt"] = now + timedelta(days=OUTBOX_RETENTION_DAYS)
+            update["$unset"] = _CLEAR_BODY
+        await EmailOutbox.get_motor_collection().update_one(lease, update)
+        if exhausted:
+            _dead.inc()
+            logger.error("Outbox message abandoned", extra={"outboxId": str(entry.id), "to": entry.to, "attempts": entry.attempts})
+        else:
+            _deferred.inc()
+            logger.warning("Outbox delivery failed; rescheduled", extra={"outboxId": str(entry.id), "delaySeconds": delay})
+        return
+
+    await EmailOutbox.get_motor_collection().update_one(
+        lease,
+        {
+            "$set": {
+                "status": "sent",
+                "sentAt": now,
+                "expiresAt": now + timedelta(days=OUTBOX_RETENTION_DAYS),
+                "leaseOwner": None,
+                "leaseExpiresAt": None,
+                "lastError": None,
+                "updatedAt": now,
+            },
+            "$unset": _CLEAR_BODY,
+            "$push": {"attemptLog": {"$each": [attempt], "$slice": -_ATTEMPT_LOG_LIMIT}},
+        },
+    )
+    _delivered.inc()
+
+
+async def deliverBatch(worker_id: str = WORKER_ID, limit: int = OUTBOX_BATCH_SIZE) -> int:
+    batch = await claimBatch(worker_id, limit)
+    if batch:
+        # Concurrency is bounded by the mailer's SMTP connection pool.
+        await asyncio.gather(*[_deliver(entry, worker_id) for entry in batch])
+    return len(batch)
+
+
+async def _delivery_loop() -> None:
+    assert _wakeup is not None
+    while True:
+        try:
+            delivered = await deliverBatch()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Outbox delivery loop iteration failed")
+            delivered = 0
+        if delivered:
+            continue
+        _wakeup.clear()
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=OUTBOX_POLL_INTERVAL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+
+def startOutboxWorker() -> None:
+    global _wakeup, _loop_task
+    if not OUTBOX_ENABLED or _loop_task is not None:
+        return
+    _wakeup = asyncio.Event()
+    _loop_task = asyncio.create_task(_delivery_loop())
+
+
+async def stopOutboxWorker() -> None:
+    global _wakeup, _loop_task
+    if _loop_task is None:
+        return
+    _loop_task.cancel()
+    try:
+        await _loop_task
+    except asyncio.CancelledError:
+        pass
+    _loop_task = None
+    _wakeup = None
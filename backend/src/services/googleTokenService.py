@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import re
+import time
+from typing import TYPE_CHECKING, Dict, Optional
+
+import jwt
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_JWKS_URL = os.getenv("GOOGLE_JWKS_URL", "https://www.googleapis.com/oauth2/v3/certs")
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+# Refresh this long before max-age runs out so sign-ins never wait on Google.
+JWKS_REFRESH_MARGIN_SECONDS = int(os.getenv("GOOGLE_JWKS_REFRESH_MARGIN", "300"))
+JWKS_DEFAULT_MAX_AGE_SECONDS = 3600
+# Unknown "kid" forces a refetch, but not more often than this.
+JWKS_MIN_REFETCH_SECONDS = 30
+
+_MAX_AGE_PATTERN = re.compile(r"max-age=(\d+)")
+
+
+class GoogleTokenError(Exception):
+    def __init__(self, message: str, status: int = 401):
+        super().__init__(message)
+        self.status = status
+
+
+def _parse_max_age(cache_control: Optional[str]) -> int:
+    match = _MAX_AGE_PATTERN.search(cache_control or "")
+    return int(match.group(1)) if match else JWKS_DEFAULT_MAX_AGE_SECONDS
+
+
+class JwksVerifier:
+    """Verifies RS256 ID tokens against an in-memory copy of a JWKS endpoint."""
+
+    def __init__(self, jwks_url: str, *, issuers: tuple[str, ...], client: Optional[httpx.AsyncClient] = None):
+        self.jwks_url = jwks_url
+        self.issuers = issuers
+        self._client = client
+        self._keys: Dict[str, jwt.PyJWK] = {}
+        self._expires_at = 0.0
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            # Deferred until the first JWKS fetch; without GOOGLE_CLIENT_ID it never happens.
+            import httpx
+
+            self._client = httpx.AsyncClient(timeout=10)
+        return self._client
+
+    async def refresh(self, *, stale_since: Optional[float] = None) -> None:
+        async with self._lock:
+            if stale_since is not None and self._fetched_at > stale_since:
+                # Another request refreshed while we waited on the lock.
+                return
+            response = await self._get_client().get(self.jwks_url)
+            response.raise_for_status()
+            keys: Dict[str, jwt.PyJWK] = {}
+            for entry in response.json().get("keys", []):
+                kid = entry.get("kid")
+                if not kid:
+                    continue
+                try:
+                    keys[kid] = jwt.PyJWK(entry)
+                except jwt.PyJWTError:
+                    logger.warning("Skipping unusable JWKS entry", extra={"kid": kid})
+            now = time.monotonic()
+            self._keys = keys
+            self._fetched_at = now
+            self._expires_at = now + _parse_max_age(response.headers.get("cache-control"))
+            logger.info("JWKS refreshed", extra={"url": self.jwks_url, "keys": len(keys)})
+
+    def refreshInBackground(self) -> None:
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+
+        async def _run():
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("JWKS refresh failed", extra={"url": self.jwks_url})
+
+        self._refresh_task = asyncio.create_task(_run())
+
+    async def _get_key(self, kid: str) -> jwt.PyJWK:
+        now = time.monotonic()
+        seen = self._fetched_at
+        if not self._keys or now >= self._expires_at:
+            try:
+                await self.refresh(stale_since=seen)
+            except Exception as exc:
+                if not self._keys:
+                    raise GoogleTokenError("Unable to fetch token signing keys.", status=503) from exc
+                # Google rotates keys slowly; keep serving the stale set rather than failing sign-in.
+                logger.warning("JWKS refresh failed; using stale keys", extra={"url": self.jwks_url})
+        elif now >= self._expires_at - JWKS_REFRESH_MARGIN_SECONDS:
+            self.refreshInBackground()
+
+        key = self._keys.get(kid)
+        if key is None and time.monotonic() - self._fetched_at >= JWKS_MIN_REFETCH_SECONDS:
+            try:
+                await self.refresh(stale_since=self._fetched_at)
+            except Exception:
+                logger.warning("JWKS refetch for unknown kid failed", extra={"kid": kid})
+            key = self._keys.get(kid)
+        if key is None:
+            raise GoogleTokenError("Unknown token signing key.")
+        return key
+
+    async def verify(self, token: str, audience: str) -> dict:
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.PyJWTError as exc:
+            raise GoogleTokenError("Malformed token.") from exc
+
+        key = await self._get_key(header.get("kid") or "")
+        try:
+            claims = jwt.decode(
+                token,
+                key=key.key,
+                algorithms=[key.algorithm_name or "RS256"],
+                audience=audience,
+                options={"require": ["exp", "iat", "iss", "aud", "sub"]},
+            )
+        except jwt.PyJWTError as exc:
+            raise GoogleTokenError(f"Invalid token: {exc}") from exc
+
+        if claims.get("iss") not in self.issuers:
+            raise GoogleTokenError("Invalid token issuer.")
+        return claims
+
+    async def close(self) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+google_verifier = JwksVerifier(GOOGLE_JWKS_URL, issuers=GOOGLE_ISSUERS)
+
+
+async def verifyGoogleIdToken(token: str, clientId: str) -> dict:
+    return await google_verifier.verify(token, clientId)
+
+
+def startGoogleKeyWarmup() -> None:
+    if os.getenv("GOOGLE_CLIENT_ID"):
+        google_verifier.refreshInBackground()
+
+
+async def stopGoogleKeyRefresh() -> None:
+    await google_verifier.close()
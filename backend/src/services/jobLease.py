@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from pymongo.errors import DuplicateKeyError
+
+from ..models import JobLease
+
+LEASE_OWNER = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+async def acquireLease(name: str, seconds: float, owner: str = LEASE_OWNER) -> bool:
+    """
+    Take (or renew) the lease on ``name`` for ``seconds``. Returns False while
+    another worker holds an unexpired lease, so periodic jobs started in every
+    worker run in only one of them per period.
+    """
+    now = datetime.now(tz=timezone.utc)
+    try:
+        await JobLease.get_motor_collection().update_one(
+            {"name": name, "$or": [{"expiresAt": {"$lte": now}}, {"owner": owner}]},
+            {
+                "$set": {"owner": owner, "expiresAt": now + timedelta(seconds=seconds), "updatedAt": now},
+                "$setOnInsert": {"createdAt": now},
+            },
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        # The row exists and is held by someone else; the upsert's insert lost.
+        return False
+    return True
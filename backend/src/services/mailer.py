@@ -1,14 +1,28 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
+import time
 from email.message import EmailMessage
-from typing import Optional
+from typing import List, Optional
 
 import aiosmtplib
 
+from .metrics import registerCounter
+
 logger = logging.getLogger(__name__)
 
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "2"))
+SMTP_IDLE_TIMEOUT_SECONDS = float(os.getenv("SMTP_IDLE_TIMEOUT", "60"))
+MAIL_MAX_ATTEMPTS = int(os.getenv("MAIL_MAX_ATTEMPTS", "4"))
+MAIL_RETRY_BASE_SECONDS = float(os.getenv("MAIL_RETRY_BASE_SECONDS", "0.5"))
+
+_sent = registerCounter("mail_sent_total", "Emails accepted by the SMTP server.")
+_failed = registerCounter("mail_failed_total", "Emails dropped after exhausting retries.")
+_retries = registerCounter("mail_retries_total", "Email send attempts that were retried.")
+_connections_opened = registerCounter("smtp_connections_opened_total", "SMTP sessions (connect + TLS + AUTH) opened.")
+
 
 class MailerError(Exception):
     def __init__(self, message: str, status: int = 500):
@@ -16,28 +30,109 @@ class MailerError(Exception):
         self.status = status
 
 
+_config: Optional[dict] = None
+
+
 def _smtp_config():
+    global _config
+    if _config is not None:
+        return _config
     host = os.getenv("SMTP_HOST")
     port = os.getenv("SMTP_PORT")
     if not host or not port:
         raise MailerError("SMTP configuration is incomplete. Please set SMTP_HOST and SMTP_PORT.")
     secure = str(os.getenv("SMTP_SECURE", "false")).lower() == "true"
+    # Plain-text relays (local stand-ins, in-cluster relays) can opt out of STARTTLS.
+    start_tls = not secure and str(os.getenv("SMTP_STARTTLS", "true")).lower() == "true"
     username = os.getenv("SMTP_USER")
     password = os.getenv("SMTP_PASS")
     sender = os.getenv("SMTP_FROM") or username
     if not sender:
         raise MailerError("SMTP_FROM or SMTP_USER must be configured")
-    return {
+    _config = {
         "host": host,
         "port": int(port),
         "secure": secure,
+        "start_tls": start_tls,
         "username": username,
         "password": password,
         "sender": sender,
     }
+    return _config
+
+
+class SmtpPool:
+    """Keeps up to ``size`` authenticated SMTP sessions open and reuses them across messages."""
+
+    def __init__(self, size: int):
+        self.size = max(1, size)
+        self._idle: List[tuple[aiosmtplib.SMTP, float]] = []
+        self._slots = asyncio.Semaphore(self.size)
+
+    async def _open(self) -> aiosmtplib.SMTP:
+        config = _smtp_config()
+        client = aiosmtplib.SMTP(
+            hostname=config["host"],
+            port=config["port"],
+            username=config["username"],
+            password=config["password"],
+            use_tls=config["secure"],
+            start_tls=config["start_tls"],
+        )
+        await client.connect()
+        _connections_opened.inc()
+        return client
+
+    async def _close(self, client: aiosmtplib.SMTP) -> None:
+        try:
+            await client.quit()
+        except Exception:
+            client.close()
+
+    async def _checkout(self) -> aiosmtplib.SMTP:
+        while self._idle:
+            client, idle_since = self._idle.pop()
+            if client.is_connected and time.monotonic() - idle_since < SMTP_IDLE_TIMEOUT_SECONDS:
+                return client
+            await self._close(client)
+        return await self._open()
+
+    async def send(self, message: EmailMessage) -> None:
+        async with self._slots:
+            client = await self._checkout()
+            try:
+                await client.send_message(message)
+            except aiosmtplib.SMTPServerDisconnected:
+                # The server dropped an idle session; retry once on a fresh one.
+                client.close()
+                client = await self._open()
+                try:
+                    await client.send_message(message)
+                except Exception:
+                    client.close()
+                    raise
+            except Exception:
+                client.close()
+                raise
+            self._idle.append((client, time.monotonic()))
 
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for client, _ in idle:
+            await self._close(client)
 
-async def sendMail(*, to: str, subject: str, text: Optional[str] = None, html: Optional[str] = None):
+
+_pool: Optional[SmtpPool] = None
+
+
+def _get_pool() -> SmtpPool:
+    global _pool
+    if _pool is None:
+        _pool = SmtpPool(SMTP_POOL_SIZE)
+    return _pool
+
+
+def _build_message(*, to: str, subject: str, text: Optional[str], html: Optional[str]) -> EmailMessage:
     config = _smtp_config()
     message = EmailMessage()
     message["From"] = config["sender"]
@@ -47,20 +142,50 @@ async def sendMail(*, to: str, subject: str, text: Optional[str] = None, html: O
         message.set_content(text)
     if html:
         message.add_alternative(html, subtype="html")
+    return message
 
-    await aiosmtplib.send(
-        message,
-        hostname=config["host"],
-        port=config["port"],
-        username=config["username"],
-        password=config["password"],
-        start_tls=not config["secure"],
-        use_tls=config["secure"],
-    )
-    logger.info("[Mailer] message sent", extra={"to": to, "subject": subject})
+
+async def _deliver(message: EmailMessage, max_attempts: int = MAIL_MAX_ATTEMPTS) -> None:
+    for attempt in range(1, max_attempts + 1):
+        try:
+            await _get_pool().send(message)
+            _sent.inc()
+            logger.info("[Mailer] message sent", extra={"to": message["To"], "subject": message["Subject"]})
+            return
+        except (aiosmtplib.SMTPException, OSError) as exc:
+            if attempt == max_attempts:
+                _failed.inc()
+                raise MailerError(f"Failed to send email: {exc}") from exc
+            _retries.inc()
+            delay = MAIL_RETRY_BASE_SECONDS * (2 ** (attempt - 1))
+            logger.warning(
+                "[Mailer] send failed, retrying",
+                extra={"to": message["To"], "attempt": attempt, "delaySeconds": delay, "error": str(exc)},
+            )
+            await asyncio.sleep(delay)
+
+
+async def stopMailer() -> None:
+    """Close the pooled SMTP sessions; called from the app lifespan on shutdown."""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+async def sendMail(
+    *,
+    to: str,
+    subject: str,
+    text: Optional[str] = None,
+    html: Optional[str] = None,
+    maxAttempts: int = MAIL_MAX_ATTEMPTS,
+):
+    """Send immediately over a pooled connection, retrying with backoff."""
+    await _deliver(_build_message(to=to, subject=subject, text=text, html=html), maxAttempts)
 
 
-async def sendOtpEmail(*, to: str, otp: str, expiresMinutes: int = 10):
+def renderOtpEmail(*, otp: str, expiresMinutes: int = 10) -> dict:
     subject = "Your Kana Vindu verification code"
     text = (
         f"Use the following verification code to complete your signup: {otp}. "
@@ -73,10 +198,10 @@ async def sendOtpEmail(*, to: str, otp: str, expiresMinutes: int = 10):
     <p>If you didn't request this code, please ignore this email.</p>
     <p>&mdash; Kana Vindu</p>
     """
-    await sendMail(to=to, subject=subject, text=text, html=html)
+    return {"subject": subject, "text": text, "html": html}
 
 
-async def sendPasswordResetEmail(*, to: str, otp: str, expiresMinutes: int = 10):
+def renderPasswordResetEmail(*, otp: str, expiresMinutes: int = 10) -> dict:
     subject = "Reset your Kana Vindu password"
     text = (
         f"Use this code to reset your password: {otp}. "
@@ -89,5 +214,5 @@ async def sendPasswordResetEmail(*, to: str, otp: str, expiresMinutes: int = 10)
     <p>If you didn't request a reset, you can safely ignore this message.</p>
     <p>&mdash; Kana Vindu</p>
     """
-    await sendMail(to=to, subject=subject, text=text, html=html)
+    return {"subject": subject, "text": text, "html": html}
 
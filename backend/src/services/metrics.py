@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import bisect
+import threading
+from typing import Callable, Dict, Iterable, List, Mapping, Sequence, Tuple, Union
+
+_LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> _LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: _LabelKey) -> str:
+    if not key:
+        return ""
+    pairs = [f'{name}="{_escape_label_value(value)}"' for name, value in key]
+    return "{" + ",".join(pairs) + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._values: Dict[_LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(_label_key(labels), 0)
+
+    def total(self) -> float:
+        with self._lock:
+            return sum(self._values.values())
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(key)} {value:g}" for key, value in items]
+
+
+GaugeReading = Union[float, Iterable[Tuple[Mapping[str, str], float]]]
+
+
+class Gauge:
+    """
+    Gauge whose value is read from a callback at scrape time. The callback
+    returns a number, or ``(labels, value)`` pairs for a labelled family.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, read: Callable[[], GaugeReading]):
+        self.name = name
+        self.documentation = documentation
+        self._read = read
+
+    def collect(self) -> List[str]:
+        reading = self._read()
+        if isinstance(reading, (int, float)):
+            return [f"{self.name} {float(reading):g}"]
+        return [f"{self.name}{_format_labels(_label_key(dict(labels)))} {float(value):g}" for labels, value in reading]
+
+
+# Seconds; spans a cached principal lookup up to a slow checkout or bcrypt-bound login.
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: non-cumulative bucket counts (last slot is +Inf), sum, count.
+        self._values: Dict[_LabelKey, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = ([0] * (len(self.buckets) + 1), [0.0])
+                self._values[key] = entry
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    def count(self, **labels: str) -> int:
+        entry = self._values.get(_label_key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(counts), total[0]) for key, (counts, total) in self._values.items()]
+        lines: List[str] = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f"{self.name}_bucket{_format_labels(key + (('le', le),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {total:g}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+
+Metric = Union[Counter, Gauge, Histogram]
+
+_registry: Dict[str, Metric] = {}
+_registry_lock = threading.Lock()
+
+
+def registerCounter(name: str, documentation: str) -> Counter:
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = Counter(name, documentation)
+            _registry[name] = metric
+        return metric  # type: ignore[return-value]
+
+
+def registerGauge(name: str, documentation: str, read: Callable[[], GaugeReading]) -> Gauge:
+    with _registry_lock:
+        metric = Gauge(name, documentation, read)
+        _registry[name] = metric
+        return metric
+
+
+def registerHistogram(name: str, documentation: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = Histogram(name, documentation, buckets)
+            _registry[name] = metric
+        return metric  # type: ignore[return-value]
+
+
+def registerHitRatio(name: str, documentation: str, hits: Counter, misses: Counter) -> Gauge:
+    """Gauge of hits / (hits + misses) over the process lifetime; 0 before the first lookup."""
+
+    def read() -> float:
+        hit_count = hits.total()
+        total = hit_count + misses.total()
+        return hit_count / total if total else 0.0
+
+    return registerGauge(name, documentation, read)
+
+
+def _render(metrics: Iterable[Metric]) -> str:
+    lines: List[str] = []
+    for metric in metrics:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.collect())
+    return "\n".join(lines) + "\n"
+
+
+def renderMetrics() -> str:
+    with _registry_lock:
+        metrics = list(_registry.values())
+    return _render(metrics)
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import hmac
 import os
 import random
 from datetime import datetime, timedelta, timezone
 from typing import Iterable, List
 
-from passlib.hash import bcrypt
-
 from ..models import User
 
 OTP_LENGTH = 6
@@ -14,6 +15,9 @@ OTP_EXPIRY_MINUTES = int(os.getenv("OTP_EXPIRY_MINUTES", "10"))
 OTP_MAX_ATTEMPTS = int(os.getenv("OTP_MAX_ATTEMPTS", "5"))
 OTP_MAX_PER_WINDOW = int(os.getenv("OTP_MAX_PER_WINDOW", "3"))
 OTP_RATE_LIMIT_MINUTES = int(os.getenv("OTP_RATE_LIMIT_MINUTES", "15"))
+# "hmac" (keyed HMAC-SHA256) or "bcrypt"; stored bcrypt hashes always remain verifiable.
+OTP_HASH_SCHEME = os.getenv("OTP_HASH_SCHEME", "hmac").lower()
+HMAC_PREFIX = "hmac-sha256$"
 
 SUPPORTED_BUCKETS = {"emailVerification", "passwordReset"}
 
@@ -42,6 +46,37 @@ def _generate_otp() -> str:
     return f"{random.randint(start, end)}"
 
 
+def _get_pepper() -> bytes:
+    pepper = os.getenv("OTP_HASH_PEPPER") or os.getenv("JWT_REFRESH_SECRET")
+    if not pepper:
+        raise OtpServiceError("OTP_HASH_PEPPER is not configured", status=500)
+    return pepper.encode("utf-8")
+
+
+def _hmac_digest(user: User, bucket_key: str, otp: str) -> str:
+    # Bind the code to the user and bucket so a leaked hash can't be replayed elsewhere.
+    message = f"{user.id}:{bucket_key}:{otp}".encode("utf-8")
+    return hmac.new(_get_pepper(), message, hashlib.sha256).hexdigest()
+
+
+async def _hash_otp(user: User, bucket_key: str, otp: str) -> str:
+    if OTP_HASH_SCHEME == "bcrypt":
+        from passlib.hash import bcrypt
+
+        return await asyncio.to_thread(bcrypt.hash, otp)
+    return HMAC_PREFIX + _hmac_digest(user, bucket_key, otp)
+
+
+async def _otp_matches(user: User, bucket_key: str, otp: str, otp_hash: str) -> bool:
+    if otp_hash.startswith(HMAC_PREFIX):
+        expected = _hmac_digest(user, bucket_key, otp)
+        return hmac.compare_digest(expected, otp_hash[len(HMAC_PREFIX):])
+    # Legacy bcrypt hashes issued before the HMAC scheme; they expire within OTP_EXPIRY_MINUTES.
+    from passlib.hash import bcrypt
+
+    return await asyncio.to_thread(bcrypt.verify, otp, otp_hash)
+
+
 def _normalize_datetime(dt: datetime) -> datetime:
     if dt.tzinfo is None:
         return dt.replace(tzinfo=timezone.utc)
@@ -67,7 +102,7 @@ async def assignOtp(user: User, bucketKey: str = "emailVerification"):
         raise OtpServiceError(f"OTP request limit reached. Please try again after {OTP_RATE_LIMIT_MINUTES} minutes.", status=429)
 
     otp = _generate_otp()
-    otp_hash = bcrypt.hash(otp)
+    otp_hash = await _hash_otp(user, bucketKey, otp)
     now = datetime.now(tz=timezone.utc)
     expires_at = now + timedelta(minutes=OTP_EXPIRY_MINUTES)
 
@@ -93,7 +128,7 @@ async def verifyOtp(user: User, bucketKey: str, otp: str) -> bool:
     if not otp_expires or otp_expires < datetime.now(tz=timezone.utc):
         raise OtpServiceError("OTP has expired. Request a new code.")
 
-    if not bcrypt.verify(otp, bucket.otpHash):
+    if not await _otp_matches(user, bucketKey, otp, bucket.otpHash):
         bucket.attempts += 1
         setattr(user, bucketKey, bucket)
         await user.save()
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING, Callable, Optional, TypeVar
+
+from .metrics import registerCounter
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+logger = logging.getLogger(__name__)
+
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "process").lower()
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", str(PASSWORD_HASH_WORKERS * 16)))
+
+_rejected = registerCounter(
+    "password_hash_rejected_total",
+    "Password hash/verify jobs rejected because the hashing queue was full.",
+)
+
+T = TypeVar("T")
+
+_executor: Optional[Executor] = None
+_password_context: Optional[CryptContext] = None
+_pending = 0
+
+
+class PasswordServiceError(Exception):
+    def __init__(self, message: str, status: int = 503):
+        super().__init__(message)
+        self.status = status
+
+
+def _get_password_context() -> CryptContext:
+    # Built on first hash/verify, which in process mode only happens in the pool
+    # workers, so the serving process never loads passlib.
+    global _password_context
+    if _password_context is None:
+        from passlib.context import CryptContext
+
+        _password_context = CryptContext(schemes=["bcrypt_sha256", "bcrypt"], deprecated="auto")
+    return _password_context
+
+
+def _hash(password: str) -> str:
+    return _get_password_context().hash(password)
+
+
+def _verify(password: str, password_hash: str) -> bool:
+    return _get_password_context().verify(password, password_hash)
+
+
+def _get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        if PASSWORD_HASH_EXECUTOR == "thread":
+            _executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+        else:
+            # spawn avoids forking a process that already runs the event loop and Motor's threads.
+            _executor = ProcessPoolExecutor(
+                max_workers=PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        logger.info(
+            "Password hashing executor started",
+            extra={"kind": PASSWORD_HASH_EXECUTOR, "workers": PASSWORD_HASH_WORKERS},
+        )
+    return _executor
+
+
+async def _run(fn: Callable[..., T], *args) -> T:
+    global _executor, _pending
+    if _pending >= PASSWORD_HASH_MAX_PENDING:
+        _rejected.inc()
+        raise PasswordServiceError("Server is busy. Please try again shortly.")
+
+    _pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), fn, *args)
+    except BrokenProcessPool as exc:
+        logger.exception("Password hashing pool crashed; recreating")
+        _executor = None
+        raise PasswordServiceError("Server is busy. Please try again shortly.") from exc
+    finally:
+        _pending -= 1
+
+
+async def hashPassword(password: str) -> str:
+    return await _run(_hash, password)
+
+
+async def verifyPassword(password: str, password_hash: str) -> bool:
+    return await _run(_verify, password, password_hash)
+
+
+def pendingHashJobs() -> int:
+    return _pending
+
+
+def startPasswordExecutor() -> None:
+    _get_executor()
+
+
+def stopPasswordExecutor() -> None:
+    global _executor
+    if _executor is None:
+        return
+    _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = None
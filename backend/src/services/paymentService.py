@@ -5,9 +5,10 @@ import hashlib
 import logging
 import asyncio
 import os
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
-import razorpay
+if TYPE_CHECKING:
+    import razorpay
 
 logger = logging.getLogger("payments")
 
@@ -27,6 +28,11 @@ def _get_credentials() -> tuple[Optional[str], Optional[str]]:
     return key_id, key_secret
 
 
+def _get_api_base_url() -> Optional[str]:
+    # Point the SDK at a stand-in (e.g. the load test's) instead of api.razorpay.com.
+    return os.getenv("RAZORPAY_API_BASE_URL")
+
+
 def _get_webhook_secret() -> Optional[str]:
     return os.getenv("RAZORPAY_WEBHOOK_SECRET")
 
@@ -41,12 +47,18 @@ def getClient() -> razorpay.Client:
     if not isConfigured():
         raise PaymentServiceError("Razorpay credentials are not configured", status=500)
     if _razorpay_client is None:
+        # Imported on first use: the SDK pulls in requests, which every worker would
+        # otherwise load at boot even when payments are never taken.
+        import razorpay
+
         key_id, key_secret = _get_credentials()
         logger.info(
             "Initializing Razorpay client",
             extra={"keyIdLast4": key_id[-4:] if key_id else None},
         )
-        _razorpay_client = razorpay.Client(auth=(key_id, key_secret))
+        base_url = _get_api_base_url()
+        options = {"base_url": base_url} if base_url else {}
+        _razorpay_client = razorpay.Client(auth=(key_id, key_secret), **options)
     return _razorpay_client
 
 
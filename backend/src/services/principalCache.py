@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from beanie.odm.fields import PydanticObjectId
+
+from ..models import AuthInvalidation, Session, User
+from .metrics import registerCounter, registerHitRatio
+
+logger = logging.getLogger(__name__)
+
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("AUTH_PRINCIPAL_CACHE_TTL", "30"))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
+PRINCIPAL_CACHE_SYNC_INTERVAL = float(os.getenv("AUTH_PRINCIPAL_CACHE_SYNC_INTERVAL", "5"))
+# Invalidation events are stamped with the publishing worker's clock, so overlap
+# each poll window a little to tolerate skew between hosts.
+_SYNC_CLOCK_SKEW = timedelta(seconds=2)
+
+_hits = registerCounter("auth_principal_cache_hits_total", "Authenticated requests served from the principal cache.")
+_misses = registerCounter("auth_principal_cache_misses_total", "Authenticated requests that loaded the principal from MongoDB.")
+registerHitRatio("auth_principal_cache_hit_ratio", "Share of principal lookups served from cache.", _hits, _misses)
+_db_reads_saved = registerCounter(
+    "auth_principal_cache_db_reads_saved_total",
+    "Session and user lookups avoided by the principal cache.",
+)
+_invalidations = registerCounter(
+    "auth_principal_cache_invalidations_total",
+    "Principal cache invalidations by scope and origin.",
+)
+
+
+@dataclass
+class _Entry:
+    session: Optional[Session]
+    user: User
+    expires_at: float
+
+
+class PrincipalCache:
+    """
+    Size-bounded, short-TTL cache of (session, user) pairs keyed by session ID.
+    Stateless access tokens never load a session, so their users are cached
+    under a ``user:<id>`` key with no session attached.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._sessions_by_user: Dict[str, Set[str]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, session_id: str, user_id: str) -> Optional[Tuple[Session, User]]:
+        if not self.enabled:
+            return None
+        entry = self._entries.get(session_id)
+        if entry is None:
+            _misses.inc()
+            return None
+        if entry.expires_at <= time.monotonic() or str(entry.user.id) != user_id:
+            self._discard(session_id)
+            _misses.inc()
+            return None
+        self._entries.move_to_end(session_id)
+        _hits.inc()
+        _db_reads_saved.inc(2)
+        # Handlers may mutate request.state.user while serializing it, so never hand out the cached
+        # instance. Handlers that write re-read the user from MongoDB instead of saving this copy.
+        return entry.session.model_copy(deep=True), entry.user.model_copy(deep=True)
+
+    def getUser(self, user_id: str) -> Optional[User]:
+        """Return the user from any live entry for ``user_id``, regardless of session."""
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        for session_id in list(self._sessions_by_user.get(user_id, ())):
+            entry = self._entries[session_id]
+            if entry.expires_at <= now:
+                self._discard(session_id)
+                continue
+            _hits.inc()
+            _db_reads_saved.inc()
+            return entry.user.model_copy(deep=True)
+        _misses.inc()
+        return None
+
+    def put(self, session: Session, user: User) -> None:
+        if not self.enabled:
+            return
+        self._store(str(session.id), session.model_copy(deep=True), user)
+
+    def putUser(self, user: User) -> None:
+        if not self.enabled:
+            return
+        self._store(f"user:{user.id}", None, user)
+
+    def _store(self, key: str, session: Optional[Session], user: User) -> None:
+        self._discard(key)
+        self._entries[key] = _Entry(
+            session=session,
+            user=user.model_copy(deep=True),
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+        self._sessions_by_user.setdefault(str(user.id), set()).add(key)
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._discard(oldest)
+
+    def evictSession(self, session_id: str) -> None:
+        self._discard(session_id)
+
+    def evictUser(self, user_id: str) -> None:
+        for session_id in list(self._sessions_by_user.get(user_id, ())):
+            self._discard(session_id)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._sessions_by_user.clear()
+
+    def _discard(self, session_id: str) -> None:
+        entry = self._entries.pop(session_id, None)
+        if entry is None:
+            return
+        user_id = str(entry.user.id)
+        sessions = self._sessions_by_user.get(user_id)
+        if sessions is not None:
+            sessions.discard(session_id)
+            if not sessions:
+                del self._sessions_by_user[user_id]
+
+
+principal_cache = PrincipalCache(PRINCIPAL_CACHE_TTL_SECONDS, PRINCIPAL_CACHE_MAX_ENTRIES)
+
+_sync_task: Optional[asyncio.Task] = None
+# Other per-process caches (e.g. wishlist membership) piggyback on the same events.
+_extra_scopes: Dict[str, Callable[[str], None]] = {}
+
+
+def registerInvalidationScope(scope: str, evict: Callable[[str], None]) -> None:
+    """Have ``evict(key)`` run in every worker for events published under ``scope``."""
+    _extra_scopes[scope] = evict
+
+
+def _apply_invalidation(scope: str, key: str) -> None:
+    if scope == "session":
+        principal_cache.evictSession(key)
+    elif scope == "user":
+        principal_cache.evictUser(key)
+    elif scope in _extra_scopes:
+        _extra_scopes[scope](key)
+
+
+async def publishInvalidation(scope: str, key: str) -> None:
+    """Evict locally, then record the event for the other workers' sync loops."""
+    _apply_invalidation(scope, key)
+    _invalidations.inc(scope=scope, origin="local")
+    if scope in ("session", "user") and not principal_cache.enabled:
+        return
+    try:
+        await AuthInvalidation(scope=scope, key=key).insert()
+    except Exception:
+        # Other workers still converge once their cached entry's TTL lapses.
+        logger.exception("Failed to publish cache invalidation", extra={"scope": scope, "key": key})
+
+
+async def invalidateSession(session_id: str | PydanticObjectId) -> None:
+    await publishInvalidation("session", str(session_id))
+
+
+async def invalidateUser(user_id: str | PydanticObjectId) -> None:
+    await publishInvalidation("user", str(user_id))
+
+
+async def _sync_invalidations() -> None:
+    since = datetime.utcnow()
+    while True:
+        await asyncio.sleep(PRINCIPAL_CACHE_SYNC_INTERVAL)
+        try:
+            polled_at = datetime.utcnow()
+            events = await AuthInvalidation.find(
+                AuthInvalidation.createdAt >= since - _SYNC_CLOCK_SKEW
+            ).to_list()
+            for event in events:
+                _apply_invalidation(event.scope, event.key)
+            if events:
+                _invalidations.inc(len(events), scope="any", origin="remote")
+            since = polled_at
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Principal cache invalidation sync failed")
+
+
+def startInvalidationSync() -> None:
+    global _sync_task
+    if not (principal_cache.enabled or _extra_scopes) or _sync_task is not None:
+        return
+    _sync_task = asyncio.create_task(_sync_invalidations())
+
+
+async def stopInvalidationSync() -> None:
+    global _sync_task
+    if _sync_task is None:
+        return
+    _sync_task.cancel()
+    try:
+        await _sync_task
+    except asyncio.CancelledError:
+        pass
+    _sync_task = None
+    principal_cache.clear()
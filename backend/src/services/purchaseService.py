@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional, Set, Tuple
+
+from beanie.odm.fields import PydanticObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from ..models import Order, OrderItem, VerifiedPurchase
+
+logger = logging.getLogger(__name__)
+
+# Order statuses at or past payment; an order in any of these counts as a purchase.
+# The admin backend moves orders through most of these (and can move them back)
+# without going through this service, so lookups confirm rows against the orders.
+PURCHASED_ORDER_STATUSES = [
+    "paid",
+    "payment_confirmed",
+    "dispatched",
+    "shipped",
+    "reached_city",
+    "out_for_delivery",
+    "delivered",
+]
+
+_DUPLICATE_KEY = 11000
+
+PurchasePair = Tuple[PydanticObjectId, PydanticObjectId, PydanticObjectId, datetime]
+
+
+def orderProductIds(order: Order, items: Iterable[OrderItem] = ()) -> Set[PydanticObjectId]:
+    """Products on an order, from its order_items rows and any embedded line items."""
+    product_ids = {item.product for item in items}
+    for line in order.products or []:
+        product_id = line.product or line.productId
+        if product_id:
+            product_ids.add(product_id)
+    return product_ids
+
+
+async def upsertPurchases(pairs: List[PurchasePair]) -> int:
+    """Bulk-upsert (user, product, order, purchasedAt) rows; returns how many were new."""
+    if not pairs:
+        return 0
+    now = datetime.now(tz=timezone.utc)
+    operations = [
+        UpdateOne(
+            {"user": user_id, "product": product_id},
+            {
+                "$set": {"updatedAt": now},
+                "$setOnInsert": {"order": order_id, "purchasedAt": purchased_at, "createdAt": now},
+            },
+            upsert=True,
+        )
+        for user_id, product_id, order_id, purchased_at in pairs
+    ]
+    try:
+        result = await VerifiedPurchase.get_motor_collection().bulk_write(operations, ordered=False)
+    except BulkWriteError as exc:
+        # Concurrent upserts of the same pair race on the unique index; the row exists either way.
+        if any(error.get("code") != _DUPLICATE_KEY for error in exc.details.get("writeErrors", [])):
+            raise
+        return exc.details.get("nUpserted", 0)
+    return result.upserted_count
+
+
+async def recordOrderPurchases(order: Order, items: Optional[List[OrderItem]] = None) -> None:
+    """
+    Index the products of an order that has just been paid. Failures are logged
+    rather than raised: the payment itself already succeeded, and the backfill
+    script can rebuild the index.
+    """
+    try:
+        if items is None:
+            items = await OrderItem.find(OrderItem.order == order.id).to_list()
+        purchased_at = datetime.now(tz=timezone.utc)
+        await upsertPurchases(
+            [(order.user, product_id, order.id, purchased_at) for product_id in orderProductIds(order, items)]
+        )
+    except Exception:
+        logger.exception("Failed to record verified purchases", extra={"orderId": str(order.id)})
+
+
+async def _purchasing_order(
+    user_id: PydanticObjectId, product_id: PydanticObjectId
+) -> Optional[Tuple[PydanticObjectId, datetime]]:
+    """The user's oldest order in PURCHASED_ORDER_STATUSES containing the product, read from the orders."""
+    orders = await Order.get_motor_collection().find(
+        {"user": user_id, "status": {"$in": PURCHASED_ORDER_STATUSES}},
+        {"_id": 1, "createdAt": 1, "products": 1},
+    ).sort("createdAt", 1).to_list(None)
+    if not orders:
+        return None
+    itemized = set(
+        await OrderItem.get_motor_collection().distinct(
+            "order", {"order": {"$in": [order["_id"] for order in orders]}, "product": product_id}
+        )
+    )
+    for order in orders:
+        embedded = {line.get("product") or line.get("productId") for line in order.get("products") or []}
+        if order["_id"] in itemized or product_id in embedded:
+            return order["_id"], order.get("createdAt")
+    return None
+
+
+async def _repoint(user_id: PydanticObjectId, product_id: PydanticObjectId) -> bool:
+    """Point the (user, product) row at a purchasing order found in the orders, or drop it."""
+    collection = VerifiedPurchase.get_motor_collection()
+    purchase = await _purchasing_order(user_id, product_id)
+    if purchase is None:
+        await collection.delete_one({"user": user_id, "product": product_id})
+        return False
+    order_id, purchased_at = purchase
+    now = datetime.now(tz=timezone.utc)
+    try:
+        await collection.update_one(
+            {"user": user_id, "product": product_id},
+            {
+                "$set": {"order": order_id, "purchasedAt": purchased_at, "updatedAt": now},
+                "$setOnInsert": {"createdAt": now},
+            },
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        pass  # a concurrent repair inserted the row first
+    return True
+
+
+async def releaseOrderPurchases(order: Order) -> None:
+    """
+    Call when an order leaves PURCHASED_ORDER_STATUSES. Rows that point at it
+    move to another purchasing order of the same user or are removed. Failures
+    are logged; hasVerifiedPurchase re-checks stale rows on read.
+    """
+    try:
+        rows = await VerifiedPurchase.get_motor_collection().find(
+            {"order": order.id}, {"user": 1, "product": 1}
+        ).to_list(None)
+        for row in rows:
+            await _repoint(row["user"], row["product"])
+    except Exception:
+        logger.exception("Failed to release verified purchases", extra={"orderId": str(order.id)})
+
+
+async def hasVerifiedPurchase(user_id: PydanticObjectId, product_id: PydanticObjectId) -> bool:
+    """
+    Index lookup confirmed against the order the row points at. A missing row, or
+    one whose order has since left the purchased statuses, falls back to the
+    user's orders and the row is repaired either way.
+    """
+    found = await VerifiedPurchase.get_motor_collection().find_one(
+        {"user": user_id, "product": product_id}, {"order": 1}
+    )
+    if found is not None and found.get("order") is not None:
+        still_purchased = await Order.get_motor_collection().find_one(
+            {"_id": found["order"], "status": {"$in": PURCHASED_ORDER_STATUSES}}, {"_id": 1}
+        )
+        if still_purchased is not None:
+            return True
+    return await _repoint(user_id, product_id)
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import os
+import threading
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+
+QUERY_STATS_ENABLED = str(os.getenv("DB_QUERY_STATS", "true")).lower() == "true"
+QUERY_WARN_COUNT = int(os.getenv("DB_QUERY_WARN_COUNT", "25"))
+# The same command shape this many times in one request is reported as a likely N+1.
+QUERY_WARN_REPEAT = int(os.getenv("DB_QUERY_WARN_REPEAT", "5"))
+
+# Driver chatter that says nothing about application query patterns.
+_IGNORED_COMMANDS = {
+    "hello",
+    "ismaster",
+    "isMaster",
+    "ping",
+    "saslStart",
+    "saslContinue",
+    "endSessions",
+    "buildInfo",
+    "killCursors",
+}
+
+# Where each command keeps the filter that identifies its query shape.
+_FILTER_FIELDS = {
+    "find": "filter",
+    "count": "query",
+    "distinct": "query",
+    "findAndModify": "query",
+}
+
+
+class QueryStats:
+    """Mongo commands issued on behalf of one request. Updated from Motor's executor threads."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration_ms = 0.0
+        self.patterns: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def started(self, pattern: str) -> None:
+        with self._lock:
+            self.count += 1
+            self.patterns[pattern] += 1
+
+    def finished(self, duration_micros: int) -> None:
+        with self._lock:
+            self.duration_ms += duration_micros / 1000
+
+    def repeated(self, threshold: int = QUERY_WARN_REPEAT) -> List[Tuple[str, int]]:
+        return [(pattern, count) for pattern, count in self.patterns.most_common() if count >= threshold]
+
+    def serverTiming(self) -> str:
+        return f'db;dur={self.duration_ms:.1f};desc="{self.count} queries"'
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+_observers: List[Callable[[str, str, QueryStats], None]] = []
+
+
+def beginRequest() -> Tuple[QueryStats, Any]:
+    stats = QueryStats()
+    return stats, _current.set(stats)
+
+
+def endRequest(token: Any, method: str, path: str, stats: QueryStats) -> None:
+    _current.reset(token)
+    for observer in list(_observers):
+        observer(method, path, stats)
+
+
+def currentQueryStats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+def addRequestObserver(observer: Callable[[str, str, QueryStats], None]) -> None:
+    """Call ``observer(method, path, stats)`` after every request; used by the query budget helper."""
+    _observers.append(observer)
+
+
+def removeRequestObserver(observer: Callable[[str, str, QueryStats], None]) -> None:
+    if observer in _observers:
+        _observers.remove(observer)
+
+
+def _shape(value: Any, depth: int = 0) -> Any:
+    """Replace literal values with ``?`` so queries differing only in IDs share a pattern."""
+    if isinstance(value, dict) and depth < 3:
+        return {key: _shape(item, depth + 1) for key, item in sorted(value.items())}
+    if isinstance(value, list) and value and isinstance(value[0], dict) and depth < 3:
+        return [_shape(item, depth + 1) for item in value]
+    return "?"
+
+
+def commandPattern(command_name: str, command: Dict[str, Any]) -> str:
+    collection = command.get(command_name)
+    if not isinstance(collection, str):
+        return command_name
+    query: Any = None
+    if command_name in _FILTER_FIELDS:
+        query = command.get(_FILTER_FIELDS[command_name])
+    elif command_name == "aggregate":
+        query = next((stage["$match"] for stage in command.get("pipeline", []) if "$match" in stage), None)
+    elif command_name in {"update", "delete"}:
+        statements = command.get("updates" if command_name == "update" else "deletes") or [{}]
+        query = statements[0].get("q")
+    if query is None:
+        return f"{command_name} {collection}"
+    return f"{command_name} {collection} {_shape(query)}"
+
+
+class QueryStatsListener(monitoring.CommandListener):
+    """Attributes every Mongo command to the request whose context issued it."""
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        stats = _current.get()
+        if stats is None or event.command_name in _IGNORED_COMMANDS:
+            return
+        stats.started(commandPattern(event.command_name, event.command))
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        stats = _current.get()
+        if stats is not None and event.command_name not in _IGNORED_COMMANDS:
+            stats.finished(event.duration_micros)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        stats = _current.get()
+        if stats is not None and event.command_name not in _IGNORED_COMMANDS:
+            stats.finished(event.duration_micros)
+
+
+query_stats_listener = QueryStatsListener()
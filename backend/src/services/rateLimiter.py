@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, NamedTuple, Optional, Protocol, Tuple
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from ..models import RateLimitCounter
+from .metrics import registerCounter
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_ENABLED = str(os.getenv("RATE_LIMIT_ENABLED", "true")).lower() == "true"
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+RATE_LIMIT_MEMORY_MAX_KEYS = int(os.getenv("RATE_LIMIT_MEMORY_MAX_KEYS", "100000"))
+
+
+class RateLimitRule(NamedTuple):
+    limit: int
+    windowSeconds: int
+
+
+def ruleFromEnv(name: str, default: str) -> RateLimitRule:
+    """Read a ``<limit>/<window seconds>`` setting such as ``RATE_LIMIT_LOGIN_IP=30/60``."""
+    value = os.getenv(name) or default
+    try:
+        limit, window_seconds = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"{name} must look like <limit>/<window seconds>, got {value!r}") from None
+    if limit < 1 or window_seconds < 1:
+        raise ValueError(f"{name} must be positive, got {value!r}")
+    return RateLimitRule(limit, window_seconds)
+
+_allowed = registerCounter("rate_limit_allowed_total", "Requests admitted by the rate limiter, by rule.")
+_rejected = registerCounter("rate_limit_rejected_total", "Requests rejected by the rate limiter, by rule.")
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    count: float
+    limit: int
+    retryAfter: int
+
+
+class RateLimitBackend(Protocol):
+    async def hit(self, key: str, window: int, window_seconds: int) -> Tuple[int, int]:
+        """Increment the counter for ``window`` and return (current, previous) window counts."""
+        ...
+
+
+class MemoryBackend:
+    """Per-process fixed-window counters; cheap but not shared between workers."""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        # (key, window start) -> (hits, time after which neither this nor the next window needs it)
+        self._counts: Dict[Tuple[str, int], Tuple[int, float]] = {}
+
+    def _prune(self) -> None:
+        # Each bucket expires by its own rule's window, so a short-window rule filling
+        # the table cannot evict the live buckets of an hourly rule.
+        now = time.time()
+        for bucket in [bucket for bucket, (_, expires) in self._counts.items() if expires <= now]:
+            del self._counts[bucket]
+        # Still too many distinct keys (e.g. a spray of spoofed emails): drop the half closest to expiry.
+        if len(self._counts) > self.max_keys:
+            for bucket in sorted(self._counts, key=lambda item: self._counts[item][1])[: len(self._counts) // 2]:
+                del self._counts[bucket]
+
+    async def hit(self, key: str, window: int, window_seconds: int) -> Tuple[int, int]:
+        if len(self._counts) >= self.max_keys:
+            self._prune()
+        current = self._counts.get((key, window), (0, 0.0))[0] + 1
+        self._counts[(key, window)] = (current, window + 2 * window_seconds)
+        return current, self._counts.get((key, window - window_seconds), (0, 0.0))[0]
+
+
+class MongoBackend:
+    """Shared counters: one atomic $inc upsert on a time-bucketed document per hit."""
+
+    async def hit(self, key: str, window: int, window_seconds: int) -> Tuple[int, int]:
+        collection = RateLimitCounter.get_motor_collection()
+        now = datetime.now(tz=timezone.utc)
+        update = {
+            "$inc": {"hits": 1},
+            "$set": {"updatedAt": now},
+            "$setOnInsert": {
+                "createdAt": now,
+                # Kept for two windows so the next window can weight it.
+                "expiresAt": datetime.fromtimestamp(window, tz=timezone.utc) + timedelta(seconds=2 * window_seconds),
+            },
+        }
+        try:
+            current = await collection.find_one_and_update(
+                {"key": key, "window": window}, update, upsert=True, return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # Two workers raced to create the bucket; the retry lands on the existing document.
+            current = await collection.find_one_and_update(
+                {"key": key, "window": window}, update, upsert=True, return_document=ReturnDocument.AFTER
+            )
+        previous = await collection.find_one({"key": key, "window": window - window_seconds}, {"hits": 1})
+        return int(current["hits"]), int(previous["hits"]) if previous else 0
+
+
+_backend: Optional[RateLimitBackend] = None
+
+
+def getBackend() -> RateLimitBackend:
+    global _backend
+    if _backend is None:
+        _backend = MongoBackend() if RATE_LIMIT_BACKEND == "mongo" else MemoryBackend(RATE_LIMIT_MEMORY_MAX_KEYS)
+    return _backend
+
+
+async def hitRateLimit(rule: str, key: str, *, limit: int, windowSeconds: int) -> RateLimitResult:
+    """
+    Sliding-window check: the previous fixed window is weighted by how much of it
+    still overlaps the trailing ``windowSeconds``.
+    """
+    now = time.time()
+    window = int(now // windowSeconds) * windowSeconds
+    try:
+        current, previous = await getBackend().hit(f"{rule}:{key}", window, windowSeconds)
+    except Exception:
+        # Fail open: a limiter outage must not lock everyone out of auth.
+        logger.exception("Rate limiter backend failed", extra={"rule": rule})
+        return RateLimitResult(allowed=True, count=0, limit=limit, retryAfter=0)
+
+    elapsed_fraction = (now - window) / windowSeconds
+    estimated = previous * (1 - elapsed_fraction) + current
+    allowed = estimated <= limit
+    if allowed:
+        _allowed.inc(rule=rule)
+    else:
+        _rejected.inc(rule=rule)
+    retry_after = max(1, int(window + windowSeconds - now)) if not allowed else 0
+    return RateLimitResult(allowed=allowed, count=estimated, limit=limit, retryAfter=retry_after)
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from typing import List
+
+from beanie.odm.fields import PydanticObjectId
+from pymongo import UpdateMany
+
+from ..models import Review, User
+from .metrics import registerCounter
+
+_updated = registerCounter("reviewer_name_sync_reviews_total", "Reviews rewritten with a changed reviewer name.")
+
+
+async def reconcileReviewerNames(batchSize: int = 500) -> int:
+    """
+    Bring every review's ``reviewerName`` in line with its author's current
+    ``fullName``; also backfills reviews written before the field existed.
+
+    This is the sync mechanism: the API has no endpoint that renames a user, so
+    names only change outside it (the admin backend or the shared database).
+    """
+    reviewer_ids: List[PydanticObjectId] = await Review.distinct("user")
+    modified = 0
+    for start in range(0, len(reviewer_ids), batchSize):
+        chunk = reviewer_ids[start:start + batchSize]
+        users = User.get_motor_collection().find({"_id": {"$in": chunk}}, {"fullName": 1})
+        operations = [
+            UpdateMany(
+                {"user": user["_id"], "reviewerName": {"$ne": user["fullName"]}},
+                {"$set": {"reviewerName": user["fullName"]}},
+            )
+            async for user in users
+        ]
+        if operations:
+            result = await Review.get_motor_collection().bulk_write(operations, ordered=False)
+            modified += result.modified_count
+    _updated.inc(modified)
+    return modified
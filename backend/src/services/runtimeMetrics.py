@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from motor.frameworks import asyncio as motor_asyncio
+from pymongo import monitoring
+
+from .metrics import registerCounter, registerGauge, registerHistogram
+from .passwordService import pendingHashJobs
+
+# How often the loop-lag probe wakes up; 0 disables it.
+LOOP_LAG_INTERVAL_SECONDS = float(os.getenv("METRICS_LOOP_LAG_INTERVAL", "0.5"))
+
+
+def _address_label(address) -> str:
+    host, port = address
+    return f"{host}:{port}"
+
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    """Tracks Motor's connection pools from PyMongo's CMAP events (called from driver threads)."""
+
+    def __init__(self) -> None:
+        self._open: Dict[str, int] = defaultdict(int)
+        self._checked_out: Dict[str, int] = defaultdict(int)
+        self._waiting: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self.checkout_seconds = registerHistogram(
+            "mongo_pool_checkout_seconds",
+            "Time spent waiting for a pooled MongoDB connection.",
+            buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5),
+        )
+        self.checkout_failures = registerCounter(
+            "mongo_pool_checkout_failures_total",
+            "Connection checkouts that failed, by server and reason.",
+        )
+
+    def _adjust(self, table: Dict[str, int], address, delta: int) -> None:
+        with self._lock:
+            table[_address_label(address)] += delta
+
+    def _snapshot(self, table: Dict[str, int]) -> List[Tuple[Dict[str, str], float]]:
+        with self._lock:
+            return [({"server": server}, value) for server, value in table.items()]
+
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        pass
+
+    def pool_closed(self, event) -> None:
+        with self._lock:
+            server = _address_label(event.address)
+            for table in (self._open, self._checked_out, self._waiting):
+                table.pop(server, None)
+
+    def connection_created(self, event) -> None:
+        self._adjust(self._open, event.address, 1)
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def connection_closed(self, event) -> None:
+        self._adjust(self._open, event.address, -1)
+
+    def connection_check_out_started(self, event) -> None:
+        self._adjust(self._waiting, event.address, 1)
+
+    def connection_check_out_failed(self, event) -> None:
+        self._adjust(self._waiting, event.address, -1)
+        self.checkout_failures.inc(server=_address_label(event.address), reason=str(event.reason))
+
+    def connection_checked_out(self, event) -> None:
+        with self._lock:
+            server = _address_label(event.address)
+            self._waiting[server] -= 1
+            self._checked_out[server] += 1
+        if event.duration is not None:
+            self.checkout_seconds.observe(event.duration)
+
+    def connection_checked_in(self, event) -> None:
+        self._adjust(self._checked_out, event.address, -1)
+
+    def openConnections(self):
+        return self._snapshot(self._open)
+
+    def checkedOutConnections(self):
+        return self._snapshot(self._checked_out)
+
+    def waitingCheckouts(self):
+        return self._snapshot(self._waiting)
+
+
+mongo_pool_metrics = MongoPoolMetrics()
+
+registerGauge("mongo_pool_connections", "Open MongoDB connections per server.", mongo_pool_metrics.openConnections)
+registerGauge(
+    "mongo_pool_connections_in_use",
+    "MongoDB connections currently checked out per server.",
+    mongo_pool_metrics.checkedOutConnections,
+)
+registerGauge(
+    "mongo_pool_checkouts_waiting",
+    "Operations waiting for a pooled MongoDB connection per server.",
+    mongo_pool_metrics.waitingCheckouts,
+)
+
+
+_loop_lag = registerHistogram(
+    "event_loop_lag_seconds",
+    "How late the event loop ran a timer scheduled by the lag probe.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+_last_loop_lag = 0.0
+_lag_task: Optional[asyncio.Task] = None
+
+
+def _motor_executor_queue() -> float:
+    # Motor 3.x runs every blocking driver call on its own module-level thread
+    # pool (not the loop's default executor), so a growing backlog here means
+    # requests are queueing for a Motor thread, not for MongoDB.
+    work_queue = getattr(getattr(motor_asyncio, "_EXECUTOR", None), "_work_queue", None)
+    return work_queue.qsize() if work_queue is not None else 0
+
+
+registerGauge("event_loop_lag_last_seconds", "Most recent event loop lag sample.", lambda: _last_loop_lag)
+registerGauge(
+    "executor_queue_depth",
+    "Jobs waiting for an executor worker (password_hash also counts running jobs).",
+    lambda: [({"executor": "motor"}, _motor_executor_queue()), ({"executor": "password_hash"}, pendingHashJobs())],
+)
+
+
+async def _probe_loop_lag() -> None:
+    global _last_loop_lag
+    while True:
+        expected = time.perf_counter() + LOOP_LAG_INTERVAL_SECONDS
+        await asyncio.sleep(LOOP_LAG_INTERVAL_SECONDS)
+        _last_loop_lag = max(0.0, time.perf_counter() - expected)
+        _loop_lag.observe(_last_loop_lag)
+
+
+def startRuntimeMetrics() -> None:
+    global _lag_task
+    if LOOP_LAG_INTERVAL_SECONDS > 0 and _lag_task is None:
+        _lag_task = asyncio.create_task(_probe_loop_lag())
+
+
+async def stopRuntimeMetrics() -> None:
+    global _lag_task
+    if _lag_task is None:
+        return
+    _lag_task.cancel()
+    try:
+        await _lag_task
+    except asyncio.CancelledError:
+        pass
+    _lag_task = None
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from pymongo.errors import OperationFailure
+
+from ..models import Session
+from .jobLease import acquireLease
+from .metrics import registerCounter
+
+logger = logging.getLogger(__name__)
+
+SESSION_RETENTION_DAYS = float(os.getenv("SESSION_RETENTION_DAYS", "7"))
+SESSION_COMPACTION_BATCH_SIZE = int(os.getenv("SESSION_COMPACTION_BATCH_SIZE", "1000"))
+SESSION_COMPACTION_PAUSE_SECONDS = float(os.getenv("SESSION_COMPACTION_PAUSE", "0.1"))
+# Seconds between runs of the in-process job; 0 disables it (use the script instead).
+SESSION_COMPACTION_INTERVAL_SECONDS = float(os.getenv("SESSION_COMPACTION_INTERVAL", "21600"))
+
+_deleted = registerCounter("session_compaction_deleted_total", "Revoked or expired sessions removed by compaction.")
+
+_loop_task: Optional[asyncio.Task] = None
+
+
+async def sessionCollectionStats() -> dict:
+    """Document count and data/index sizes (bytes) of the sessions collection."""
+    collection = Session.get_motor_collection()
+    try:
+        stats = await collection.database.command({"collStats": collection.name})
+    except OperationFailure:
+        # Restricted roles (e.g. shared Atlas tiers) may not be allowed collStats.
+        return {"count": await collection.count_documents({}), "size": None, "totalIndexSize": None}
+    return {
+        "count": stats.get("count"),
+        "size": stats.get("size"),
+        "totalIndexSize": stats.get("totalIndexSize"),
+    }
+
+
+async def compactSessions(
+    *,
+    retentionDays: float = SESSION_RETENTION_DAYS,
+    batchSize: int = SESSION_COMPACTION_BATCH_SIZE,
+    pauseSeconds: float = SESSION_COMPACTION_PAUSE_SECONDS,
+    dryRun: bool = False,
+) -> dict:
+    """
+    Delete sessions revoked more than ``retentionDays`` ago in ``batchSize``
+    chunks, pausing between chunks so the primary isn't saturated. The TTL index
+    removes expired sessions but skips revoked ones, so without this they
+    accumulate forever.
+    """
+    collection = Session.get_motor_collection()
+    cutoff = datetime.now(tz=timezone.utc) - timedelta(days=retentionDays)
+    # $type repeats the partial filter of the revokedAt index so the planner can use it.
+    query = {"revokedAt": {"$type": "date", "$lt": cutoff}}
+
+    before = await sessionCollectionStats()
+    if dryRun:
+        matched = await collection.count_documents(query)
+        return {"cutoff": cutoff, "deleted": 0, "matched": matched, "batches": 0, "before": before, "after": before}
+
+    deleted = 0
+    batches = 0
+    while True:
+        ids = [doc["_id"] async for doc in collection.find(query, {"_id": 1}).limit(batchSize)]
+        if not ids:
+            break
+        # Re-check the predicate so a session reinstated meanwhile is not removed.
+        result = await collection.delete_many({"_id": {"$in": ids}, **query})
+        deleted += result.deleted_count
+        batches += 1
+        _deleted.inc(result.deleted_count)
+        if len(ids) < batchSize:
+            break
+        await asyncio.sleep(pauseSeconds)
+
+    after = await sessionCollectionStats()
+    logger.info(
+        "Session compaction finished",
+        extra={"deleted": deleted, "batches": batches, "countBefore": before["count"], "countAfter": after["count"]},
+    )
+    return {"cutoff": cutoff, "deleted": deleted, "matched": deleted, "batches": batches, "before": before, "after": after}
+
+
+async def _compaction_loop() -> None:
+    while True:
+        await asyncio.sleep(SESSION_COMPACTION_INTERVAL_SECONDS)
+        try:
+            # Every worker runs this loop; the lease lets one of them compact per interval.
+            if not await acquireLease("sessionCompaction", SESSION_COMPACTION_INTERVAL_SECONDS):
+                continue
+            await compactSessions()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Session compaction run failed")
+
+
+def startSessionCompaction() -> None:
+    global _loop_task
+    if SESSION_COMPACTION_INTERVAL_SECONDS <= 0 or _loop_task is not None:
+        return
+    _loop_task = asyncio.create_task(_compaction_loop())
+
+
+async def stopSessionCompaction() -> None:
+    global _loop_task
+    if _loop_task is None:
+        return
+    _loop_task.cancel()
+    try:
+        await _loop_task
+    except asyncio.CancelledError:
+        pass
+    _loop_task = None
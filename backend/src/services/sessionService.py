@@ -8,9 +8,12 @@ from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 import jwt
+from beanie import UpdateResponse
 from beanie.odm.fields import PydanticObjectId
 
 from ..models import Session, User
+from .accessDenylist import STATELESS_ACCESS_EXPIRY_SECONDS, STATELESS_ACCESS_TOKENS, access_denylist
+from .principalCache import invalidateSession, invalidateUser, principal_cache
 
 ACCESS_EXPIRY = os.getenv("JWT_ACCESS_EXPIRY", "1d")
 REFRESH_EXPIRY = os.getenv("JWT_REFRESH_EXPIRY", "7d")
@@ -48,6 +51,9 @@ def _parse_duration(value: str, fallback: timedelta) -> timedelta:
 
 ACCESS_EXPIRY_DELTA = _parse_duration(ACCESS_EXPIRY, timedelta(minutes=15))
 REFRESH_EXPIRY_DELTA = _parse_duration(REFRESH_EXPIRY, timedelta(days=7))
+if STATELESS_ACCESS_TOKENS:
+    # Revocation only reaches stateless tokens through the denylist, so keep them short-lived.
+    ACCESS_EXPIRY_DELTA = min(ACCESS_EXPIRY_DELTA, timedelta(seconds=STATELESS_ACCESS_EXPIRY_SECONDS))
 
 
 def _hash_token(value: str) -> str:
@@ -156,40 +162,54 @@ async def validateSession(session_id: str | PydanticObjectId, user_id: str | Pyd
     session = await Session.find_one(Session.id == session_object_id, Session.user == user_object_id)
     if not session:
         raise SessionError("Session not found", status=401)
+    ensureSessionActive(session)
+    return session
+
+
+def ensureSessionActive(session: Session) -> None:
     if session.revokedAt:
         raise SessionError("Session revoked", status=401)
     expires_at = _normalize_datetime(session.expiresAt)
     if expires_at and expires_at < datetime.now(tz=timezone.utc):
         raise SessionError("Session expired", status=401)
-    return session
 
 
 async def rotateSession(*, refreshToken: str, userAgent: Optional[str], ipAddress: Optional[str]):
     random_part = _extract_refresh_components(refreshToken)
     refresh_hash = _hash_token(random_part)
+    next_refresh = _generate_refresh_token()
+    next_random = _extract_refresh_components(next_refresh)
+    now = datetime.now(tz=timezone.utc)
 
-    session = await Session.find_one(Session.refreshTokenHash == refresh_hash)
+    # Match and rotate in one atomic write: of two concurrent refreshes with the
+    # same token only one can still see the old hash, the other gets a 401.
+    session = await Session.find_one(
+        {
+            "refreshTokenHash": refresh_hash,
+            "revokedAt": None,
+            "expiresAt": {"$gt": now},
+        }
+    ).update(
+        {
+            "$set": {
+                "refreshTokenHash": _hash_token(next_random),
+                "expiresAt": now + REFRESH_EXPIRY_DELTA,
+                "userAgent": userAgent,
+                "ipAddress": ipAddress,
+                "updatedAt": now,
+            }
+        },
+        response_type=UpdateResponse.NEW_DOCUMENT,
+    )
     if not session:
-        raise SessionError("Invalid refresh token", status=401)
-    if session.revokedAt:
-        raise SessionError("Session revoked", status=401)
-    now = datetime.now(tz=timezone.utc)
-    expires_at = _normalize_datetime(session.expiresAt)
-    if expires_at and expires_at < now:
-        raise SessionError("Session expired", status=401)
+        raise SessionError("Invalid or expired refresh token", status=401)
 
-    user = await User.get(session.user)
+    user = principal_cache.getUser(str(session.user)) or await User.get(session.user)
     if not user or not user.isActive:
         raise SessionError("User account unavailable", status=401)
-
-    next_refresh = _generate_refresh_token()
-    next_random = _extract_refresh_components(next_refresh)
-    session.refreshTokenHash = _hash_token(next_random)
-    session.expiresAt = now + REFRESH_EXPIRY_DELTA
-    session.userAgent = userAgent
-    session.ipAddress = ipAddress
-    session.revokedAt = None
-    await session.save()
+    # Rotation doesn't change who the session belongs to or whether it is revoked,
+    # so refresh the local entry instead of publishing an invalidation write.
+    principal_cache.put(session, user)
 
     access_token, access_expires_at = _sign_access_token(user, session)
     return {
@@ -204,7 +224,10 @@ async def rotateSession(*, refreshToken: str, userAgent: Optional[str], ipAddres
 
 async def revokeSession(session_id: str | PydanticObjectId) -> None:
     session_object_id = _coerce_object_id(session_id)
-    await Session.find(Session.id == session_object_id).update({"$set": {"revokedAt": datetime.now(tz=timezone.utc)}})
+    revoked_at = datetime.now(tz=timezone.utc)
+    await Session.find(Session.id == session_object_id).update({"$set": {"revokedAt": revoked_at}})
+    access_denylist.addSession(str(session_object_id), revoked_at)
+    await invalidateSession(session_object_id)
 
 
 async def revokeByRefreshToken(refreshToken: str) -> None:
@@ -213,11 +236,17 @@ async def revokeByRefreshToken(refreshToken: str) -> None:
     except SessionError:
         return
     refresh_hash = _hash_token(random_part)
-    await Session.find(Session.refreshTokenHash == refresh_hash).update({"$set": {"revokedAt": datetime.now(tz=timezone.utc)}})
+    session = await Session.find_one(Session.refreshTokenHash == refresh_hash)
+    if session:
+        await revokeSession(session.id)
 
 
 async def revokeAllUserSessions(user_id: str | PydanticObjectId) -> None:
     user_object_id = _coerce_object_id(user_id)
+    revoked_at = datetime.now(tz=timezone.utc)
     await Session.find(Session.user == user_object_id, Session.revokedAt == None).update(  # type: ignore[comparison-overlap]
-        {"$set": {"revokedAt": datetime.now(tz=timezone.utc)}}
+        {"$set": {"revokedAt": revoked_at}}
     )
+    # Other workers pick up the individual sessions from the denylist sync.
+    access_denylist.addUser(str(user_object_id), revoked_at)
+    await invalidateUser(user_object_id)
@@ -0,0 +1,152 @@
+"""
+Off-loop logging pipeline.
+
+Handlers on the request path only enqueue records (``QueueHandler``); a
+``QueueListener`` thread formats and writes them, so a slow stdout or log
+shipper never blocks the event loop. Records carry the current request ID and
+are rendered as one JSON object per line (or plain text for local runs).
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import zlib
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional, TextIO
+
+from .metrics import registerCounter
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+# Fraction of requests whose INFO/DEBUG records are kept; warnings and errors are never sampled.
+LOG_INFO_SAMPLE_RATE = float(os.getenv("LOG_INFO_SAMPLE_RATE", "1"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else came from ``extra=``.
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "requestId"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+_dropped = registerCounter("log_records_dropped_total", "Log records dropped because the log queue was full.")
+
+
+def currentRequestId() -> Optional[str]:
+    return _request_id.get()
+
+
+def bindRequestId(request_id: str):
+    return _request_id.set(request_id)
+
+
+def resetRequestId(token) -> None:
+    _request_id.reset(token)
+
+
+def _keep_sample(request_id: Optional[str]) -> bool:
+    if LOG_INFO_SAMPLE_RATE >= 1:
+        return True
+    if request_id is None:
+        return random.random() < LOG_INFO_SAMPLE_RATE
+    # Hash the request ID so a sampled request keeps all of its lines.
+    return zlib.crc32(request_id.encode()) % 10_000 < LOG_INFO_SAMPLE_RATE * 10_000
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamps ``requestId`` on records and applies INFO sampling, in the emitting thread's context."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        request_id = _request_id.get()
+        record.requestId = request_id
+        return record.levelno >= logging.WARNING or _keep_sample(request_id)
+
+
+class _ContextQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that keeps ``extra`` fields intact and drops records instead of blocking when full."""
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _dropped.inc()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The base implementation formats the record into msg; render only the
+        # message and traceback here and leave the layout to the listener.
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "requestId", None)
+        if request_id:
+            entry["requestId"] = request_id
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def _build_formatter() -> logging.Formatter:
+    if LOG_FORMAT == "json":
+        return JsonFormatter()
+    return logging.Formatter("%(asctime)s %(levelname)s [%(name)s] [%(requestId)s] %(message)s")
+
+
+def configureLogging(stream: Optional[TextIO] = None) -> None:
+    """Route the root logger (and uvicorn's, in JSON mode) through the queue. Idempotent."""
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(LOG_QUEUE_SIZE)
+    queue_handler = _ContextQueueHandler(log_queue)
+    queue_handler.addFilter(RequestContextFilter())
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(_build_formatter())
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stopLogging)
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(LOG_LEVEL)
+    if LOG_FORMAT == "json":
+        # uvicorn installs its own stream handlers; send its lines through the same pipeline.
+        for name in ("uvicorn", "uvicorn.access"):
+            uvicorn_logger = logging.getLogger(name)
+            if uvicorn_logger.handlers:
+                uvicorn_logger.handlers = [queue_handler]
+
+
+def stopLogging() -> None:
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    _listener = None
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import os
+import time
+from collections import OrderedDict
+from typing import FrozenSet, Iterable, Optional, Tuple
+
+from beanie.odm.fields import PydanticObjectId
+
+from ..models import Wishlist
+from .metrics import registerCounter, registerGauge, registerHitRatio
+from .principalCache import publishInvalidation, registerInvalidationScope
+
+# Per-process cache: a mutation evicts this worker's entry immediately and is
+# published on the auth_invalidations bus, so other workers drop theirs within
+# AUTH_PRINCIPAL_CACHE_SYNC_INTERVAL; the TTL bounds staleness if publishing fails.
+WISHLIST_CACHE_TTL_SECONDS = float(os.getenv("WISHLIST_CACHE_TTL", "15"))
+WISHLIST_CACHE_MAX_USERS = int(os.getenv("WISHLIST_CACHE_MAX_USERS", "5000"))
+# Unusually large wishlists are answered with a $in query instead of being cached whole.
+WISHLIST_CACHE_MAX_ITEMS = int(os.getenv("WISHLIST_CACHE_MAX_ITEMS", "500"))
+
+_hits = registerCounter("wishlist_membership_cache_hits_total", "Wishlist membership lookups served from cache.")
+_misses = registerCounter("wishlist_membership_cache_misses_total", "Wishlist membership lookups that queried MongoDB.")
+registerHitRatio("wishlist_membership_cache_hit_ratio", "Share of wishlist membership lookups served from cache.", _hits, _misses)
+
+
+class WishlistMembershipCache:
+    """
+    LRU of user ID -> frozenset of 12-byte product ObjectIds, with a short TTL.
+
+    A fill takes ``generation()`` before it queries and passes it to ``put``;
+    evicting a user stamps them with a newer generation, so a read that raced a
+    write cannot re-cache the rows it saw before that write.
+    """
+
+    def __init__(self, ttl_seconds: float, max_users: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_users = max_users
+        self._entries: "OrderedDict[str, Tuple[FrozenSet[bytes], float]]" = OrderedDict()
+        self._generation = 0
+        # user ID -> generation of their latest eviction, oldest first and bounded like
+        # the entries; fills that began before the newest dropped stamp are refused.
+        self._evicted_at: "OrderedDict[str, int]" = OrderedDict()
+        self._floor = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_users > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, user_id: str) -> Optional[FrozenSet[bytes]]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        members, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return members
+
+    def generation(self) -> int:
+        return self._generation
+
+    def put(self, user_id: str, members: Iterable[bytes], generation: int) -> None:
+        if not self.enabled:
+            return
+        if generation < self._floor or self._evicted_at.get(user_id, -1) > generation:
+            return
+        self._entries.pop(user_id, None)
+        self._entries[user_id] = (frozenset(members), time.monotonic() + self.ttl_seconds)
+        while len(self._entries) > self.max_users:
+            self._entries.popitem(last=False)
+
+    def evict(self, user_id: str) -> None:
+        self._entries.pop(user_id, None)
+        self._generation += 1
+        self._evicted_at.pop(user_id, None)
+        self._evicted_at[user_id] = self._generation
+        while len(self._evicted_at) > self.max_users:
+            _, generation = self._evicted_at.popitem(last=False)
+            self._floor = generation
+
+    def clear(self) -> None:
+        self._entries.clear()
+        # Anything read before the clear may be stale as well.
+        self._generation += 1
+        self._evicted_at.clear()
+        self._floor = self._generation
+
+
+wishlist_cache = WishlistMembershipCache(WISHLIST_CACHE_TTL_SECONDS, WISHLIST_CACHE_MAX_USERS)
+
+registerGauge("wishlist_membership_cache_users", "Users with a cached wishlist membership set.", lambda: len(wishlist_cache))
+
+
+if wishlist_cache.enabled:
+    registerInvalidationScope("wishlist", wishlist_cache.evict)
+
+
+async def invalidateWishlist(user_id: str | PydanticObjectId) -> None:
+    if wishlist_cache.enabled:
+        await publishInvalidation("wishlist", str(user_id))
+
+
+async def wishlistMembership(user_id: PydanticObjectId, product_ids: Iterable[PydanticObjectId]) -> dict:
+    """Map each product ID (as str) to whether it is on the user's wishlist."""
+    requested = list(dict.fromkeys(product_ids))
+    key = str(user_id)
+    members = wishlist_cache.get(key) if wishlist_cache.enabled else None
+    if members is not None:
+        _hits.inc()
+        return {str(product_id): product_id.binary in members for product_id in requested}
+
+    _misses.inc()
+    collection = Wishlist.get_motor_collection()
+    if wishlist_cache.enabled:
+        generation = wishlist_cache.generation()
+        # Covered by the (user, product) index; loads the whole set so later grid pages hit the cache.
+        cursor = collection.find({"user": user_id}, {"product": 1, "_id": 0}).limit(WISHLIST_CACHE_MAX_ITEMS + 1)
+        loaded = [doc["product"].binary async for doc in cursor]
+        if len(loaded) <= WISHLIST_CACHE_MAX_ITEMS:
+            wishlist_cache.put(key, loaded, generation)
+            members = frozenset(loaded)
+            return {str(product_id): product_id.binary in members for product_id in requested}
+
+    cursor = collection.find({"user": user_id, "product": {"$in": requested}}, {"product": 1, "_id": 0})
+    found = {doc["product"] async for doc in cursor}
+    return {str(product_id): product_id in found for product_id in requested}
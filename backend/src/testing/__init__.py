@@ -0,0 +1,3 @@
+from .queryBudget import queryBudget
+
+__all__ = ["queryBudget"]
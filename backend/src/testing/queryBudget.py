@@ -0,0 +1,80 @@
+"""
+Query budgets for endpoint tests.
+
+Wrap requests made through the app (e.g. an httpx ``ASGITransport`` client)
+and fail if any of them issues more Mongo commands than allowed::
+
+    from src.testing import queryBudget
+
+    async def test_wishlist_is_not_n_plus_one(client, auth_headers):
+        with queryBudget(4, maxRepeats=2):
+            response = await client.get("/api/wishlist/", headers=auth_headers)
+        assert response.status_code == 200
+
+Requires the app's database client to be created by ``connect_to_database``
+(so the command listener is attached) and ``DB_QUERY_STATS`` left enabled.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Tuple
+
+from ..services.queryStats import QueryStats, addRequestObserver, removeRequestObserver
+
+
+@dataclass
+class CapturedRequest:
+    method: str
+    path: str
+    stats: QueryStats
+
+    def describe(self) -> str:
+        patterns = ", ".join(f"{count}x {pattern}" for pattern, count in self.stats.patterns.most_common(5))
+        return f"{self.method} {self.path}: {self.stats.count} queries [{patterns}]"
+
+
+@dataclass
+class QueryBudgetCapture:
+    requests: List[CapturedRequest] = field(default_factory=list)
+
+    @property
+    def total(self) -> int:
+        return sum(request.stats.count for request in self.requests)
+
+
+@contextmanager
+def queryBudget(
+    maxQueries: int,
+    *,
+    maxRepeats: Optional[int] = None,
+    path: Optional[str] = None,
+) -> Iterator[QueryBudgetCapture]:
+    """
+    Assert every request completed inside the block (optionally only those for
+    ``path``) issued at most ``maxQueries`` commands, and no single query shape
+    more than ``maxRepeats`` times.
+    """
+    capture = QueryBudgetCapture()
+
+    def observe(method: str, request_path: str, stats: QueryStats) -> None:
+        if path is None or request_path == path:
+            capture.requests.append(CapturedRequest(method, request_path, stats))
+
+    addRequestObserver(observe)
+    try:
+        yield capture
+    finally:
+        removeRequestObserver(observe)
+
+    failures: List[Tuple[CapturedRequest, str]] = []
+    for request in capture.requests:
+        if request.stats.count > maxQueries:
+            failures.append((request, f"exceeded budget of {maxQueries} queries"))
+        elif maxRepeats is not None and request.stats.repeated(maxRepeats + 1):
+            failures.append((request, f"repeated a query shape more than {maxRepeats} times"))
+    if failures:
+        raise AssertionError(
+            "Query budget exceeded:\n" + "\n".join(f"  {request.describe()} - {reason}" for request, reason in failures)
+        )